@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#
+# Benchmark of the parsing of the main (IATA/ICAO) POR file, with an
+# increasing number of processes (see the parse_workers parameter
+# of OpenTravelData).
+#
+# The main POR file is synthesized from the fixture (excerpt) file,
+# the records of which are replicated (with distinct Geonames IDs)
+# up to the size of the full OPTD file, so that no download is needed:
+#   python benchmarks/bench_parallel_parse.py [--rows 123000] [--repeat 3]
+#
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert (0, os.path.join (os.path.dirname (__file__), '..'))
+import opentraveldata
+
+fixture_dir = os.path.join (os.path.dirname (__file__), '..', 'resources',
+                            'fixtures')
+
+def synthesizePORFile (local_dir, n_rows):
+   """
+     Write a main POR file of n_rows records, replicated from the fixture
+     file, along with the (fixture) UN/LOCODE POR file
+   """
+   with open (os.path.join (fixture_dir, 'optd_por_public_all.csv'),
+              encoding = 'utf8') as por_file:
+      header_line = por_file.readline()
+      fixture_rows = [line.split ('^') for line in por_file if line.strip()]
+   geo_id_idx = header_line.split ('^').index ('geoname_id')
+
+   with open (os.path.join (local_dir, 'optd_por_public_all.csv'), 'w',
+              encoding = 'utf8') as por_file:
+      por_file.write (header_line)
+      for row_idx in range (n_rows):
+         row = list (fixture_rows[row_idx % len (fixture_rows)])
+         row[geo_id_idx] = str (100000000 + row_idx)
+         por_file.write ('^'.join (row))
+   shutil.copy (os.path.join (fixture_dir, 'optd_por_unlc.csv'), local_dir)
+
+def main():
+   parser = argparse.ArgumentParser (description = "Benchmark of the " \
+                                     "(parallel) parsing of the POR file")
+   parser.add_argument ('--rows', type = int, default = 123000,
+                        help = "number of records of the POR file")
+   parser.add_argument ('--repeat', type = int, default = 3,
+                        help = "number of timings, the best one being kept")
+   parser.add_argument ('--workers', type = int, nargs = '+',
+                        default = [1, 2, 4, 8],
+                        help = "numbers of parsing processes")
+   args = parser.parse_args()
+
+   local_dir = tempfile.mkdtemp (prefix = 'optd-bench-')
+   try:
+      synthesizePORFile (local_dir, args.rows)
+      por_file_size = os.path.getsize (os.path.join (local_dir,
+                                                     'optd_por_public_all.csv'))
+      print (f"POR file: {args.rows} records, {por_file_size / 1e6:.1f} MB " \
+             f"- CPU cores: {os.cpu_count()}")
+      print (f"{'workers':>8} {'best (s)':>10} {'speed-up':>9}")
+
+      serial_time = None
+      for parse_workers in args.workers:
+         myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                                 validate_file_sizes = False,
+                                                 use_snapshot = False,
+                                                 parse_workers = parse_workers)
+         timing_list = []
+         for _ in range (args.repeat):
+            start_time = time.perf_counter()
+            myOPTD.parsePORFile()
+            timing_list.append (time.perf_counter() - start_time)
+         best_time = min (timing_list)
+         if serial_time is None:
+            serial_time = best_time
+         print (f"{parse_workers:>8} {best_time:>10.3f} " \
+                f"{serial_time / best_time:>8.2f}x")
+   finally:
+      shutil.rmtree (local_dir)
+
+if __name__ == '__main__':
+   main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+#
+# Offline benchmark suite of the loading of the POR data and of the POR
+# lookups, compared against a stored baseline, so as to catch
+# performance regressions.
+#
+# The data files are synthetic (see the opentraveldata.synthetic module),
+# at a configurable scale, so that no download is needed. For each way
+# of loading the POR data (parsing the POR file, loading the snapshot,
+# memory-mapping the index file), the suite reports, as the median of
+# several runs, each one in a fresh process (after an unmeasured run,
+# which warms the page cache and builds the snapshot or the index file):
+#  * the cold-load time of extractPORSubsetFromOPTD() and the peak RSS
+#    of the process once loaded, along with the estimated memory
+#    footprint of the POR store and dictionaries;
+#  * the latency percentiles of getServingPORList() and getPORByGeoID(),
+#    over a seeded random sample of POR codes;
+#  * the throughput of the batch lookups (getServingPORLists()).
+#
+#   python benchmarks/bench_suite.py                   # report only
+#   python benchmarks/bench_suite.py --save-baseline   # (re)write baseline
+#   python benchmarks/bench_suite.py --check           # exit 1 on regression
+#
+# The timings depend on the host: the baseline (benchmarks/baseline.json)
+# is to be regenerated on the host the suite is run on.
+#
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert (0, os.path.join (os.path.dirname (__file__), '..'))
+import opentraveldata
+from opentraveldata.synthetic import writeSyntheticOPTDFiles
+
+default_baseline_filepath = os.path.join (os.path.dirname (__file__),
+                                          'baseline.json')
+
+# Ways of loading the POR data, as OpenTravelData keyword arguments
+load_scenarios = {
+   'parse': {'use_snapshot': False},
+   'snapshot': {'use_snapshot': True},
+   'mmap': {'use_mmap_index': True},
+}
+
+# Whether greater values of the metrics are better (throughputs), rather
+# than worse (timings, latencies, memory)
+higher_is_better_suffixes = ('_per_s',)
+
+
+def peakRSSMB():
+   """
+     Peak resident set size of the current process, in MB
+   """
+   max_rss = resource.getrusage (resource.RUSAGE_SELF).ru_maxrss
+   # In kB on Linux, in Bytes on macOS
+   if sys.platform == 'darwin':
+      return max_rss / 1e6
+   return max_rss / 1e3
+
+
+def latencyPercentiles (prefix, timing_list):
+   """
+     Latency percentiles (in microseconds) of per-call timings
+     (in nanoseconds)
+   """
+   quantile_list = statistics.quantiles (timing_list, n = 100,
+                                         method = 'inclusive')
+   return {f"{prefix}_p50_us": quantile_list[49] / 1e3,
+           f"{prefix}_p90_us": quantile_list[89] / 1e3,
+           f"{prefix}_p99_us": quantile_list[98] / 1e3}
+
+
+def runScenario (scenario, local_dir, n_lookups, seed):
+   """
+     Load the POR data the way of the given scenario, and time the
+     lookups. Meant to be called in a fresh process (see --child).
+   """
+   perf_counter_ns = time.perf_counter_ns
+   metric_dict = dict()
+
+   myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                           validate_file_sizes = False,
+                                           **load_scenarios[scenario])
+   start_time = time.perf_counter()
+   myOPTD.extractPORSubsetFromOPTD()
+   metric_dict['load_s'] = time.perf_counter() - start_time
+   metric_dict['peak_rss_mb'] = peakRSSMB()
+   metric_dict['footprint_mb'] = sum (myOPTD.memoryFootprint().values()) / 1e6
+
+   # Seeded random samples of the keys, for reproducible lookups
+   rng = random.Random (seed)
+   iata_code_list = sorted (myOPTD.iata_por_dict)
+   geo_id_list = sorted (myOPTD.geo_por_dict)
+   iata_code_sample = [rng.choice (iata_code_list) for _ in range (n_lookups)]
+   geo_id_sample = [rng.choice (geo_id_list) for _ in range (n_lookups)]
+
+   # The first lookup may build derived structures (e.g., the graph
+   # of the serving POR), and is therefore not timed
+   myOPTD.getServingPORList (iata_code_sample[0])
+   timing_list = []
+   for iata_code in iata_code_sample:
+      start_time = perf_counter_ns()
+      myOPTD.getServingPORList (iata_code)
+      timing_list.append (perf_counter_ns() - start_time)
+   metric_dict.update (latencyPercentiles ('serving_por', timing_list))
+
+   timing_list = []
+   for geo_id in geo_id_sample:
+      start_time = perf_counter_ns()
+      myOPTD.getPORByGeoID (geo_id)
+      timing_list.append (perf_counter_ns() - start_time)
+   metric_dict.update (latencyPercentiles ('geo_id', timing_list))
+   metric_dict['geo_id_lookups_per_s'] = n_lookups * 1e9 / sum (timing_list)
+
+   start_time = time.perf_counter()
+   myOPTD.getServingPORLists (iata_code_sample)
+   metric_dict['serving_por_batch_lookups_per_s'] = \
+      n_lookups / (time.perf_counter() - start_time)
+
+   return metric_dict
+
+
+def runScenarioInChild (scenario, local_dir, n_lookups, seed):
+   """
+     Run a scenario in a fresh Python process, so that the loading is
+     cold and the peak RSS is the one of that scenario only
+   """
+   child_env = dict (os.environ, PYTHONHASHSEED = '0')
+   completed_process = subprocess.run (
+      [sys.executable, os.path.abspath (__file__), '--child', scenario,
+       '--local-dir', local_dir, '--lookups', str (n_lookups),
+       '--seed', str (seed)],
+      env = child_env, stdout = subprocess.PIPE, check = True,
+      universal_newlines = True)
+   return json.loads (completed_process.stdout.splitlines()[-1])
+
+
+def runSuite (args):
+   """
+     Run all the scenarios, and return the median values of the metrics,
+     named '<scenario>.<metric>'
+   """
+   local_dir = tempfile.mkdtemp (prefix = 'optd-bench-')
+   try:
+      writeSyntheticOPTDFiles (local_dir, args.scale, args.seed)
+      result_dict = dict()
+      for scenario in args.scenarios:
+         # Unmeasured run: page cache, snapshot and index file
+         runScenarioInChild (scenario, local_dir, args.lookups, args.seed)
+         run_list = [runScenarioInChild (scenario, local_dir, args.lookups,
+                                         args.seed)
+                     for _ in range (args.repeat)]
+         for metric in run_list[0]:
+            result_dict[f"{scenario}.{metric}"] = statistics.median (
+               run[metric] for run in run_list)
+   finally:
+      shutil.rmtree (local_dir)
+   return result_dict
+
+
+def compareWithBaseline (result_dict, baseline_dict, tolerance):
+   """
+     Print the metrics along with their baseline values, and return
+     the names of the metrics which have regressed by more than
+     the tolerance (a ratio, e.g., 0.25 for 25%)
+   """
+   regression_list = []
+   print (f"{'metric':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+   for metric, value in result_dict.items():
+      baseline_value = baseline_dict.get (metric)
+      if baseline_value is None or baseline_value == 0:
+         print (f"{metric:<48} {'-':>12} {value:>12.3f}")
+         continue
+
+      change = value / baseline_value - 1
+      if metric.endswith (higher_is_better_suffixes):
+         has_regressed = change < -tolerance
+      else:
+         has_regressed = change > tolerance
+      if has_regressed:
+         regression_list.append (metric)
+      print (f"{metric:<48} {baseline_value:>12.3f} {value:>12.3f} " \
+             f"{change:>+7.1%}{' REGRESSION' if has_regressed else ''}")
+   return regression_list
+
+
+def main():
+   parser = argparse.ArgumentParser (description = "Offline benchmark " \
+                                     "suite of the POR data loading " \
+                                     "and lookups")
+   parser.add_argument ('--scale', type = float, default = 1,
+                        help = "scale of the synthetic data files, 1 for " \
+                        "the size of the real ones")
+   parser.add_argument ('--repeat', type = int, default = 3,
+                        help = "number of measured runs per scenario, " \
+                        "the median being kept")
+   parser.add_argument ('--lookups', type = int, default = 10000,
+                        help = "number of timed lookups per kind")
+   parser.add_argument ('--seed', type = int, default = 42,
+                        help = "seed of the synthetic data files and of " \
+                        "the random samples of POR codes")
+   parser.add_argument ('--scenarios', nargs = '+',
+                        default = list (load_scenarios),
+                        choices = list (load_scenarios),
+                        help = "ways of loading the POR data")
+   parser.add_argument ('--baseline', default = default_baseline_filepath,
+                        help = "baseline file (JSON)")
+   parser.add_argument ('--save-baseline', action = 'store_true',
+                        help = "write the results as the new baseline")
+   parser.add_argument ('--check', action = 'store_true',
+                        help = "exit with status 1 on regression")
+   parser.add_argument ('--tolerance', type = float, default = 0.25,
+                        help = "relative change beyond which a metric " \
+                        "has regressed")
+   parser.add_argument ('--child', choices = list (load_scenarios),
+                        help = argparse.SUPPRESS)
+   parser.add_argument ('--local-dir', help = argparse.SUPPRESS)
+   args = parser.parse_args()
+
+   if args.child is not None:
+      print (json.dumps (runScenario (args.child, args.local_dir,
+                                      args.lookups, args.seed)))
+      return 0
+
+   config_dict = {'scale': args.scale, 'lookups': args.lookups,
+                  'seed': args.seed}
+   print (f"Data files: {args.scale}x scale - {args.repeat} runs per " \
+          f"scenario - Python {sys.version.split()[0]}")
+   result_dict = runSuite (args)
+
+   baseline_dict = dict()
+   if os.path.isfile (args.baseline):
+      with open (args.baseline, encoding = 'utf8') as baseline_file:
+         baseline = json.load (baseline_file)
+      if baseline['config'] == config_dict:
+         baseline_dict = baseline['metrics']
+      else:
+         print (f"The baseline ({args.baseline}) has been measured with " \
+                f"another configuration: {baseline['config']}")
+   regression_list = compareWithBaseline (result_dict, baseline_dict,
+                                          args.tolerance)
+
+   if args.save_baseline:
+      with open (args.baseline, 'w', encoding = 'utf8') as baseline_file:
+         json.dump ({'config': config_dict, 'metrics': result_dict},
+                    baseline_file, indent = 2)
+         baseline_file.write ('\n')
+      print (f"Baseline written into {args.baseline}")
+
+   if regression_list:
+      print (f"{len (regression_list)} metric(s) regressed by more than " \
+             f"{args.tolerance:.0%}: {', '.join (regression_list)}")
+      if args.check:
+         return 1
+   return 0
+
+if __name__ == '__main__':
+   sys.exit (main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import os, shutil, gzip, threading
+import http.server
+import pytest
+
+fixture_dir = os.path.join (os.path.dirname (__file__), 'resources', 'fixtures')
+
+@pytest.fixture
+def optd_local_dir (tmp_path):
+    """
+    Local directory holding an excerpt of the OPTD data files, so that
+    OpenTravelData may be tested without downloading them
+    """
+    for fixture_filename in ('optd_por_public_all.csv', 'optd_por_unlc.csv'):
+        shutil.copy (os.path.join (fixture_dir, fixture_filename), tmp_path)
+    return str (tmp_path)
+
+class OPTDRequestHandler (http.server.BaseHTTPRequestHandler):
+    """
+    Stand-in for the OPTD GitHub repository, supporting the ETag
+    (If-None-Match) and Range (If-Range) headers, as well as the gzip
+    content encoding (when the gzip_encoding attribute of the server
+    is set)
+    """
+    def do_GET (self):
+        self.server.requests.append ((self.path, dict (self.headers)))
+        if not self.path in self.server.files:
+            self.send_error (404)
+            return
+        content, etag = self.server.files[self.path]
+        if self.headers.get ('If-None-Match') == etag:
+            self.send_response (304)
+            self.end_headers()
+            return
+
+        if self.server.gzip_encoding \
+           and 'gzip' in self.headers.get ('Accept-Encoding', ''):
+            content = gzip.compress (content)
+            self.send_response (200)
+            self.send_header ('Content-Encoding', 'gzip')
+            self.send_header ('ETag', etag)
+            self.send_header ('Content-Length', str (len (content)))
+            self.end_headers()
+            self.wfile.write (content)
+            return
+
+        start = 0
+        range_header = self.headers.get ('Range')
+        if range_header and self.headers.get ('If-Range') == etag:
+            start = int (range_header[len ('bytes='):].rstrip ('-'))
+            self.send_response (206)
+            self.send_header ('Content-Range',
+                              f"bytes {start}-{len (content) - 1}/{len (content)}")
+        else:
+            self.send_response (200)
+        self.send_header ('ETag', etag)
+        self.send_header ('Content-Length', str (len (content) - start))
+        self.end_headers()
+        self.wfile.write (content[start:])
+
+    def log_message (self, *args):
+        pass
+
+@pytest.fixture
+def optd_server():
+    """
+    Local HTTP server standing in for the OPTD GitHub repository. The files
+    it serves are set in its files attribute, by path, with their ETag
+    """
+    server = http.server.ThreadingHTTPServer (('127.0.0.1', 0),
+                                              OPTDRequestHandler)
+    server.files = dict()
+    server.gzip_encoding = False
+    server.requests = []
+    thread = threading.Thread (target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
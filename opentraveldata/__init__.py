@@ -2,3 +2,8 @@
 
 from .csvwriter import CSVWriter
 from .opentraveldata import OpenTravelData
+from .snapshot import sourceFileKey
+from .loctype import LocationType
+from .aio import AsyncOpenTravelData
+from .hotreload import HotReloadingOpenTravelData
+from .instrumentation import Instrumentation
@@ -0,0 +1,171 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import asyncio
+import concurrent.futures
+from .opentraveldata import OpenTravelData
+from .porstore import por_index_names
+
+
+class AsyncOpenTravelData():
+   """
+   Asyncio facade of OpenTravelData, the methods of which are awaitable.
+
+   The blocking operations (downloading the data files, parsing them and
+   building the POR dictionaries and derived indexes) are run off the event
+   loop, by a single worker thread, so that they never run concurrently
+   on the underlying OpenTravelData object. Concurrent callers of the same
+   operation (e.g., the first lookups, all needing the POR dictionaries)
+   wait on that single shared operation, instead of each starting its own.
+   Once the data is loaded, the lookups are answered directly, from
+   the event loop.
+   """
+   optd = None
+   executor = None
+   shared_futures = None
+
+   def __init__ (self, optd = None, **kwargs):
+      """
+        optd: the OpenTravelData object to wrap; when not given, one is
+        created with the given keyword arguments (e.g., local_dir)
+      """
+      if optd is None:
+         optd = OpenTravelData (**kwargs)
+      self.optd = optd
+      self.executor = concurrent.futures.ThreadPoolExecutor (
+         max_workers = 1, thread_name_prefix = 'optd')
+      self.shared_futures = dict()
+
+   async def __aenter__ (self):
+      return self
+
+   async def __aexit__ (self, exc_type, exc_value, traceback):
+      self.close()
+
+   def close (self):
+      """
+        Release the worker thread, once the pending operations are done
+      """
+      self.executor.shutdown (wait = False)
+      return
+
+   async def runShared (self, key, func, *args):
+      """
+        Run a blocking operation in the worker thread, sharing it with
+        the concurrent callers of the same operation (same key)
+      """
+      future = self.shared_futures.get (key)
+      if future is None:
+         loop = asyncio.get_running_loop()
+         future = loop.run_in_executor (self.executor, func, *args)
+         self.shared_futures[key] = future
+         future.add_done_callback (
+            lambda _: self.shared_futures.pop (key, None))
+
+      # A cancelled caller does not cancel the operation for the others
+      return await asyncio.shield (future)
+
+   async def downloadFilesIfNeeded (self, refresh = False):
+      """
+        Awaitable version of OpenTravelData.downloadFilesIfNeeded()
+      """
+      return await self.runShared (('download', refresh),
+                                   self.optd.downloadFilesIfNeeded, refresh)
+
+   async def extractPORSubsetFromOPTD (self, index_names = por_index_names):
+      """
+        Awaitable version of OpenTravelData.extractPORSubsetFromOPTD()
+      """
+      index_names = tuple (index_names)
+      if self.optd.por_store is not None \
+         and all (self.optd.porIndex (index_name) is not None
+                  for index_name in index_names):
+         return
+      return await self.runShared (('load', index_names),
+                                   self.optd.extractPORSubsetFromOPTD,
+                                   index_names)
+
+   async def extractUNLCPORSubsetFromOPTD (self):
+      """
+        Awaitable version of OpenTravelData.extractUNLCPORSubsetFromOPTD()
+      """
+      if self.optd.unlc_store is not None:
+         return
+      return await self.runShared (('load-unlc',),
+                                   self.optd.extractUNLCPORSubsetFromOPTD)
+
+   async def refreshPORData (self):
+      """
+        Awaitable version of OpenTravelData.refreshPORData()
+      """
+      return await self.runShared (('refresh',), self.optd.refreshPORData)
+
+   async def getServingPORList (self, por_code = 'FRA',
+                                only_when_city_code_differs = True):
+      """
+        Awaitable version of OpenTravelData.getServingPORList()
+      """
+      await self.extractPORSubsetFromOPTD (('iata',))
+      return self.optd.getServingPORList (por_code,
+                                          only_when_city_code_differs)
+
+   async def getServingPORLists (self, por_codes,
+                                 only_when_city_code_differs = True,
+                                 collect_errors = False):
+      """
+        Awaitable version of OpenTravelData.getServingPORLists()
+      """
+      await self.extractPORSubsetFromOPTD (('iata',))
+      return self.optd.getServingPORLists (por_codes,
+                                           only_when_city_code_differs,
+                                           collect_errors)
+
+   async def getServedPORList (self, tvl_por_code):
+      """
+        Awaitable version of OpenTravelData.getServedPORList()
+      """
+      await self.extractPORSubsetFromOPTD (('iata',))
+      return self.optd.getServedPORList (tvl_por_code)
+
+   async def getPORByGeoID (self, por_geo_id):
+      """
+        Awaitable version of OpenTravelData.getPORByGeoID()
+      """
+      await self.extractPORSubsetFromOPTD (('geo',))
+      return self.optd.getPORByGeoID (por_geo_id)
+
+   async def getUNLCPORList (self, unlc_code):
+      """
+        Awaitable version of OpenTravelData.getUNLCPORList()
+      """
+      await self.extractUNLCPORSubsetFromOPTD()
+      await self.extractPORSubsetFromOPTD (('geo',))
+      return self.optd.getUNLCPORList (unlc_code)
+
+   async def porSpatialIndex (self):
+      """
+        Awaitable version of OpenTravelData.porSpatialIndex()
+      """
+      if self.optd.por_spatial_index is not None:
+         return self.optd.por_spatial_index
+      return await self.runShared (('spatial-index',),
+                                   self.optd.porSpatialIndex)
+
+   async def getNearestPORList (self, latitude, longitude, k = 1,
+                                loc_type_flags = None):
+      """
+        Awaitable version of OpenTravelData.getNearestPORList()
+      """
+      await self.porSpatialIndex()
+      return self.optd.getNearestPORList (latitude, longitude, k,
+                                          loc_type_flags)
+
+   async def getPORListWithinRadius (self, latitude, longitude, radius_km,
+                                     loc_type_flags = None):
+      """
+        Awaitable version of OpenTravelData.getPORListWithinRadius()
+      """
+      await self.porSpatialIndex()
+      return self.optd.getPORListWithinRadius (latitude, longitude, radius_km,
+                                               loc_type_flags)
@@ -0,0 +1,182 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import csv
+import json
+from .snapshot import sourceFileKey
+from .compression import openCompressedFile
+
+# Columnar copy (Arrow IPC or Parquet) of a POR file, stored alongside that
+# latter in the local directory, so that the POR records may be read
+# without parsing the CSV text, and only for the needed columns (column
+# pruning) and rows (predicate pushdown).
+#
+# All the columns of the POR file are kept, as strings, the same way as
+# in the POR file. The key of the POR file the copy has been converted
+# from (see snapshot.sourceFileKey()) is stored in the metadata of the
+# schema, so that a stale copy is detected and converted again.
+#
+# The Arrow IPC (uncompressed) copy may be memory-mapped. The Parquet
+# copy is smaller, and its row groups may be skipped based on their
+# statistics. Both require the pyarrow package (pip install pyarrow).
+try:
+   import pyarrow
+   import pyarrow.dataset
+   import pyarrow.ipc
+   import pyarrow.parquet
+except ImportError:
+   pyarrow = None
+
+# Formats of the columnar copy, and the corresponding extensions
+# of the file names
+columnar_cache_extensions = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+# Metadata key, in the schema, of the key of the source POR file
+columnar_cache_key_metadata = b'optd_source_key'
+
+# Number of rows of the Parquet row groups, and of the Arrow record batches
+columnar_cache_batch_size = 1 << 16
+
+
+def checkColumnarCache (cache_format):
+   """
+     Check that the given format of columnar copy is known (ValueError
+     otherwise) and available (ImportError otherwise)
+   """
+   if not cache_format in columnar_cache_extensions:
+      raise ValueError (f"Unknown columnar cache format: {cache_format}. " \
+                        "Expected formats: 'arrow', 'parquet'")
+   if pyarrow is None:
+      raise ImportError ("The columnar cache requires the pyarrow " \
+                         "package (pip install pyarrow)")
+   return
+
+
+def readColumnarCacheSchema (cache_filepath, cache_format):
+   """
+     Read the schema (with its metadata) of a columnar copy
+   """
+   if cache_format == 'parquet':
+      return pyarrow.parquet.read_schema (cache_filepath)
+   with pyarrow.memory_map (cache_filepath, 'r') as cache_file:
+      return pyarrow.ipc.open_file (cache_file).schema
+
+
+def isColumnarCacheFresh (cache_filepath, cache_format, source_filepath):
+   """
+     State whether a columnar copy exists and has been converted from the
+     current version of the source POR file. The size and modification
+     time of the source file are compared first, so that its content
+     is hashed only when they differ (e.g., after a download of the same
+     content).
+   """
+   if not os.path.isfile (cache_filepath):
+      return False
+   try:
+      metadata = readColumnarCacheSchema (cache_filepath, cache_format) \
+         .metadata or dict()
+      cache_key = json.loads (metadata[columnar_cache_key_metadata])
+   except Exception:
+      # Whatever the reason (truncated or foreign file), the columnar
+      # copy is converted again
+      return False
+
+   source_stat = os.stat (source_filepath)
+   if cache_key[:2] == [source_stat.st_size, source_stat.st_mtime_ns]:
+      return True
+   return cache_key[2] == sourceFileKey (source_filepath)[2]
+
+
+def writeColumnarCache (cache_filepath, cache_format, source_filepath):
+   """
+     Convert a (possibly compressed) POR file into its columnar copy.
+     The copy is first written into a temporary file, which is then
+     atomically renamed, so that concurrent readers never see a partially
+     written copy.
+   """
+   source_key = sourceFileKey (source_filepath)
+   with openCompressedFile (source_filepath, newline='') as csvfile:
+      file_reader = csv.reader (csvfile, delimiter='^')
+      header = next (file_reader)
+      columns = [[] for _ in header]
+      for row in file_reader:
+         # Skip empty lines
+         if not row:
+            continue
+         for column, value in zip (columns, row):
+            column.append (value)
+
+   schema = pyarrow.schema (
+      [(column_name, pyarrow.string()) for column_name in header],
+      metadata = {columnar_cache_key_metadata:
+                  json.dumps (list (source_key)).encode ('utf8')})
+   table = pyarrow.Table.from_arrays (
+      [pyarrow.array (column, type = pyarrow.string()) for column in columns],
+      schema = schema)
+
+   tmp_filepath = f"{cache_filepath}.{os.getpid()}.tmp"
+   try:
+      if cache_format == 'parquet':
+         pyarrow.parquet.write_table (
+            table, tmp_filepath, row_group_size = columnar_cache_batch_size)
+      else:
+         with pyarrow.OSFile (tmp_filepath, 'wb') as cache_file:
+            with pyarrow.ipc.new_file (cache_file, schema) as writer:
+               writer.write_table (table,
+                                   max_chunksize = columnar_cache_batch_size)
+      os.replace (tmp_filepath, cache_filepath)
+   finally:
+      if os.path.exists (tmp_filepath):
+         os.remove (tmp_filepath)
+
+   #
+   return
+
+
+def filterExpression (filters):
+   """
+     Convert filters into an Arrow (dataset) expression. The filters
+     are either already such an expression, or a list of (column, operator,
+     value) tuples, all of which have to hold, e.g.,
+     [('location_type', '=', 'A'), ('iata_code', '!=', '')].
+     The operators are '=', '==', '!=', '<', '<=', '>', '>=', 'in'
+     and 'not in'.
+   """
+   if filters is None or isinstance (filters, pyarrow.dataset.Expression):
+      return filters
+
+   expression = None
+   for (column, operator, value) in filters:
+      field = pyarrow.dataset.field (column)
+      if operator in ('=', '=='):
+         condition = field == value
+      elif operator == '!=':
+         condition = field != value
+      elif operator == '<':
+         condition = field < value
+      elif operator == '<=':
+         condition = field <= value
+      elif operator == '>':
+         condition = field > value
+      elif operator == '>=':
+         condition = field >= value
+      elif operator == 'in':
+         condition = field.isin (value)
+      elif operator == 'not in':
+         condition = ~field.isin (value)
+      else:
+         raise ValueError (f"Unknown filter operator: {operator}")
+      expression = condition if expression is None else expression & condition
+
+   return expression
+
+
+def openColumnarCache (cache_filepath, cache_format):
+   """
+     Open a columnar copy as an Arrow dataset, from which only some
+     columns and rows may be read
+   """
+   dataset_format = 'ipc' if cache_format == 'arrow' else 'parquet'
+   return pyarrow.dataset.dataset (cache_filepath, format = dataset_format)
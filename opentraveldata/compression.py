@@ -0,0 +1,104 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import gzip
+
+# The Zstandard compression is optional: it requires the zstandard package
+# (pip install zstandard)
+try:
+   import zstandard
+except ImportError:
+   zstandard = None
+
+# Compression of the locally stored data files, and the corresponding
+# extensions of the file names
+compression_extensions = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+compression_chunk_size = 1 << 16
+
+# Uncompressed sizes of the compressed files, by file path, along with
+# the (size, modification time) key of the compressed file they have
+# been computed for (see uncompressedFileSize())
+uncompressed_file_sizes = dict()
+
+
+def checkCompression (compression):
+   """
+     Check that the given compression is known (ValueError otherwise)
+     and available (ImportError otherwise)
+   """
+   if not compression in compression_extensions:
+      raise ValueError (f"Unknown compression: {compression}. " \
+                        "Expected compressions: None, 'gzip', 'zstd'")
+   if compression == 'zstd' and zstandard is None:
+      raise ImportError ("The zstd compression requires the zstandard " \
+                         "package (pip install zstandard)")
+   return
+
+
+def compressionOfFile (filepath):
+   """
+     Derive the compression of a file from the extension of its name
+   """
+   for compression, extension in compression_extensions.items():
+      if compression is not None and filepath.endswith (extension):
+         return compression
+   return None
+
+
+def openCompressedFile (filepath, mode = 'rt', **kwargs):
+   """
+     Open a file, compressed or not (depending on the extension of its
+     name), the same way as the open() built-in. The (de)compression is
+     streamed.
+   """
+   compression = compressionOfFile (filepath)
+   if compression is None:
+      return open (filepath, mode, **kwargs)
+
+   checkCompression (compression)
+   if compression == 'gzip':
+      return gzip.open (filepath, mode, **kwargs)
+   return zstandard.open (filepath, mode, **kwargs)
+
+
+def decompressingReader (fileobj, content_encoding):
+   """
+     Wrap a (binary) file object, the content of which is encoded
+     (HTTP Content-Encoding header) with gzip or not, into a reader
+     of the decoded content
+   """
+   if content_encoding in ('gzip', 'x-gzip'):
+      return gzip.GzipFile (fileobj = fileobj, mode = 'rb')
+   if content_encoding not in (None, '', 'identity'):
+      raise OSError (f"Unsupported content encoding: {content_encoding}")
+   return fileobj
+
+
+def uncompressedFileSize (filepath):
+   """
+     Size, in Bytes, of the uncompressed content of a file (compressed
+     or not, depending on the extension of its name)
+   """
+   if compressionOfFile (filepath) is None:
+      return os.path.getsize (filepath)
+
+   # The whole file has to be decompressed (the size recorded by gzip
+   # is only modulo 4 GB, and only for the last member), which is done
+   # once per version of the file
+   file_stat = os.stat (filepath)
+   file_key = (file_stat.st_size, file_stat.st_mtime_ns)
+   (cached_file_key, file_size) = uncompressed_file_sizes.get (filepath,
+                                                               (None, None))
+   if cached_file_key == file_key:
+      return file_size
+
+   file_size = 0
+   with openCompressedFile (filepath, 'rb') as compressed_file:
+      for chunk in iter (lambda: compressed_file.read (compression_chunk_size),
+                         b''):
+         file_size += len (chunk)
+   uncompressed_file_sizes[filepath] = (file_key, file_size)
+   return file_size
@@ -2,34 +2,177 @@
 # https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
 #
 
+import os
+import io
 import csv
+import queue
+import itertools
+import threading
+from .compression import openCompressedFile
 
 class CSVWriter():
-    """Utility class to write to CSV files one line at a time"""
+    """
+    Utility class to write to CSV files, one line at a time or in bulk.
+
+    The rows are formatted into an in-memory buffer, which is encoded and
+    written to the file, as a single chunk, once it holds buffer_size
+    characters. The file is compressed when the extension of its name
+    calls for it ('.gz' for gzip, '.zst' for zstd). With background=True,
+    the chunks are compressed and written by a background thread, so that
+    the formatting of the next rows overlaps with the disk I/O (a few
+    chunks at most being pending at any time).
+    """
     filepath = None
     delimiter = '^'
+    buffer_size = 1 << 20
     fp = None
+    buffer = None
     writer = None
+    n_buffered_chars = 0
+    n_rows = 0
+    n_bytes = 0
+    progress_callback = None
+    write_queue = None
+    write_thread = None
+    write_error = None
 
-    def __init__ (self, filepath = None, delimiter = '^'):
+    def __init__ (self, filepath = None, delimiter = '^',
+                  buffer_size = 1 << 20, background = False,
+                  progress_callback = None):
+        """
+          filepath: the CSV file to write, compressed depending on the
+          extension of its name
+          buffer_size: the number of characters formatted before being
+          written to the file
+          background: whether the file is written by a background thread
+          progress_callback: when given, a callable called, each time
+          a chunk has been written, with the numbers of rows and of
+          (uncompressed) Bytes written so far
+        """
         self.filepath = filepath
         self.delimiter = delimiter
-        self.fp = open (self.filepath, 'w', encoding = 'utf8', newline = '')
-        self.writer = csv.writer (self.fp, delimiter = self.delimiter,
-                                  quotechar = '"', quoting = csv.QUOTE_MINIMAL,
-                                  lineterminator = '\n')
+        self.buffer_size = buffer_size
+        self.progress_callback = progress_callback
+        self.fp = openCompressedFile (self.filepath, 'wb')
+        self.newBuffer()
+
+        if background:
+            self.write_queue = queue.Queue (maxsize = 4)
+            self.write_thread = threading.Thread (target = self.writeChunks,
+                                                  name = 'optd-csvwriter',
+                                                  daemon = True)
+            self.write_thread.start()
+
+    def __enter__ (self):
+        return self
+
+    def __exit__ (self, exc_type, exc_value, traceback):
+        self.close()
 
     def close (self):
-        self.fp.close()
+        """
+          Write the buffered rows, wait for the background thread, if any,
+          and close the file
+        """
+        if self.fp is None:
+            return
+        try:
+            try:
+                self.flush()
+            finally:
+                if self.write_thread is not None:
+                    self.write_queue.put (None)
+                    self.write_thread.join()
+                    self.write_thread = None
+        finally:
+            self.fp.close()
+            self.fp = None
+        self.checkWriteError()
 
     def write (self, elems):
-        self.writer.writerow(elems)
+        """
+          Write a row
+        """
+        # The writer returns the number of characters written to the buffer
+        self.n_buffered_chars += self.writer.writerow (elems)
+        self.n_rows += 1
+        if self.n_buffered_chars >= self.buffer_size:
+            self.flush()
+
+    def writerows (self, rows, batch_size = 10000):
+        """
+          Write the rows of an iterable (e.g., a generator, in which case
+          they are consumed by batches of batch_size rows, so that they
+          are never all held in memory)
+        """
+        row_iter = iter (rows)
+        while True:
+            row_list = list (itertools.islice (row_iter, batch_size))
+            if not row_list:
+                break
+            self.writer.writerows (row_list)
+            self.n_rows += len (row_list)
+            self.n_buffered_chars = self.buffer.tell()
+            if self.n_buffered_chars >= self.buffer_size:
+                self.flush()
+
+    def newBuffer (self):
+        # A new buffer is faster to fill than an emptied (truncated) one
+        self.buffer = io.StringIO()
+        self.writer = csv.writer (self.buffer, delimiter = self.delimiter,
+                                  quotechar = '"', quoting = csv.QUOTE_MINIMAL,
+                                  lineterminator = '\n')
+        self.n_buffered_chars = 0
+
+    def flush (self):
+        """
+          Hand the buffered rows over to the file (or to the background
+          thread writing it)
+        """
+        self.checkWriteError()
+        chunk = self.buffer.getvalue().encode ('utf8')
+        self.newBuffer()
+        if not chunk:
+            return
+
+        if self.write_thread is not None:
+            self.write_queue.put ((chunk, self.n_rows))
+        else:
+            self.writeChunk (chunk, self.n_rows)
+
+    def writeChunk (self, chunk, n_rows):
+        self.fp.write (chunk)
+        self.n_bytes += len (chunk)
+        if self.progress_callback is not None:
+            self.progress_callback (n_rows, self.n_bytes)
+
+    def writeChunks (self):
+        # Loop of the background thread. After an error, the remaining
+        # chunks are dropped, the error being raised by the next call
+        # of flush() or close()
+        while True:
+            item = self.write_queue.get()
+            if item is None:
+                return
+            if self.write_error is None:
+                try:
+                    self.writeChunk (*item)
+                except BaseException as error:
+                    self.write_error = error
+
+    def checkWriteError (self):
+        # The error is raised again by the subsequent calls, as the chunks
+        # following the failed one have been dropped
+        if self.write_error is not None:
+            raise self.write_error
 
     def size (self):
-        return os.path.getsize(self.filename)
+        """
+          Size of the file, in Bytes (as written so far, and compressed
+          if the file is)
+        """
+        return os.path.getsize (self.filepath)
 
     def fname (self):
-        return self.filename
-
+        return self.filepath
 
-    
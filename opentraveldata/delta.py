@@ -0,0 +1,167 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+from .porstore import indexPORRecord, splitPORListField, por_unlc_list_idx
+
+# Positions, in the values of a POR record (i.e., in the order of the
+# por_fields tuple), of the fields used as keys
+por_iata_code_idx = 0
+por_loc_type_idx = 1
+por_geo_id_idx = 2
+por_env_id_idx = 3
+
+
+def keyedPORRecords (store):
+   """
+     Map the (not removed) POR records of a store by their key, namely
+     the tuple made of their Geonames ID, IATA code and location type.
+     In order to tell apart the historical versions of a POR, the envelope
+     ID and the rank of the record among the records having the same key
+     are appended to that key.
+   """
+   keyed_records = dict()
+   key_counts = dict()
+   for row_id in store.rowIDs():
+      por_values = store.rowValues (row_id)
+      key = (por_values[por_geo_id_idx], por_values[por_iata_code_idx],
+             por_values[por_loc_type_idx], por_values[por_env_id_idx])
+      key_count = key_counts.get (key, 0)
+      key_counts[key] = key_count + 1
+      keyed_records[key + (key_count,)] = (row_id, por_values)
+
+   return keyed_records
+
+
+def diffPORStores (old_store, new_store):
+   """
+     Derive the difference between two POR stores, e.g., between the POR
+     records currently loaded and those of a new version of the POR file.
+     Return a dictionary of:
+     - 'added': list of (key, new row ID, new values) tuples
+     - 'changed': list of (key, old row ID, old values, new values) tuples
+     - 'removed': list of (key, old row ID, old values) tuples
+     - 'row_ranks': dictionary of the row IDs, in the new store, of the
+       (changed or not) records of the old store which are kept, by their
+       row IDs in the old store
+     The keys are (Geonames ID, IATA code, location type) tuples.
+   """
+   old_records = keyedPORRecords (old_store)
+   new_records = keyedPORRecords (new_store)
+
+   por_delta = {'added': [], 'changed': [], 'removed': [], 'row_ranks': dict()}
+   row_ranks = por_delta['row_ranks']
+   for full_key, (new_row_id, new_values) in new_records.items():
+      old_record = old_records.get (full_key)
+      if old_record is None:
+         por_delta['added'].append ((full_key[:3], new_row_id, new_values))
+         continue
+      row_ranks[old_record[0]] = new_row_id
+      if old_record[1] != new_values:
+         por_delta['changed'].append ((full_key[:3], old_record[0],
+                                       old_record[1], new_values))
+
+   for full_key, (old_row_id, old_values) in old_records.items():
+      if not full_key in new_records:
+         por_delta['removed'].append ((full_key[:3], old_row_id, old_values))
+
+   return por_delta
+
+
+def summarizePORDelta (por_delta):
+   """
+     Summarize the difference between two POR stores, as a dictionary
+     of the lists of the keys, i.e., (Geonames ID, IATA code,
+     location type) tuples, of the added, changed and removed POR records
+   """
+   return {change: [change_details[0] for change_details in por_delta[change]]
+           for change in ('added', 'changed', 'removed')}
+
+
+def applyPORDelta (store, index_dict, por_delta):
+   """
+     Apply the difference between two POR stores (see diffPORStores())
+     to the first (in-memory) store and to its (in-memory) indexes,
+     given as a dictionary of the raw indexes, by index name.
+
+     The changed records are updated in place, the added ones are
+     appended and the removed ones are removed from the store.
+     Only the entries of the indexes for the keys (IATA codes, UN/LOCODE
+     codes and Geonames IDs) of those records are then re-computed, from
+     the records of the store having those keys. Those records are indexed
+     in the order of the new store (i.e., of the new POR file), whatever
+     their rows in the first store, so that the same records win (e.g.,
+     the first one for a Geonames ID, the last one for an IATA code and
+     location type) as when the new store is indexed as a whole. Records
+     which have only moved within the POR file are not part of the
+     difference, and their keys are therefore not re-computed.
+   """
+   affected_keys = {'iata': set(), 'unlc': set(), 'geo': set()}
+   row_ranks = dict (por_delta['row_ranks'])
+
+   def addAffectedKeys (por_values):
+      if por_values[por_iata_code_idx] != '':
+         affected_keys['iata'].add (por_values[por_iata_code_idx])
+      affected_keys['geo'].add (por_values[por_geo_id_idx])
+      affected_keys['unlc'].update (
+         splitPORListField ('unlc_list', por_values[por_unlc_list_idx]))
+
+   for (_, old_row_id, old_values) in por_delta['removed']:
+      addAffectedKeys (old_values)
+      store.remove (old_row_id)
+
+   for (_, old_row_id, old_values, new_values) in por_delta['changed']:
+      addAffectedKeys (old_values)
+      addAffectedKeys (new_values)
+      store.update (old_row_id, new_values)
+
+   for (_, new_row_id, new_values) in por_delta['added']:
+      addAffectedKeys (new_values)
+      row_ranks[store.append (new_values)] = new_row_id
+
+   # Collect the records having any of the affected keys
+   affected_iata_codes = affected_keys['iata']
+   affected_unlc_keys = affected_keys['unlc']
+   affected_geo_keys = affected_keys['geo']
+   affected_row_list = []
+   columns = store.columns
+   removed_row_ids = store.removed_row_ids
+   for row_id, por_values in enumerate (zip (columns['iata_code'],
+                                             columns['location_type'],
+                                             columns['geoname_id'],
+                                             columns['envelope_id'],
+                                             columns['unlc_list'])):
+      if row_id in removed_row_ids:
+         continue
+      (iata_code, _, geo_id, _, unlc_list_str) = por_values
+      if iata_code in affected_iata_codes \
+         or geo_id in affected_geo_keys \
+         or (unlc_list_str != '' and not affected_unlc_keys.isdisjoint (
+            splitPORListField ('unlc_list', unlc_list_str))):
+         affected_row_list.append ((row_ranks[row_id], row_id, por_values))
+
+   # Index them in the order of the new store, the same way as when
+   # the whole new store is indexed
+   affected_row_list.sort()
+   fresh_index_dict = {index_name: dict() for index_name in index_dict}
+   for (_, row_id, por_values) in affected_row_list:
+      indexPORRecord (fresh_index_dict, row_id, *por_values)
+
+   # Replace the entries of the affected keys in the live indexes. For
+   # the IATA codes, the entries by location type are replaced as a whole,
+   # so that they come in the same order as in a full build
+   for index_name, affected_index_keys in (('iata', affected_iata_codes),
+                                           ('unlc', affected_unlc_keys),
+                                           ('geo', affected_geo_keys)):
+      por_index = index_dict.get (index_name)
+      if por_index is None:
+         continue
+      fresh_por_index = fresh_index_dict[index_name]
+      for key in affected_index_keys:
+         if key in fresh_por_index:
+            por_index[key] = fresh_por_index[key]
+         else:
+            por_index.pop (key, None)
+
+   #
+   return
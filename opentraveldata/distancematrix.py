@@ -0,0 +1,138 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+import math
+from .spatialindex import earth_radius_km
+
+# Great-circle (haversine, see spatialindex.haversineDistance()) distances
+# between sets of points, given as arrays of latitudes and longitudes
+# (in degrees). The distances are computed by NumPy, over whole arrays,
+# when it is installed (pip install numpy), and otherwise by a pure Python
+# loop, over the same pre-computed radians and cosines. Unknown points
+# have NaN coordinates, and therefore NaN distances.
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+
+class PointArrays():
+   """
+   Latitudes and longitudes (in radians) of a set of points, and the
+   cosines of their latitudes, as NumPy arrays when NumPy is installed,
+   and as arrays (array module) of floats otherwise
+   """
+   lats = None
+   lons = None
+   cos_lats = None
+
+   def __init__ (self, lats, lons):
+      """
+        lats, lons: sequences of the latitudes and longitudes of the points,
+        in degrees
+      """
+      if numpy is not None:
+         self.lats = numpy.radians (numpy.asarray (lats, dtype = numpy.float64))
+         self.lons = numpy.radians (numpy.asarray (lons, dtype = numpy.float64))
+         self.cos_lats = numpy.cos (self.lats)
+      else:
+         self.lats = array.array ('d', map (math.radians, lats))
+         self.lons = array.array ('d', map (math.radians, lons))
+         self.cos_lats = array.array ('d', map (math.cos, self.lats))
+
+   def __len__ (self):
+      return len (self.lats)
+
+   def slice (self, start, end):
+      """
+        Points from start to end (excluded)
+      """
+      points = PointArrays.__new__ (PointArrays)
+      points.lats = self.lats[start:end]
+      points.lons = self.lons[start:end]
+      points.cos_lats = self.cos_lats[start:end]
+      return points
+
+
+def haversineMatrix (points1, points2):
+   """
+     Matrix of the distances, in kilometers, between each of the first
+     points (rows) and each of the second points (columns). It is a 2D
+     NumPy array when NumPy is installed, and a list of rows (arrays
+     of floats) otherwise.
+   """
+   if numpy is not None:
+      sin_dphi = numpy.sin ((points2.lats[numpy.newaxis, :]
+                             - points1.lats[:, numpy.newaxis]) / 2)
+      sin_dlambda = numpy.sin ((points2.lons[numpy.newaxis, :]
+                                - points1.lons[:, numpy.newaxis]) / 2)
+      hav = sin_dphi * sin_dphi + points1.cos_lats[:, numpy.newaxis] \
+         * points2.cos_lats[numpy.newaxis, :] * sin_dlambda * sin_dlambda
+      return 2 * earth_radius_km \
+         * numpy.arcsin (numpy.sqrt (numpy.minimum (hav, 1.0)))
+
+   sin, asin, sqrt = math.sin, math.asin, math.sqrt
+   points2_list = list (zip (points2.lats, points2.lons, points2.cos_lats))
+   matrix = []
+   for (phi1, lambda1, cos_phi1) in zip (points1.lats, points1.lons,
+                                         points1.cos_lats):
+      row = array.array ('d')
+      for (phi2, lambda2, cos_phi2) in points2_list:
+         sin_dphi = sin ((phi2 - phi1) / 2)
+         sin_dlambda = sin ((lambda2 - lambda1) / 2)
+         hav = sin_dphi * sin_dphi \
+            + cos_phi1 * cos_phi2 * sin_dlambda * sin_dlambda
+         # Rounding errors may give slightly more than 1, while NaN
+         # coordinates keep giving NaN distances
+         if hav > 1.0:
+            hav = 1.0
+         row.append (2 * earth_radius_km * asin (sqrt (hav)))
+      matrix.append (row)
+   return matrix
+
+
+def haversinePairs (points1, points2):
+   """
+     Distances, in kilometers, between the first points and the second
+     points, element-wise (the two sets having the same number of points).
+     It is a NumPy array when NumPy is installed, and an array of floats
+     otherwise.
+   """
+   if len (points1) != len (points2):
+      raise ValueError ("The two sets of points have different sizes: " \
+                        f"{len (points1)} and {len (points2)}")
+
+   if numpy is not None:
+      sin_dphi = numpy.sin ((points2.lats - points1.lats) / 2)
+      sin_dlambda = numpy.sin ((points2.lons - points1.lons) / 2)
+      hav = sin_dphi * sin_dphi \
+         + points1.cos_lats * points2.cos_lats * sin_dlambda * sin_dlambda
+      return 2 * earth_radius_km \
+         * numpy.arcsin (numpy.sqrt (numpy.minimum (hav, 1.0)))
+
+   sin, asin, sqrt = math.sin, math.asin, math.sqrt
+   distances = array.array ('d')
+   for (phi1, lambda1, cos_phi1, phi2, lambda2, cos_phi2) in zip (
+         points1.lats, points1.lons, points1.cos_lats,
+         points2.lats, points2.lons, points2.cos_lats):
+      sin_dphi = sin ((phi2 - phi1) / 2)
+      sin_dlambda = sin ((lambda2 - lambda1) / 2)
+      hav = sin_dphi * sin_dphi \
+         + cos_phi1 * cos_phi2 * sin_dlambda * sin_dlambda
+      if hav > 1.0:
+         hav = 1.0
+      distances.append (2 * earth_radius_km * asin (sqrt (hav)))
+   return distances
+
+
+def iterHaversineMatrix (points1, points2, chunk_size):
+   """
+     Iterate over the distance matrix (see haversineMatrix()) by blocks
+     of (at most) chunk_size rows, yielding (first row index, block)
+     tuples, so that the whole matrix is never held in memory
+   """
+   for start in range (0, len (points1), chunk_size):
+      yield (start, haversineMatrix (points1.slice (start, start + chunk_size),
+                                     points2))
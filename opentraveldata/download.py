@@ -0,0 +1,185 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import json
+import shutil
+import urllib.request
+import urllib.error
+from .compression import compressionOfFile, compression_extensions, \
+   openCompressedFile, decompressingReader
+
+# Download of the OPTD data files, with:
+# - conditional requests: the ETag and Last-Modified headers of the last
+#   download are kept in a metadata file next to the data file
+#   (<data-file>.meta), and sent back (If-None-Match/If-Modified-Since),
+#   so that an unchanged file is not downloaded again (HTTP 304)
+# - resumable transfers: the data is first written into a partial file
+#   (<data-file>.part), along with its own metadata file. If a transfer is
+#   interrupted, the next one asks (Range/If-Range) only for the missing
+#   bytes, provided that the remote file has not changed in the meantime
+# - atomic updates: the partial file is renamed into the data file once
+#   complete, so that readers never see a partially downloaded data file
+# - optional compression: when the name of the data file ends with
+#   the extension of a compression (e.g., .gz, see the compression module),
+#   the data is compressed while it is downloaded. The transfer itself
+#   is then compressed (gzip content encoding) when the server supports
+#   it. A compressed stream cannot be resumed at a given (uncompressed)
+#   offset, so that interrupted transfers are restarted in that case
+download_chunk_size = 1 << 16
+
+# Outcomes of downloadFile()
+download_status_downloaded = 'downloaded'
+download_status_resumed = 'resumed'
+download_status_not_modified = 'not-modified'
+
+
+def downloadMetaFilepath (filepath):
+   """
+     File-path of the metadata file (ETag, Last-Modified) of a data file
+   """
+   return f"{filepath}.meta"
+
+
+def downloadPartialFilepath (filepath):
+   """
+     File-path of the partial (being downloaded) file of a data file.
+     It keeps the extension of the compression, if any, of the data file
+   """
+   extension = compression_extensions[compressionOfFile (filepath)]
+   root = filepath[:len (filepath) - len (extension)]
+   return f"{root}.part{extension}"
+
+
+def downloadFilepaths (filepath):
+   """
+     File-paths of the files, derived from a data file, used when
+     downloading it
+   """
+   partial_filepath = downloadPartialFilepath (filepath)
+   return (downloadMetaFilepath (filepath), partial_filepath,
+           downloadMetaFilepath (partial_filepath))
+
+
+def readDownloadMeta (meta_filepath, url):
+   """
+     Read the metadata of a previous download of the given URL.
+     An empty dictionary is returned when there is no (usable) metadata.
+   """
+   try:
+      with open (meta_filepath) as meta_file:
+         meta = json.load (meta_file)
+   except (OSError, ValueError):
+      return dict()
+   if not isinstance (meta, dict) or meta.get ('url') != url:
+      return dict()
+   return meta
+
+
+def writeDownloadMeta (meta_filepath, url, response):
+   """
+     Write the metadata (validators) of a download, taken from the headers
+     of the HTTP response
+   """
+   meta = {'url': url, 'etag': response.headers.get ('ETag'),
+           'last_modified': response.headers.get ('Last-Modified')}
+   tmp_filepath = f"{meta_filepath}.{os.getpid()}.tmp"
+   with open (tmp_filepath, 'w') as meta_file:
+      json.dump (meta, meta_file)
+   os.replace (tmp_filepath, meta_filepath)
+   return
+
+
+def removeFile (filepath):
+   if os.path.isfile (filepath):
+      os.remove (filepath)
+   return
+
+
+def downloadFile (url, filepath, timeout = None):
+   """
+     Download a remote file (URL) into a local file, conditionally
+     and resuming any previous interrupted transfer (see above).
+     Return the outcome, i.e., one of download_status_downloaded,
+     download_status_resumed and download_status_not_modified.
+     The errors (urllib.error.URLError, OSError) are propagated.
+   """
+   (meta_filepath, partial_filepath, partial_meta_filepath) = \
+      downloadFilepaths (filepath)
+   compression = compressionOfFile (filepath)
+
+   request_headers = dict()
+   if compression is not None:
+      request_headers['Accept-Encoding'] = 'gzip'
+
+   partial_size = 0
+   partial_meta = readDownloadMeta (partial_meta_filepath, url)
+   partial_validator = partial_meta.get ('etag') \
+      or partial_meta.get ('last_modified')
+   if compression is None and os.path.isfile (partial_filepath) \
+      and partial_validator:
+      # Resume the interrupted transfer, only if the remote file
+      # is still the same one (otherwise, the whole file is sent)
+      partial_size = os.path.getsize (partial_filepath)
+      request_headers['Range'] = f"bytes={partial_size}-"
+      request_headers['If-Range'] = partial_validator
+   elif os.path.isfile (filepath):
+      # Download the remote file only if it has changed
+      meta = readDownloadMeta (meta_filepath, url)
+      if meta.get ('etag'):
+         request_headers['If-None-Match'] = meta['etag']
+      if meta.get ('last_modified'):
+         request_headers['If-Modified-Since'] = meta['last_modified']
+
+   request = urllib.request.Request (url, headers = request_headers)
+   try:
+      response = urllib.request.urlopen (request, timeout = timeout)
+   except urllib.error.HTTPError as err:
+      if err.code == 304:
+         return download_status_not_modified
+      if err.code == 416 and partial_size:
+         # The partial file does not match the remote file any longer
+         removeFile (partial_filepath)
+         removeFile (partial_meta_filepath)
+         return downloadFile (url, filepath, timeout)
+      raise
+
+   with response:
+      download_status = download_status_downloaded
+      open_mode = 'wb'
+      content_range = response.headers.get ('Content-Range', '')
+      if response.status == 206 and partial_size \
+         and content_range.startswith (f"bytes {partial_size}-"):
+         download_status = download_status_resumed
+         open_mode = 'ab'
+      elif response.status != 200:
+         raise urllib.error.HTTPError (url, response.status,
+                                       "Unexpected HTTP status",
+                                       response.headers, None)
+
+      # The validators are recorded before the transfer, so that it may be
+      # resumed if interrupted
+      if open_mode == 'wb':
+         writeDownloadMeta (partial_meta_filepath, url, response)
+
+      # A gzip-encoded transfer is stored as is into a gzip-compressed
+      # file. Otherwise, the transfer is decoded, and then compressed
+      # if need be
+      content_encoding = response.headers.get ('Content-Encoding')
+      if compression == 'gzip' and content_encoding in ('gzip', 'x-gzip'):
+         partial_file = open (partial_filepath, open_mode)
+         response_reader = response
+      else:
+         partial_file = openCompressedFile (partial_filepath, open_mode)
+         response_reader = decompressingReader (response, content_encoding)
+      with partial_file:
+         shutil.copyfileobj (response_reader, partial_file,
+                             download_chunk_size)
+
+   # The data file is atomically replaced by the complete file
+   os.replace (partial_filepath, filepath)
+   os.replace (partial_meta_filepath, meta_filepath)
+
+   #
+   return download_status
@@ -0,0 +1,204 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+from .porstore import por_fields, por_list_fields, splitPORListField
+
+# Typed, column-oriented export of the POR records, to NumPy, pandas
+# or Arrow. Those libraries are optional: they are imported only when
+# the corresponding export is asked for.
+#
+# The POR records are first converted, once, into typed columns
+# (see typedPORColumns()):
+# - numeric fields, into arrays (array module) of 64-bit floats or integers
+# - categorical fields (few distinct values), into dictionary-encoded
+#   columns, i.e., an array of 32-bit integer codes and the list of the
+#   distinct values (categories)
+# - list fields, into lists of lists of strings
+# - other fields, into lists of strings
+# The exports then wrap the buffers of those arrays, without copying them.
+
+# Numeric fields, with their array type codes ('d' for 64-bit floats,
+# 'q' for 64-bit integers). Missing floats are NaN, missing Geonames IDs 0
+por_numeric_fields = {'geoname_id': 'q', 'latitude': 'd', 'longitude': 'd',
+                      'page_rank': 'd'}
+
+# Categorical fields, dictionary-encoded
+por_categorical_fields = ('location_type', 'envelope_id', 'country_code',
+                          'country_name', 'adm1_code', 'adm1_name_utf')
+
+# Type codes of the arrays, and the corresponding NumPy and Arrow types
+array_numpy_types = {'d': 'float64', 'q': 'int64', 'i': 'int32'}
+array_arrow_types = {'d': 'float64', 'q': 'int64', 'i': 'int32'}
+
+
+class DictionaryColumn():
+   """
+   Dictionary-encoded column: the i-th value is categories[codes[i]]
+   """
+   codes = None
+   categories = None
+
+   def __init__ (self, codes, categories):
+      self.codes = codes
+      self.categories = categories
+
+   def __len__ (self):
+      return len (self.codes)
+
+   def __getitem__ (self, idx):
+      return self.categories[self.codes[idx]]
+
+
+def parseFloat (value_str):
+   try:
+      return float (value_str)
+   except ValueError:
+      return float ('nan')
+
+
+def parseInt (value_str):
+   try:
+      return int (value_str)
+   except ValueError:
+      return 0
+
+
+def storeColumn (store, field, row_ids):
+   """
+     Retrieve the raw values (strings) of a field, for the given row IDs
+   """
+   columns = getattr (store, 'columns', None)
+   if columns is None:
+      # Memory-mapped store
+      return [store.rawValue (row_id, field) for row_id in row_ids]
+
+   column = columns[field]
+   if len (row_ids) == len (column):
+      return column
+   return [column[row_id] for row_id in row_ids]
+
+
+def typedPORColumns (store, fields = None):
+   """
+     Convert the (not removed) POR records of a POR store into typed
+     columns (see above), by field name. By default, all the fields
+     (those of the por_fields tuple) are converted.
+   """
+   if fields is None:
+      fields = por_fields
+   row_ids = list (store.rowIDs())
+
+   typed_columns = dict()
+   for field in fields:
+      if not field in por_fields:
+         raise KeyError (f"Unknown POR field: {field}")
+      values = storeColumn (store, field, row_ids)
+
+      if field in por_numeric_fields:
+         type_code = por_numeric_fields[field]
+         parse_value = parseFloat if type_code == 'd' else parseInt
+         typed_columns[field] = array.array (type_code,
+                                             map (parse_value, values))
+
+      elif field in por_categorical_fields:
+         category_codes = dict()
+         codes = array.array ('i', [category_codes.setdefault (
+            value, len (category_codes)) for value in values])
+         typed_columns[field] = DictionaryColumn (codes, list (category_codes))
+
+      elif field in por_list_fields:
+         typed_columns[field] = [splitPORListField (field, value)
+                                 for value in values]
+
+      else:
+         typed_columns[field] = list (values)
+
+   return typed_columns
+
+
+def importOptional (module_name, package_name):
+   """
+     Import an optional module, with a hint when it is not installed
+   """
+   try:
+      return __import__ (module_name)
+   except ImportError:
+      raise ImportError (f"That export requires the {package_name} " \
+                         f"package (pip install {package_name})")
+
+
+def columnsToNumPy (typed_columns):
+   """
+     Convert typed columns into NumPy arrays, by field name. Numeric
+     columns share the buffers of the typed columns. Dictionary-encoded
+     columns become (codes, categories) tuples of arrays, and the other
+     ones arrays of Python objects.
+   """
+   numpy = importOptional ('numpy', 'numpy')
+
+   numpy_columns = dict()
+   for field, column in typed_columns.items():
+      if isinstance (column, array.array):
+         numpy_columns[field] = numpy.frombuffer (
+            column, dtype = array_numpy_types[column.typecode])
+      elif isinstance (column, DictionaryColumn):
+         numpy_columns[field] = (
+            numpy.frombuffer (column.codes,
+                              dtype = array_numpy_types[column.codes.typecode]),
+            numpy.array (column.categories, dtype = object))
+      else:
+         numpy_column = numpy.empty (len (column), dtype = object)
+         numpy_column[:] = column
+         numpy_columns[field] = numpy_column
+
+   return numpy_columns
+
+
+def columnsToPandas (typed_columns):
+   """
+     Convert typed columns into a pandas DataFrame. Numeric columns share
+     the buffers of the typed columns, and dictionary-encoded columns
+     become pandas Categorical columns.
+   """
+   pandas = importOptional ('pandas', 'pandas')
+
+   data_dict = dict()
+   for field, numpy_column in columnsToNumPy (typed_columns).items():
+      if isinstance (numpy_column, tuple):
+         (codes, categories) = numpy_column
+         numpy_column = pandas.Categorical.from_codes (codes, categories)
+      data_dict[field] = numpy_column
+
+   return pandas.DataFrame (data_dict, copy = False)
+
+
+def columnsToArrow (typed_columns):
+   """
+     Convert typed columns into an Arrow table. Numeric columns share
+     the buffers of the typed columns, dictionary-encoded columns become
+     Arrow dictionary arrays and list columns Arrow list arrays.
+   """
+   pyarrow = importOptional ('pyarrow', 'pyarrow')
+
+   def arrayToArrow (column):
+      arrow_type = getattr (pyarrow, array_arrow_types[column.typecode])()
+      return pyarrow.Array.from_buffers (arrow_type, len (column),
+                                         [None, pyarrow.py_buffer (column)])
+
+   arrow_columns = dict()
+   for field, column in typed_columns.items():
+      if isinstance (column, array.array):
+         arrow_columns[field] = arrayToArrow (column)
+      elif isinstance (column, DictionaryColumn):
+         arrow_columns[field] = pyarrow.DictionaryArray.from_arrays (
+            arrayToArrow (column.codes),
+            pyarrow.array (column.categories, type = pyarrow.string()))
+      elif field in por_list_fields:
+         arrow_columns[field] = pyarrow.array (
+            column, type = pyarrow.list_ (pyarrow.string()))
+      else:
+         arrow_columns[field] = pyarrow.array (column, type = pyarrow.string())
+
+   return pyarrow.table (arrow_columns)
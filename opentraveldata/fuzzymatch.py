@@ -0,0 +1,248 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+import math
+import heapq
+import collections
+import concurrent.futures
+from .loctype import parseLocationType
+from .nameindex import normalizeName, splitAltNameSection
+
+# Approximate (typo-tolerant) matching of free-text names to the POR
+# records. The (normalized) names of the POR are indexed by their
+# character trigrams, into an inverted index. The similarity between
+# two names is the Jaccard index of their sets of trigrams.
+#
+# For a minimum similarity s, a name matching a query having n trigrams
+# shares at least t = ceil (s * n) trigrams with it. Any such name then
+# appears in at least one of the (n - t + 1) shortest posting lists of the
+# trigrams of the query (prefix filtering), so that only those lists are
+# scanned to find the candidates. The number of trigrams of a candidate
+# has moreover to be between s * n and n / s (length filtering). The
+# trigrams shared with the remaining (longest, i.e., most frequent)
+# trigrams are then counted by intersecting their posting lists with the
+# candidates.
+
+
+def nameTrigrams (normalized_name):
+   """
+     Set of the character trigrams of a normalized name, which is padded
+     with spaces so that its first and last characters weigh as much
+     as the others (e.g., 'nice' -> ' ni', 'nic', 'ice', 'ce ')
+   """
+   padded_name = f" {normalized_name} "
+   return {padded_name[idx:idx + 3] for idx in range (len (padded_name) - 2)}
+
+
+class PORFuzzyNameIndex():
+   """
+   Trigram inverted index of the names (name, ASCII name and alternate
+   names) of the (current) POR records of a POR store, for approximate
+   matching (see the module documentation)
+   """
+   names = None
+   name_row_ids = None
+   name_sizes = None
+   postings = None
+   ranks = None
+   flags = None
+   country_codes = None
+
+   def __init__ (self, store):
+      """
+        store: a POR store (in-memory or memory-mapped)
+      """
+      self.names = []
+      self.name_row_ids = array.array ('I')
+      self.name_sizes = array.array ('H')
+      self.ranks = dict()
+      self.flags = dict()
+      self.country_codes = dict()
+
+      posting_lists = dict()
+      for row_id in store.rowIDs():
+         # Historical POR (with an envelope ID) are not indexed
+         if store.value (row_id, 'envelope_id') != '':
+            continue
+         try:
+            self.ranks[row_id] = float (store.value (row_id, 'page_rank'))
+         except ValueError:
+            self.ranks[row_id] = 0.0
+         self.flags[row_id] = parseLocationType (store.value (row_id,
+                                                             'location_type'))
+         self.country_codes[row_id] = store.value (row_id, 'country_code')
+
+         name_list = [store.value (row_id, 'name'),
+                      store.value (row_id, 'asciiname')]
+         name_list.extend (alt_name for (_, alt_name) in splitAltNameSection (
+            store.value (row_id, 'alt_name_section')))
+         normalized_names = set()
+         for name in name_list:
+            normalized_name = normalizeName (name)
+            if normalized_name == '' or normalized_name in normalized_names:
+               continue
+            normalized_names.add (normalized_name)
+
+            name_id = len (self.names)
+            self.names.append (name)
+            self.name_row_ids.append (row_id)
+            trigrams = nameTrigrams (normalized_name)
+            self.name_sizes.append (min (len (trigrams), 0xffff))
+            for trigram in trigrams:
+               posting_list = posting_lists.get (trigram)
+               if posting_list is None:
+                  posting_list = []
+                  posting_lists[trigram] = posting_list
+               posting_list.append (name_id)
+
+      # The name IDs of the posting lists are sorted, as the names
+      # have been added in that order
+      self.postings = {trigram: array.array ('I', posting_list)
+                       for trigram, posting_list in posting_lists.items()}
+
+   def __len__ (self):
+      return len (self.names)
+
+   def match (self, name, k = 5, min_score = 0.3, country_code = None,
+              loc_type_flags = None):
+      """
+        Return the (up to) k POR the names of which are the most similar
+        to the given name, with a similarity of at least min_score (between
+        0 and 1), as a list of (score, matched name, row ID) tuples, sorted
+        by decreasing score (and then PageRank).
+
+        country_code: when given, the country to which the POR are
+        restricted
+        loc_type_flags: when given, LocationType bit flags or OPTD location
+        type string, restricting the POR to those having any of those
+        location types
+      """
+      if isinstance (loc_type_flags, str):
+         loc_type_flags = parseLocationType (loc_type_flags)
+      normalized_name = normalizeName (name)
+      if normalized_name == '' or k <= 0:
+         return []
+
+      # Trigrams of the query, the rarest first
+      empty_posting_list = array.array ('I')
+      query_trigrams = sorted (nameTrigrams (normalized_name),
+                               key = lambda trigram: len (
+                                  self.postings.get (trigram,
+                                                     empty_posting_list)))
+      n_trigrams = len (query_trigrams)
+      min_score = max (min_score, 1e-6)
+      min_overlap = math.ceil (min_score * n_trigrams - 1e-9)
+      n_prefix_trigrams = n_trigrams - min_overlap + 1
+      min_size = min_score * n_trigrams
+      max_size = n_trigrams / min_score
+
+      # Candidates, from the posting lists of the rarest trigrams
+      # (counted by the C implementation of Counter)
+      postings = self.postings
+      overlaps = collections.Counter()
+      for trigram in query_trigrams[:n_prefix_trigrams]:
+         overlaps.update (postings.get (trigram, empty_posting_list))
+
+      # Length filtering, and filters
+      name_sizes, name_row_ids = self.name_sizes, self.name_row_ids
+      candidate_ids = {name_id for name_id in overlaps
+                       if min_size <= name_sizes[name_id] <= max_size}
+      if country_code is not None or loc_type_flags is not None:
+         country_codes, flags = self.country_codes, self.flags
+         candidate_ids = {name_id for name_id in candidate_ids
+                          if (country_code is None or country_codes[
+                             name_row_ids[name_id]] == country_code)
+                          and (loc_type_flags is None or flags[
+                             name_row_ids[name_id]] & loc_type_flags)}
+
+      # Trigrams shared with the most frequent trigrams of the query:
+      # their posting lists are intersected with the candidates
+      overlaps = collections.Counter ({name_id: overlaps[name_id]
+                                       for name_id in candidate_ids})
+      for trigram in query_trigrams[n_prefix_trigrams:]:
+         posting_list = postings.get (trigram)
+         if posting_list is not None:
+            overlaps.update (candidate_ids.intersection (posting_list))
+
+      # The candidates are scored by decreasing overlap. The score of a
+      # candidate is at most its overlap divided by the number of trigrams
+      # of the query, so that the remaining candidates may be skipped once
+      # k POR have a greater score. The first scores of the POR are kept
+      # in a heap, the k-th greatest of which is a lower bound of the
+      # k-th greatest score
+      best_scores = dict()
+      score_heap = []
+      kth_best_score = min_score
+      for name_id, overlap in overlaps.most_common():
+         if overlap < min_overlap or overlap / n_trigrams < kth_best_score:
+            break
+         score = overlap / (n_trigrams + name_sizes[name_id] - overlap)
+         if score < kth_best_score:
+            continue
+
+         # Best matching name of each POR
+         row_id = name_row_ids[name_id]
+         best_score = best_scores.get (row_id)
+         if best_score is None:
+            heapq.heappush (score_heap, score)
+            if len (score_heap) > k:
+               heapq.heappop (score_heap)
+            if len (score_heap) == k:
+               kth_best_score = max (min_score, score_heap[0])
+         if best_score is None or score > best_score[0]:
+            best_scores[row_id] = (score, name_id)
+
+      ranks = self.ranks
+      top_list = heapq.nlargest (
+         k, best_scores.items(),
+         key = lambda item: (item[1][0], ranks[item[0]], -item[0]))
+      return [(score, self.names[name_id], row_id)
+              for row_id, (score, name_id) in top_list]
+
+   def matchBatch (self, names, k = 5, min_score = 0.3, country_code = None,
+                   loc_type_flags = None, workers = 1):
+      """
+        Batch version of match(), for a sequence of names. Each distinct
+        (normalized) name is matched once. When workers is greater than 1,
+        the names are matched by that many processes, each one receiving
+        a copy of the index, which is worth it only for large batches
+        (e.g., millions of names, matched offline).
+      """
+      normalized_name_list = [normalizeName (name) for name in names]
+      distinct_name_list = list (dict.fromkeys (normalized_name_list))
+      match_args = (k, min_score, country_code, loc_type_flags)
+
+      if workers > 1 and len (distinct_name_list) > 1:
+         chunk_size = max (1, math.ceil (len (distinct_name_list)
+                                         / (workers * 4)))
+         chunk_list = [distinct_name_list[idx:idx + chunk_size]
+                       for idx in range (0, len (distinct_name_list),
+                                         chunk_size)]
+         with concurrent.futures.ProcessPoolExecutor (
+               max_workers = workers, initializer = setWorkerFuzzyNameIndex,
+               initargs = (self,)) as executor:
+            match_lists = [match_list for chunk_match_lists in executor.map (
+               matchChunkInWorker, chunk_list, [match_args] * len (chunk_list))
+                           for match_list in chunk_match_lists]
+      else:
+         match_lists = [self.match (name, *match_args)
+                        for name in distinct_name_list]
+
+      match_list_dict = dict (zip (distinct_name_list, match_lists))
+      return [match_list_dict[name] for name in normalized_name_list]
+
+
+# Index of the worker processes of matchBatch()
+worker_fuzzy_name_index = None
+
+
+def setWorkerFuzzyNameIndex (fuzzy_name_index):
+   global worker_fuzzy_name_index
+   worker_fuzzy_name_index = fuzzy_name_index
+
+
+def matchChunkInWorker (name_list, match_args):
+   return [worker_fuzzy_name_index.match (name, *match_args)
+           for name in name_list]
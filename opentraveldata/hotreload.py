@@ -0,0 +1,114 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import threading
+import concurrent.futures
+from .opentraveldata import OpenTravelData
+from .porstore import por_index_names
+
+
+class HotReloadingOpenTravelData():
+   """
+   Hot-reloading holder of OpenTravelData, for threaded servers.
+
+   The POR data is held by a complete OpenTravelData object, the POR
+   dictionaries (and the graph of the serving POR) of which are all built
+   before that object is published. A reload builds a new such object
+   in a background thread and then publishes it with a single reference
+   assignment, which is atomic. The published objects are never modified
+   afterwards, but for the structures built on first use (e.g., the spatial
+   index, the UN/LOCODE POR file dictionaries): those are built under the
+   lock of the OpenTravelData object, and set only once complete. Hence,
+   the reader threads never see a partially built structure, and only
+   block while waiting for such a first-use build. Both the old and the
+   new POR data are held in memory while a reload is in progress.
+
+   The OpenTravelData methods may be called on the holder itself
+   (e.g., holder.getServingPORList ('IEV')): each call is then answered
+   by the POR data published at the time of that call. A reader needing
+   several consistent lookups should rather get that POR data once,
+   with current().
+   """
+   optd = None
+   optd_kwargs = None
+   index_names = None
+   reload_executor = None
+   reload_listeners = None
+
+   def __init__ (self, index_names = por_index_names, **kwargs):
+      """
+        index_names: the POR dictionaries to build before publishing
+        the POR data (by default, all of them)
+        kwargs: the keyword arguments of the OpenTravelData objects
+        (e.g., local_dir)
+
+        The POR data is first loaded synchronously.
+      """
+      self.optd_kwargs = kwargs
+      self.index_names = tuple (index_names)
+      self.reload_executor = concurrent.futures.ThreadPoolExecutor (
+         max_workers = 1, thread_name_prefix = 'optd-reload')
+      self.reload_listeners = []
+      self.optd = self.buildPORData (refresh = False)
+
+   def __getattr__ (self, name):
+      # Only called for the attributes not defined by the holder itself
+      return getattr (self.optd, name)
+
+   def current (self):
+      """
+        Retrieve the currently published POR data, as an OpenTravelData
+        object, which is not to be modified
+      """
+      return self.optd
+
+   def addReloadListener (self, listener):
+      """
+        Register a callable, called with the old and the new
+        OpenTravelData objects, once a reload has been published
+      """
+      self.reload_listeners.append (listener)
+      return
+
+   def buildPORData (self, refresh):
+      """
+        Build a complete OpenTravelData object, the data files having
+        been downloaded again first if they have changed (when refresh
+        is True)
+      """
+      optd = OpenTravelData (**self.optd_kwargs)
+      optd.downloadFilesIfNeeded (refresh)
+      optd.extractPORSubsetFromOPTD (self.index_names)
+      return optd
+
+   def reloadPORData (self, refresh = True):
+      """
+        Build the POR data again in a background thread, and publish
+        it once complete (see the class documentation). The reloads are
+        serialized. Return a future, which result is the newly published
+        OpenTravelData object.
+      """
+      return self.reload_executor.submit (self.buildAndPublishPORData,
+                                          refresh)
+
+   def buildAndPublishPORData (self, refresh):
+      optd = self.buildPORData (refresh)
+
+      # Atomic swap of the published POR data
+      old_optd = self.optd
+      self.optd = optd
+      if optd.verbose:
+         print ("[HotReloadingOpenTravelData::reloadPORData] POR data " \
+                "reloaded and published")
+
+      for listener in self.reload_listeners:
+         listener (old_optd, optd)
+      return optd
+
+   def close (self):
+      """
+        Release the reload thread, once the pending reloads are done
+      """
+      self.reload_executor.shutdown (wait = True)
+      return
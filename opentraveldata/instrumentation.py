@@ -0,0 +1,224 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import bisect
+import threading
+import time
+
+# Upper bounds (in seconds) of the buckets of the histograms of the
+# durations, from the lookups (microseconds) to the downloads (minutes)
+default_duration_buckets = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4,
+                            2.5e-4, 5e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0, 60.0)
+
+
+def labelKey (labels):
+   """
+     Hashable (and ordered) form of a dictionary of labels
+   """
+   return tuple (sorted (labels.items()))
+
+
+def formatLabels (label_key, extra_labels = ()):
+   """
+     Prometheus form of labels, e.g., '{method="getPORByGeoID",result="hit"}'
+   """
+   label_list = [f'{name}="{escapeLabelValue (value)}"'
+                 for (name, value) in label_key + tuple (extra_labels)]
+   if not label_list:
+      return ''
+   return '{' + ','.join (label_list) + '}'
+
+
+def escapeLabelValue (value):
+   return str (value).replace ('\\', '\\\\').replace ('"', '\\"') \
+                     .replace ('\n', '\\n')
+
+
+def formatValue (value):
+   if value == float ('inf'):
+      return '+Inf'
+   return repr (float (value)) if isinstance (value, float) else str (value)
+
+
+class Span():
+   """
+   Timing span, as a context manager: its duration is recorded, into
+   the histogram of the given name and labels, when it exits (even
+   on an exception)
+   """
+   instrumentation = None
+   name = None
+   labels = None
+   start_time = None
+
+   def __init__ (self, instrumentation, name, labels):
+      self.instrumentation = instrumentation
+      self.name = name
+      self.labels = labels
+
+   def __enter__ (self):
+      self.start_time = time.perf_counter()
+      return self
+
+   def __exit__ (self, exc_type, exc_value, traceback):
+      self.instrumentation.observe (self.name,
+                                    time.perf_counter() - self.start_time,
+                                    **self.labels)
+      return False
+
+
+class Instrumentation():
+   """
+   Collector of the metrics of OpenTravelData objects (see the
+   instrumentation parameter of OpenTravelData):
+    * the durations of timing spans (e.g., downloads, parsing, lookups),
+      as histograms, named '<prefix><name>_seconds';
+    * counters (e.g., rows parsed, lookup hits and misses, snapshot hits),
+      named '<prefix><name>';
+    * gauges (e.g., the number of entries of the POR dictionaries).
+   Each metric is identified by its name and labels (keyword arguments).
+
+   The metrics may be exported in the Prometheus text format (see
+   prometheusText()), e.g., from the /metrics endpoint of a server, and/or
+   forwarded, as they are recorded, to a callback, called with the kind
+   of metric ('span', 'counter' or 'gauge'), its name, its value (the
+   duration, in seconds, for the spans; the increment, for the counters)
+   and its labels (a dictionary).
+
+   The recording is thread-safe. An OpenTravelData object without
+   instrumentation only checks, on its lookup paths, that it has none.
+   """
+   prefix = 'optd_'
+   buckets = default_duration_buckets
+   callback = None
+   lock = None
+   histograms = None
+   counters = None
+   gauges = None
+
+   def __init__ (self, callback = None, prefix = 'optd_',
+                 buckets = default_duration_buckets):
+      self.callback = callback
+      self.prefix = prefix
+      self.buckets = tuple (sorted (buckets))
+      self.lock = threading.Lock()
+      self.reset()
+
+   def reset (self):
+      """
+        Forget all the metrics recorded so far
+      """
+      with self.lock:
+         # Bucket counts (the last one for +Inf), count and sum
+         # of the durations, by (name, label key)
+         self.histograms = dict()
+         self.counters = dict()
+         self.gauges = dict()
+      return
+
+   def span (self, name, **labels):
+      """
+        Timing span of the given name and labels (see Span)
+      """
+      return Span (self, name, labels)
+
+   def observe (self, name, duration, **labels):
+      """
+        Record the duration (in seconds) of a span
+      """
+      key = (name, labelKey (labels))
+      bucket_idx = bisect.bisect_left (self.buckets, duration)
+      with self.lock:
+         histogram = self.histograms.get (key)
+         if histogram is None:
+            histogram = [[0] * (len (self.buckets) + 1), 0, 0.0]
+            self.histograms[key] = histogram
+         histogram[0][bucket_idx] += 1
+         histogram[1] += 1
+         histogram[2] += duration
+      if self.callback is not None:
+         self.callback ('span', name, duration, labels)
+      return
+
+   def count (self, name, value = 1, **labels):
+      """
+        Increment a counter
+      """
+      key = (name, labelKey (labels))
+      with self.lock:
+         self.counters[key] = self.counters.get (key, 0) + value
+      if self.callback is not None:
+         self.callback ('counter', name, value, labels)
+      return
+
+   def setGauge (self, name, value, **labels):
+      """
+        Set the value of a gauge
+      """
+      key = (name, labelKey (labels))
+      with self.lock:
+         self.gauges[key] = value
+      if self.callback is not None:
+         self.callback ('gauge', name, value, labels)
+      return
+
+   def counterValue (self, name, **labels):
+      """
+        Current value of a counter (0 when never incremented)
+      """
+      with self.lock:
+         return self.counters.get ((name, labelKey (labels)), 0)
+
+   def spanStats (self, name, **labels):
+      """
+        Number and total duration (in seconds) of the spans of the given
+        name and labels
+      """
+      with self.lock:
+         histogram = self.histograms.get ((name, labelKey (labels)))
+         if histogram is None:
+            return (0, 0.0)
+         return (histogram[1], histogram[2])
+
+   def prometheusText (self):
+      """
+        Export the metrics in the Prometheus text exposition format
+      """
+      with self.lock:
+         histogram_list = sorted ((key, ([*histogram[0]],) + tuple (
+            histogram[1:])) for key, histogram in self.histograms.items())
+         counter_list = sorted (self.counters.items())
+         gauge_list = sorted (self.gauges.items())
+
+      line_list = []
+      bound_list = [formatValue (bound) for bound in self.buckets] + ['+Inf']
+      type_line_set = set()
+      for ((name, label_key), (bucket_counts, count, duration_sum)) \
+          in histogram_list:
+         metric_name = f"{self.prefix}{name}_seconds"
+         if not metric_name in type_line_set:
+            type_line_set.add (metric_name)
+            line_list.append (f"# TYPE {metric_name} histogram")
+         cumulative_count = 0
+         for (bound, bucket_count) in zip (bound_list, bucket_counts):
+            cumulative_count += bucket_count
+            line_list.append (f"{metric_name}_bucket" \
+                              f"{formatLabels (label_key, (('le', bound),))} "
+                              f"{cumulative_count}")
+         line_list.append (f"{metric_name}_sum{formatLabels (label_key)} " \
+                           f"{formatValue (duration_sum)}")
+         line_list.append (f"{metric_name}_count{formatLabels (label_key)} " \
+                           f"{count}")
+
+      for (metric_type, metric_list) in (('counter', counter_list),
+                                         ('gauge', gauge_list)):
+         for ((name, label_key), value) in metric_list:
+            metric_name = f"{self.prefix}{name}"
+            if not metric_name in type_line_set:
+               type_line_set.add (metric_name)
+               line_list.append (f"# TYPE {metric_name} {metric_type}")
+            line_list.append (f"{metric_name}{formatLabels (label_key)} " \
+                              f"{formatValue (value)}")
+
+      return '\n'.join (line_list) + '\n'
@@ -0,0 +1,102 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+import enum
+import functools
+
+
+class LocationType (enum.IntFlag):
+   """
+   Location types of the POR (points of reference), as bit flags.
+   In OPTD, the location type is a string of one or several letters
+   (e.g., 'C' for a city, 'A' for an airport, 'CA' for both)
+   """
+   CITY = enum.auto()
+   AIRPORT = enum.auto()
+   HELIPORT = enum.auto()
+   PORT = enum.auto()
+   RAILWAY_STATION = enum.auto()
+   BUS_STATION = enum.auto()
+   OFFLINE = enum.auto()
+
+   # Serving POR wrt travel or transport
+   TRANSPORT_RELATED = AIRPORT | HELIPORT | PORT | RAILWAY_STATION \
+      | BUS_STATION | OFFLINE
+
+
+# Letters of the OPTD location types
+loc_type_letters = {'C': LocationType.CITY, 'A': LocationType.AIRPORT,
+                    'H': LocationType.HELIPORT, 'P': LocationType.PORT,
+                    'R': LocationType.RAILWAY_STATION,
+                    'B': LocationType.BUS_STATION, 'O': LocationType.OFFLINE}
+
+
+@functools.lru_cache (maxsize = None)
+def parseLocationType (loc_type):
+   """
+     Parse an OPTD location type string (e.g., 'CA') into bit flags.
+     There are only a few distinct location types, so that each of them
+     is parsed only once. Unknown letters are ignored.
+   """
+   loc_type_flags = LocationType (0)
+   for letter in loc_type:
+      loc_type_flags |= loc_type_letters.get (letter, LocationType (0))
+   return loc_type_flags
+
+
+class PORTypeIndex():
+   """
+   Index of the POR records of a POR store by location type and country.
+   The location type flags of all the POR records are stored in a single
+   array (by row ID), and the row IDs are grouped by country code, so
+   that filtering by location type (and country) is a scan of integers,
+   without any string parsing.
+   """
+   flags = None
+   country_row_ids = None
+   current_row_ids = None
+
+   def __init__ (self, store):
+      """
+        store: a POR store (in-memory or memory-mapped)
+      """
+      self.flags = array.array ('H')
+      self.country_row_ids = dict()
+      self.current_row_ids = array.array ('I')
+
+      # The flags are stored for all the rows, so that they may be
+      # accessed by row ID
+      for row_id in range (len (store)):
+         self.flags.append (parseLocationType (store.value (row_id,
+                                                            'location_type')))
+
+      # Only the current POR (i.e., not removed, nor historical ones,
+      # with an envelope ID) are indexed by country
+      for row_id in store.rowIDs():
+         if store.value (row_id, 'envelope_id') != '':
+            continue
+         self.current_row_ids.append (row_id)
+         country_code = store.value (row_id, 'country_code')
+         if not country_code in self.country_row_ids:
+            self.country_row_ids[country_code] = array.array ('I')
+         self.country_row_ids[country_code].append (row_id)
+
+   def rowIDs (self, loc_type_flags, country_code = None, match_all = False):
+      """
+        Return the row IDs of the current POR records having any (or,
+        when match_all is True, all) of the given location type flags,
+        optionally in a given country
+      """
+      if country_code is None:
+         row_ids = self.current_row_ids
+      else:
+         row_ids = self.country_row_ids.get (country_code, ())
+
+      flags = self.flags
+      loc_type_flags = int (loc_type_flags)
+      if match_all:
+         return [row_id for row_id in row_ids
+                 if flags[row_id] & loc_type_flags == loc_type_flags]
+      return [row_id for row_id in row_ids if flags[row_id] & loc_type_flags]
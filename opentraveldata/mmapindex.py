@@ -0,0 +1,393 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import mmap
+import struct
+import bisect
+import collections.abc
+try:
+   import fcntl
+except ImportError:
+   # On non-POSIX platforms, the build of the index is not serialized
+   # across processes. The atomic rename still guarantees that readers
+   # never see a partially written index
+   fcntl = None
+from .porstore import PORRecord, por_fields, por_list_fields, \
+   splitPORListField
+from .snapshot import sourceFileKey
+
+# Memory-mappable index of the POR (points of reference). The file,
+# once mapped, is shared (through the page cache) by all the processes
+# mapping it. It is made of:
+# - a header: magic string, format version, number of POR records,
+#   key of the source (CSV) file and table of the sections
+# - the offsets of the POR records (one unsigned 64-bit integer
+#   per record, plus one for the end of the last record)
+# - the POR records. Each record starts with the offsets of its fields
+#   (unsigned 32-bit integers, relative to the end of that offset
+#   table), followed by the
+#   UTF-8 encoded values of those fields
+# - one section per index (IATA, UN/LOCODE and Geonames ID). Each index
+#   section is a table of entries sorted by key. An entry is made of
+#   the key (UTF-8 encoded, right-padded with null bytes up to the key
+#   width of that index) and of the row ID of the POR record.
+#   Entries having the same key are kept in the insertion order of the
+#   in-memory index, so that looking them up yields the same dictionaries
+mmap_index_magic = b'OPTDMIDX'
+mmap_index_version = 3
+mmap_index_header_fmt = '<8sHIQQ64s'
+mmap_index_section_fmt = '<QQIH'
+mmap_index_sections = ('records', 'iata', 'unlc', 'geo')
+mmap_index_row_fmt = '<I'
+mmap_index_offset_fmt = '<Q'
+mmap_index_field_offsets_fmt = f"<{len (por_fields) + 1}I"
+
+# Kind of the indexes: either one POR record per key, or a dictionary
+# of POR records (by location type for IATA codes, by Geonames ID
+# for UN/LOCODE codes) per key
+mmap_index_sub_key_fields = {'iata': 'location_type', 'unlc': 'geoname_id',
+                             'geo': None}
+
+
+def encodePORRecord (values):
+   """
+     Encode the values of a POR record (in the order of the por_fields tuple)
+   """
+   encoded_values = [value.encode ('utf8') for value in values]
+   field_offsets = [0]
+   for encoded_value in encoded_values:
+      field_offsets.append (field_offsets[-1] + len (encoded_value))
+
+   return struct.pack (mmap_index_field_offsets_fmt, *field_offsets) \
+      + b''.join (encoded_values)
+
+
+def encodeIndexSection (index):
+   """
+     Encode an (in-memory) index, i.e., a dictionary of row IDs or
+     a dictionary of dictionaries of row IDs. Return the key width,
+     the number of distinct keys and the encoded entries.
+   """
+   entries = []
+   for key in sorted (index, key = lambda key: key.encode ('utf8')):
+      row_ids = index[key]
+      if isinstance (row_ids, int):
+         row_ids = (row_ids,)
+      else:
+         row_ids = row_ids.values()
+      for row_id in row_ids:
+         entries.append ((key.encode ('utf8'), row_id))
+
+   key_width = max ([len (key) for key, _ in entries], default = 1)
+   entry_list = [key.ljust (key_width, b'\0')
+                 + struct.pack (mmap_index_row_fmt, row_id)
+                 for key, row_id in entries]
+   return (key_width, len (index), b''.join (entry_list))
+
+
+def writeMappedIndex (index_filepath, source_key, store, index_dict):
+   """
+     Write the POR store and its indexes (given as a dictionary of in-memory
+     indexes, by index name) into a memory-mappable index file. The file
+     is first written under a temporary name, and then atomically renamed.
+   """
+   n_rows = len (store)
+   record_list = [encodePORRecord ([store.columns[field][row_id]
+                                    for field in por_fields])
+                  for row_id in range (n_rows)]
+   record_offsets = [0]
+   for record in record_list:
+      record_offsets.append (record_offsets[-1] + len (record))
+   offset_table = struct.pack (f"<{n_rows + 1}Q", *record_offsets)
+   record_blob = offset_table + b''.join (record_list)
+
+   # Sections
+   section_list = [(0, 0, record_blob)]
+   for index_name in mmap_index_sections[1:]:
+      section_list.append (encodeIndexSection (index_dict[index_name]))
+
+   # Header and table of the sections
+   header_size = struct.calcsize (mmap_index_header_fmt) \
+      + len (mmap_index_sections) * struct.calcsize (mmap_index_section_fmt)
+   section_table = b''
+   section_offset = header_size
+   for key_width, n_keys, section_blob in section_list:
+      section_table += struct.pack (mmap_index_section_fmt, section_offset,
+                                    len (section_blob), n_keys, key_width)
+      section_offset += len (section_blob)
+   (source_size, source_mtime_ns, source_hash) = source_key
+   header = struct.pack (mmap_index_header_fmt, mmap_index_magic,
+                         mmap_index_version, n_rows, source_size,
+                         source_mtime_ns, source_hash.encode ('ascii'))
+
+   tmp_filepath = f"{index_filepath}.{os.getpid()}.tmp"
+   try:
+      with open (tmp_filepath, 'wb') as index_file:
+         index_file.write (header)
+         index_file.write (section_table)
+         for _, _, section_blob in section_list:
+            index_file.write (section_blob)
+      os.replace (tmp_filepath, index_filepath)
+   finally:
+      if os.path.exists (tmp_filepath):
+         os.remove (tmp_filepath)
+
+   #
+   return
+
+
+class MappedKeyColumn (collections.abc.Sequence):
+   """
+   Sequence of the (padded) keys of a mapped index section, so that
+   those keys may be binary-searched without being copied
+   """
+   def __init__ (self, buffer, offset, n_entries, key_width):
+      self.buffer = buffer
+      self.offset = offset
+      self.n_entries = n_entries
+      self.key_width = key_width
+      self.entry_size = key_width + struct.calcsize (mmap_index_row_fmt)
+
+   def __len__ (self):
+      return self.n_entries
+
+   def __getitem__ (self, idx):
+      if not 0 <= idx < self.n_entries:
+         raise IndexError (f"Index entry out of range: {idx}")
+      entry_offset = self.offset + idx * self.entry_size
+      return self.buffer[entry_offset:entry_offset + self.key_width]
+
+   def rowID (self, idx):
+      entry_offset = self.offset + idx * self.entry_size + self.key_width
+      return struct.unpack_from (mmap_index_row_fmt, self.buffer,
+                                 entry_offset)[0]
+
+
+class MappedPORStore():
+   """
+   POR store backed by a memory-mapped index file. The POR records are
+   decoded, one field at a time, straight from the mapped buffer.
+   """
+   fields = por_fields
+   index_filepath = None
+   buffer = None
+   n_rows = 0
+   records_offset = 0
+   sections = None
+
+   def __init__ (self, index_filepath, buffer):
+      self.index_filepath = index_filepath
+      self.buffer = buffer
+      (_, _, self.n_rows, _, _, _) = \
+         struct.unpack_from (mmap_index_header_fmt, buffer)
+      self.sections = dict()
+      section_offset = struct.calcsize (mmap_index_header_fmt)
+      for index_name in mmap_index_sections:
+         self.sections[index_name] = \
+            struct.unpack_from (mmap_index_section_fmt, buffer,
+                                section_offset)
+         section_offset += struct.calcsize (mmap_index_section_fmt)
+      self.records_offset = self.sections['records'][0] \
+         + (self.n_rows + 1) * struct.calcsize (mmap_index_offset_fmt)
+      self.field_idx = {field: idx for idx, field in enumerate (por_fields)}
+
+   def __len__ (self):
+      return self.n_rows
+
+   def value (self, row_id, field):
+      """
+        Retrieve the value of a field for a given POR record
+      """
+      value = self.rawValue (row_id, field)
+      if field in por_list_fields:
+         value = splitPORListField (field, value)
+      return value
+
+   def rawValue (self, row_id, field):
+      """
+        Retrieve the raw value (string) of a field for a given POR record,
+        i.e., without the list fields being split
+      """
+      if not 0 <= row_id < self.n_rows:
+         raise IndexError (f"POR record row ID out of range: {row_id}")
+
+      field_idx = self.field_idx[field]
+      record_offset = self.records_offset + struct.unpack_from (
+         mmap_index_offset_fmt, self.buffer,
+         self.sections['records'][0]
+         + row_id * struct.calcsize (mmap_index_offset_fmt))[0]
+      field_start, field_end = struct.unpack_from (
+         '<2I', self.buffer, record_offset + 4 * field_idx)
+      data_offset = record_offset \
+         + struct.calcsize (mmap_index_field_offsets_fmt)
+      return self.buffer[data_offset + field_start:
+                         data_offset + field_end].decode ('utf8')
+
+   def record (self, row_id):
+      """
+        Retrieve a (lightweight) view on a given POR record
+      """
+      return PORRecord (self, row_id)
+
+   def rowIDs (self):
+      """
+        Iterate over the row IDs of the POR records
+      """
+      return iter (range (self.n_rows))
+
+   def rowValues (self, row_id):
+      """
+        Retrieve the values of a POR record, in the order of the fields
+        tuple
+      """
+      return tuple (self.value (row_id, field) for field in self.fields)
+
+   def index (self, index_name):
+      """
+        Retrieve the dictionary-like view on a given mapped index
+      """
+      return MappedPORIndex (self, index_name)
+
+   def memoryFootprint (self):
+      """
+        Size of the mapped index file, in Bytes. The corresponding memory
+        is shared (through the page cache) by all the processes mapping
+        that same file.
+      """
+      return len (self.buffer)
+
+   def close (self):
+      self.buffer.close()
+
+
+class MappedPORIndex (collections.abc.Mapping):
+   """
+   Read-only dictionary-like view on an index section of a mapped POR
+   index file. Lookups binary-search the keys in the mapped buffer.
+   """
+   def __init__ (self, store, index_name):
+      self.store = store
+      self.index_name = index_name
+      self.sub_key_field = mmap_index_sub_key_fields[index_name]
+      (offset, length, self.n_keys, key_width) = store.sections[index_name]
+      n_entries = length // (key_width + struct.calcsize (mmap_index_row_fmt))
+      self.keys = MappedKeyColumn (store.buffer, offset, n_entries, key_width)
+
+   def rowIDs (self, key):
+      """
+        Retrieve the row IDs of the POR records indexed by a given key,
+        in the insertion order of the original index
+      """
+      encoded_key = key.encode ('utf8')
+      if len (encoded_key) > self.keys.key_width:
+         return []
+      encoded_key = encoded_key.ljust (self.keys.key_width, b'\0')
+
+      row_ids = []
+      idx = bisect.bisect_left (self.keys, encoded_key)
+      while idx < len (self.keys) and self.keys[idx] == encoded_key:
+         row_ids.append (self.keys.rowID (idx))
+         idx += 1
+      return row_ids
+
+   def __getitem__ (self, key):
+      if not isinstance (key, str):
+         raise KeyError (key)
+      row_ids = self.rowIDs (key)
+      if not row_ids:
+         raise KeyError (key)
+
+      if self.sub_key_field is None:
+         return self.store.record (row_ids[0])
+      return {self.store.value (row_id, self.sub_key_field):
+              self.store.record (row_id) for row_id in row_ids}
+
+   def __contains__ (self, key):
+      return isinstance (key, str) and len (self.rowIDs (key)) > 0
+
+   def __iter__ (self):
+      previous_key = None
+      for encoded_key in self.keys:
+         if encoded_key != previous_key:
+            previous_key = encoded_key
+            yield encoded_key.rstrip (b'\0').decode ('utf8')
+
+   def __len__ (self):
+      return self.n_keys
+
+   def memoryFootprint (self):
+      """
+        The index is part of the mapped index file, which is accounted
+        for by the mapped store
+      """
+      return 0
+
+
+def openMappedIndex (index_filepath, source_filepath, builder):
+   """
+     Open (memory-map) the POR index file built from a given source file.
+     When that index file is missing, or has been built from another
+     version of the source file, it is (re-)built, by the first process
+     getting there, from the store and indexes returned by the builder
+     callable. The other processes wait for that build to complete.
+     An OSError is raised when the index file cannot be built or mapped.
+   """
+   source_key = sourceFileKey (source_filepath)
+
+   store = tryOpenMappedIndex (index_filepath, source_key)
+   if store is not None:
+      return store
+
+   with open (f"{index_filepath}.lock", 'w') as lock_file:
+      if fcntl is not None:
+         fcntl.flock (lock_file, fcntl.LOCK_EX)
+      try:
+         # Another process may have built the index in the meantime
+         store = tryOpenMappedIndex (index_filepath, source_key)
+         if store is None:
+            (por_store, index_dict) = builder()
+            writeMappedIndex (index_filepath, source_key, por_store,
+                              index_dict)
+            store = tryOpenMappedIndex (index_filepath, source_key)
+            if store is None:
+               raise OSError (f"The freshly built {index_filepath} index "
+                              "file cannot be mapped")
+      finally:
+         if fcntl is not None:
+            fcntl.flock (lock_file, fcntl.LOCK_UN)
+
+   return store
+
+
+def tryOpenMappedIndex (index_filepath, source_key):
+   """
+     Memory-map the index file, if it exists and has been built, with
+     the current format version, from the source file identified by
+     the given key. Return None otherwise.
+   """
+   if not os.path.isfile (index_filepath):
+      return None
+
+   with open (index_filepath, 'rb') as index_file:
+      try:
+         buffer = mmap.mmap (index_file.fileno(), 0, access = mmap.ACCESS_READ)
+      except ValueError:
+         # Empty file
+         return None
+
+   header_size = struct.calcsize (mmap_index_header_fmt)
+   if len (buffer) < header_size:
+      buffer.close()
+      return None
+
+   (magic, version, _, source_size, source_mtime_ns, source_hash) = \
+      struct.unpack_from (mmap_index_header_fmt, buffer)
+   index_key = (source_size, source_mtime_ns, source_hash.decode ('ascii'))
+   if magic != mmap_index_magic or version != mmap_index_version \
+      or index_key != tuple (source_key):
+      buffer.close()
+      return None
+
+   return MappedPORStore (index_filepath, buffer)
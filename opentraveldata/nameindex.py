@@ -0,0 +1,327 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+import bisect
+import heapq
+import unicodedata
+from .loctype import parseLocationType
+
+# Pseudo-languages of the OPTD alternate names, which hold links, codes
+# or postal codes rather than names
+alt_name_excluded_languages = frozenset (('link', 'wkdt', 'post', 'unlc',
+                                          'iata', 'icao', 'faac'))
+
+# Translation of the ASCII characters other than letters and digits
+# into spaces, and of the upper case letters into lower case ones
+ascii_name_table = str.maketrans (
+   {chr (code): (chr (code).lower() if chr (code).isalnum() else ' ')
+    for code in range (128)})
+
+
+def normalizeName (name):
+   """
+     Normalize a name for matching: accents (and other combining marks)
+     are removed, the case is folded and the characters other than letters
+     and digits are replaced by spaces (e.g., 'Bīsheh-Kolā' -> 'bisheh kola')
+   """
+   if name.isascii():
+      return ' '.join (name.translate (ascii_name_table).split())
+
+   decomposed_name = unicodedata.normalize ('NFKD', name)
+   char_list = [char if char.isalnum() else ' ' for char in decomposed_name
+                if not unicodedata.combining (char)]
+   return ' '.join (''.join (char_list).casefold().split())
+
+
+def splitAltNameSection (alt_name_section):
+   """
+     Split the alternate names of a POR, as given by the OPTD POR file
+     (e.g., 'en|Kyiv|p=en|Kiev|h=uk|Київ|'), into (language, name) tuples.
+     The pseudo-languages (links, codes) are left out.
+   """
+   alt_name_list = []
+   for alt_name_str in alt_name_section.split ('='):
+      alt_name_parts = alt_name_str.split ('|')
+      if len (alt_name_parts) < 2 or alt_name_parts[1] == '':
+         continue
+      (language, alt_name) = alt_name_parts[:2]
+      if not language in alt_name_excluded_languages:
+         alt_name_list.append ((language, alt_name))
+   return alt_name_list
+
+
+class RangeMaxIndex():
+   """
+   Index answering, in (almost) constant time, which position of a range
+   of an array holds the greatest value of that range (the first such
+   position when there are several). The array is split into blocks,
+   and a sparse table holds the positions of the greatest values
+   of the runs of 2^j blocks, for every j.
+   """
+   values = None
+   block_size = None
+   sparse_table = None
+
+   def __init__ (self, values, block_size = 32):
+      self.values = values
+      self.block_size = block_size
+      get_value = values.__getitem__
+
+      block_argmax_list = array.array ('I', [
+         max (range (block_start, min (block_start + block_size, len (values))),
+              key = get_value)
+         for block_start in range (0, len (values), block_size)])
+      self.sparse_table = [block_argmax_list]
+      run_size = 2
+      while run_size <= len (block_argmax_list):
+         prev_level = self.sparse_table[-1]
+         half_run_size = run_size // 2
+         level = array.array ('I', [
+            prev_level[idx]
+            if values[prev_level[idx]] >= values[prev_level[idx + half_run_size]]
+            else prev_level[idx + half_run_size]
+            for idx in range (len (block_argmax_list) - run_size + 1)])
+         self.sparse_table.append (level)
+         run_size *= 2
+
+   def blockArgmax (self, first_block, last_block):
+      """
+        Position of the greatest value of the blocks from first_block
+        to last_block (both included)
+      """
+      level = (last_block - first_block + 1).bit_length() - 1
+      table = self.sparse_table[level]
+      left_pos = table[first_block]
+      right_pos = table[last_block - (1 << level) + 1]
+      if self.values[left_pos] >= self.values[right_pos]:
+         return left_pos
+      return right_pos
+
+   def argmax (self, lo, hi):
+      """
+        Position of the greatest value in the values[lo:hi] range
+        (which is not empty)
+      """
+      get_value = self.values.__getitem__
+      block_size = self.block_size
+      first_block = lo // block_size
+      last_block = (hi - 1) // block_size
+      if first_block == last_block:
+         return max (range (lo, hi), key = get_value)
+
+      # Partial first and last blocks, and whole blocks in between,
+      # in the order of the positions
+      pos_list = [max (range (lo, (first_block + 1) * block_size),
+                       key = get_value)]
+      if first_block + 1 < last_block:
+         pos_list.append (self.blockArgmax (first_block + 1, last_block - 1))
+      pos_list.append (max (range (last_block * block_size, hi),
+                            key = get_value))
+      return max (pos_list, key = get_value)
+
+
+class PrefixIndex():
+   """
+   Sorted array of (normalized) keys, each one referencing a POR record
+   by row ID, with the rank of that record. The keys starting with a given
+   prefix form a range of that array, the records of which are visited
+   by decreasing rank (see topRowIDs()), so that the top-k records are
+   found without going through the whole range.
+   """
+   keys = None
+   row_ids = None
+   ranks = None
+   name_ids = None
+   range_max_index = None
+
+   def __init__ (self, keys, row_ids, ranks, name_ids):
+      """
+        The keys are expected to be sorted, the other sequences giving,
+        for each key, the row ID of the POR record, its rank and the ID
+        of the (original) name the key has been derived from
+      """
+      self.keys = keys
+      self.row_ids = row_ids
+      self.ranks = ranks
+      self.name_ids = name_ids
+      self.range_max_index = RangeMaxIndex (ranks)
+
+   def __len__ (self):
+      return len (self.keys)
+
+   def topEntries (self, prefix, k, accept_row_id = None):
+      """
+        Return the positions of the entries of the (up to) k distinct POR
+        records with the greatest ranks, among the entries the key of which
+        starts with the given (normalized) prefix. When given,
+        accept_row_id is a callable stating whether a POR record, given
+        by its row ID, may be returned.
+      """
+      keys = self.keys
+      lo = bisect.bisect_left (keys, prefix)
+      hi = bisect.bisect_left (keys, prefix + '\U0010ffff', lo)
+      if lo >= hi or k <= 0:
+         return []
+
+      # The entries are visited by decreasing rank: the range holding
+      # the entry with the greatest rank is split around that entry
+      ranks, row_ids, argmax = self.ranks, self.row_ids, \
+         self.range_max_index.argmax
+      pos = argmax (lo, hi)
+      range_heap = [(-ranks[pos], pos, lo, hi)]
+      entry_list = []
+      seen_row_ids = set()
+      while range_heap and len (entry_list) < k:
+         (_, pos, lo, hi) = heapq.heappop (range_heap)
+         row_id = row_ids[pos]
+         if not row_id in seen_row_ids:
+            seen_row_ids.add (row_id)
+            if accept_row_id is None or accept_row_id (row_id):
+               entry_list.append (pos)
+         if lo < pos:
+            sub_pos = argmax (lo, pos)
+            heapq.heappush (range_heap, (-ranks[sub_pos], sub_pos, lo, pos))
+         if pos + 1 < hi:
+            sub_pos = argmax (pos + 1, hi)
+            heapq.heappush (range_heap, (-ranks[sub_pos], sub_pos, pos + 1, hi))
+
+      return entry_list
+
+
+class PORNameIndex():
+   """
+   Prefix (typeahead) index of the (current) POR records of a POR store,
+   on their normalized names (see normalizeName()): the name, the ASCII
+   name and the alternate names. The names are indexed from the start of
+   each of their words (e.g., 'Kyiv Boryspil International Airport'
+   is found with 'bory' as well as with 'kyiv b'). The matching POR are
+   ranked by PageRank.
+
+   The alternate names may be restricted to some languages, the name
+   and the ASCII name, without language, being always searched. The index
+   for a given set of languages is derived on first use, as a subsequence
+   (already sorted) of the index on all the names.
+   """
+   names = None
+   name_languages = None
+   flags = None
+   language_ids = None
+   entry_language_ids = None
+   prefix_index = None
+   language_prefix_indexes = None
+
+   def __init__ (self, store):
+      """
+        store: a POR store (in-memory or memory-mapped)
+      """
+      self.names = []
+      self.name_languages = array.array ('H')
+      self.language_ids = {'': 0}
+      self.flags = dict()
+      self.language_prefix_indexes = dict()
+
+      entry_list = []
+      for row_id in store.rowIDs():
+         # Historical POR (with an envelope ID) are not indexed
+         if store.value (row_id, 'envelope_id') != '':
+            continue
+         try:
+            rank = float (store.value (row_id, 'page_rank'))
+         except ValueError:
+            rank = 0.0
+         self.flags[row_id] = parseLocationType (store.value (row_id,
+                                                             'location_type'))
+
+         name_list = [('', store.value (row_id, 'name')),
+                      ('', store.value (row_id, 'asciiname'))]
+         name_list.extend (splitAltNameSection (
+            store.value (row_id, 'alt_name_section')))
+         por_keys = set()
+         for (language, name) in name_list:
+            normalized_name = normalizeName (name)
+            if normalized_name == '':
+               continue
+            language_id = self.language_ids.setdefault (language,
+                                                        len (self.language_ids))
+            name_id = None
+
+            # A key from the start of each word
+            word_start = 0
+            while word_start >= 0:
+               key = normalized_name[word_start:]
+               if not (key, language_id) in por_keys:
+                  por_keys.add ((key, language_id))
+                  if name_id is None:
+                     name_id = len (self.names)
+                     self.names.append (name)
+                     self.name_languages.append (language_id)
+                  entry_list.append ((key, row_id, rank, name_id))
+               word_start = normalized_name.find (' ', word_start)
+               if word_start >= 0:
+                  word_start += 1
+
+      entry_list.sort()
+      self.prefix_index = PrefixIndex (
+         [entry[0] for entry in entry_list],
+         array.array ('I', [entry[1] for entry in entry_list]),
+         array.array ('d', [entry[2] for entry in entry_list]),
+         array.array ('I', [entry[3] for entry in entry_list]))
+
+   def __len__ (self):
+      return len (self.prefix_index)
+
+   def languagePrefixIndex (self, languages):
+      """
+        Prefix index restricted to the names without language and to
+        the alternate names in the given languages, derived on first use
+      """
+      languages = frozenset (languages)
+      prefix_index = self.language_prefix_indexes.get (languages)
+      if prefix_index is not None:
+         return prefix_index
+
+      language_id_set = {0} | {self.language_ids[language]
+                               for language in languages
+                               if language in self.language_ids}
+      all_index = self.prefix_index
+      name_languages = self.name_languages
+      pos_list = [pos for pos, name_id in enumerate (all_index.name_ids)
+                  if name_languages[name_id] in language_id_set]
+      prefix_index = PrefixIndex (
+         [all_index.keys[pos] for pos in pos_list],
+         array.array ('I', [all_index.row_ids[pos] for pos in pos_list]),
+         array.array ('d', [all_index.ranks[pos] for pos in pos_list]),
+         array.array ('I', [all_index.name_ids[pos] for pos in pos_list]))
+      self.language_prefix_indexes[languages] = prefix_index
+      return prefix_index
+
+   def search (self, prefix, k = 10, languages = None, loc_type_flags = None):
+      """
+        Return the (up to) k POR, with the greatest PageRank values, having
+        a name starting with the given prefix (normalized the same way as
+        the names), as a list of (matched name, row ID) tuples.
+
+        languages: when given, the languages (e.g., ['en', 'fr']) to which
+        the alternate names are restricted
+        loc_type_flags: when given, LocationType bit flags or OPTD location
+        type string, restricting the POR to those having any of those
+        location types
+      """
+      if isinstance (loc_type_flags, str):
+         loc_type_flags = parseLocationType (loc_type_flags)
+
+      prefix_index = self.prefix_index
+      if languages is not None:
+         prefix_index = self.languagePrefixIndex (languages)
+
+      accept_row_id = None
+      if loc_type_flags is not None:
+         flags = self.flags
+         accept_row_id = lambda row_id: flags[row_id] & loc_type_flags
+
+      pos_list = prefix_index.topEntries (normalizeName (prefix), k,
+                                          accept_row_id)
+      return [(self.names[prefix_index.name_ids[pos]],
+               prefix_index.row_ids[pos]) for pos in pos_list]
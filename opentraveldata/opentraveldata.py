@@ -5,13 +5,37 @@
 import getopt
 import os
 import sys
-import re
 import csv
 import datetime
-import shutil
-import urllib.request
 import time
 import enum
+import threading
+import operator
+import concurrent.futures
+import collections
+import contextlib
+from .porstore import PORStore, PORIndex, por_fields, por_index_names, \
+   por_unlc_list_idx, indexPORRecord, buildPORIndexes
+from .snapshot import sourceFileKey, saveSnapshot, loadSnapshot
+from .mmapindex import openMappedIndex
+from .servinggraph import ServingPORGraph
+from .loctype import LocationType, parseLocationType, PORTypeIndex
+from .spatialindex import PORSpatialIndex
+from .distancematrix import PointArrays, haversineMatrix, haversinePairs, \
+   iterHaversineMatrix
+from .nameindex import PORNameIndex
+from .fuzzymatch import PORFuzzyNameIndex
+from .download import downloadFile, downloadFilepaths
+from .compression import checkCompression, compression_extensions, \
+   openCompressedFile, uncompressedFileSize
+from .unlcstore import parseUNLCPORFile
+from .delta import diffPORStores, summarizePORDelta, applyPORDelta
+from .parallelparse import parsePORFileParallel
+from .columnarcache import checkColumnarCache, columnar_cache_extensions, \
+   isColumnarCacheFresh, writeColumnarCache, openColumnarCache, \
+   filterExpression
+from .export import typedPORColumns, columnsToNumPy, columnsToPandas, \
+   columnsToArrow
 
 # OPTD maintains three lists of POR (points of reference)
 # - optd_por_public.csv is the light version,
@@ -32,6 +56,11 @@ optd_por_iata_rel_path = 'opentraveldata/optd_por_public.csv'
 optd_por_all_rel_path = 'opentraveldata/optd_por_public_all.csv'
 optd_por_unlc_rel_path = 'opentraveldata/optd_por_unlc.csv'
 
+# Attributes of the OpenTravelData objects holding the POR dictionaries,
+# by index name
+por_index_attributes = {'iata': 'iata_por_dict', 'unlc': 'unlc_por_dict',
+                        'geo': 'geo_por_dict'}
+
 
 class Error (Exception):
    """
@@ -82,6 +111,13 @@ class OPTDLocationTypeError (Error):
    pass
 
 
+class OPTDColumnError (Error):
+   """
+   Raised when a column is not known from the OPTD data files
+   """
+   pass
+
+
 class FileType(enum.Enum):
    """
    Type of the OPTD file. For now, either main (IATA/ICAO) or UNLC (UN/LOCODE).
@@ -227,7 +263,17 @@ class OpenTravelData():
    """
    verbose = False
    local_dir = None
+   validate_file_sizes = True
+   compression = None
+   parse_workers = 1
+   por_store = None
    geo_por_dict = None
+   # Binary snapshot of the POR dictionaries
+   use_snapshot = True
+   local_snapshot_filepath = None
+   # Memory-mapped index of the POR dictionaries
+   use_mmap_index = False
+   local_mmap_index_filepath = None
    # Main (IATA/ICAO)
    local_iata_por_filename = None
    local_iata_por_filepath = None
@@ -238,11 +284,42 @@ class OpenTravelData():
    local_unlc_por_filepath = None
    unlc_por_file_url = None
    unlc_por_dict = None
-
-   def __init__(self, local_dir='/tmp/opentraveldata', verbose=False):
+   # Records of the UN/LOCODE POR file, and their indexes by UN/LOCODE
+   # code and by Geonames ID
+   unlc_store = None
+   unlc_file_dict = None
+   unlc_file_geo_dict = None
+   # Graph of the serving POR, derived from the IATA POR dictionary
+   serving_por_graph = None
+   # Index of the POR records by location type (bit flags) and country
+   por_type_index = None
+   # Spatial index of the POR records, on their coordinates
+   por_spatial_index = None
+   # Prefix (typeahead) index of the POR records, on their names
+   por_name_index = None
+   # Trigram index of the POR records, on their names, for approximate
+   # matching
+   por_fuzzy_name_index = None
+   # Typed columns of the POR records, by field name, for the exports
+   por_typed_columns = None
+   # Instrumentation (timing spans, counters and gauges), if any
+   instrumentation = None
+   # Lock serializing the builds of the POR data and of the indexes
+   # derived from it (see extractPORSubsetFromOPTD())
+   build_lock = None
+
+   def __init__(self, local_dir='/tmp/opentraveldata', verbose=False,
+                use_snapshot=True, validate_file_sizes=True,
+                use_mmap_index=False, compression=None, parse_workers=1,
+                columnar_cache=None, instrumentation=None):
       # Vebosity
       self.verbose = verbose
 
+      # Whether the sizes of the data files should be checked against
+      # the expected ranges (it may be disabled, for instance, when
+      # working on a subset of the data files)
+      self.validate_file_sizes = validate_file_sizes
+
       # Remote URL/file-path for IATA POR
       self.iata_por_file_url = \
          f"{optd_url_base}/{optd_por_all_rel_path}?raw=true"
@@ -254,16 +331,50 @@ class OpenTravelData():
       # Local copy/file-path, directory and file pointer
       self.local_dir = local_dir
 
+      # Compression (None, 'gzip' or 'zstd') of the local copies. The data
+      # files are compressed while being downloaded, and decompressed
+      # on the fly when read
+      checkCompression (compression)
+      self.compression = compression
+      compression_extension = compression_extensions[compression]
+
       # For IATA POR
-      self.local_iata_por_filename = os.path.basename(optd_por_all_rel_path)
+      self.local_iata_por_filename = \
+         os.path.basename(optd_por_all_rel_path) + compression_extension
       self.local_iata_por_filepath = \
          f"{self.local_dir}/{self.local_iata_por_filename}"
 
       # For UN/LOCODE POR
-      self.local_unlc_por_filename = os.path.basename(optd_por_unlc_rel_path)
+      self.local_unlc_por_filename = \
+         os.path.basename(optd_por_unlc_rel_path) + compression_extension
       self.local_unlc_por_filepath = \
          f"{self.local_dir}/{self.local_unlc_por_filename}"
 
+      # Binary snapshot of the POR dictionaries, derived from the
+      # main (IATA/ICAO) POR file. Its name does not depend on the
+      # compression of that latter
+      self.use_snapshot = use_snapshot
+      local_iata_por_basename = \
+         os.path.splitext(os.path.basename(optd_por_all_rel_path))[0]
+      local_snapshot_filename = local_iata_por_basename + '.snapshot'
+      self.local_snapshot_filepath = \
+         f"{self.local_dir}/{local_snapshot_filename}"
+
+      # Memory-mapped index of the POR dictionaries, also derived from
+      # the main (IATA/ICAO) POR file. When used, it supersedes the
+      # binary snapshot
+      self.use_mmap_index = use_mmap_index
+      local_mmap_index_filename = local_iata_por_basename + '.idx'
+      self.local_mmap_index_filepath = \
+         f"{self.local_dir}/{local_mmap_index_filename}"
+
+      # Columnar copy (None, 'arrow' or 'parquet') of the main POR file,
+      # also derived from that latter (see setColumnarCache())
+      self.columnar_cache = None
+      self.local_columnar_cache_filepath = None
+      if columnar_cache is not None:
+         self.setColumnarCache (columnar_cache)
+
       # Create the local directory if not already existing
       try:
          os.makedirs(self.local_dir, exist_ok=True)
@@ -272,6 +383,80 @@ class OpenTravelData():
             f"{self.local_dir} directory locally"
          raise OPTDLocalFileError(err_msg)
 
+      # Number of processes parsing the main POR file (see parsePORFile())
+      self.parse_workers = parse_workers
+
+      # Callables notified of the changes of the POR data (see
+      # refreshPORData())
+      self.por_refresh_listeners = []
+
+      # Metrics of the downloads, of the loading of the POR data and
+      # of the lookups (see setInstrumentation())
+      self.instrumentation = instrumentation
+
+      # The builders may call each other (e.g., the spatial index needs
+      # the POR store), hence a re-entrant lock
+      self.build_lock = threading.RLock()
+
+   def setInstrumentation (self, instrumentation):
+      """
+        Set the instrumentation (see the instrumentation module), recording
+        the timing spans, counters and gauges of the downloads, of the
+        loading of the POR data and of the lookups, or None to disable it.
+        The same instrumentation may be shared by several OpenTravelData
+        objects.
+      """
+      self.instrumentation = instrumentation
+      return
+
+   def instrumentedSpan (self, name, **labels):
+      """
+        Timing span of the instrumentation, or a context manager doing
+        nothing when there is no instrumentation
+      """
+      if self.instrumentation is None:
+         return contextlib.nullcontext()
+      return self.instrumentation.span (name, **labels)
+
+   def instrumentedCount (self, name, value = 1, **labels):
+      if self.instrumentation is not None:
+         self.instrumentation.count (name, value, **labels)
+      return
+
+   def instrumentedGauge (self, name, value, **labels):
+      if self.instrumentation is not None:
+         self.instrumentation.setGauge (name, value, **labels)
+      return
+
+   def recordLookup (self, method, start_time, is_hit):
+      """
+        Record the duration and the outcome of a lookup, which started
+        at the given time (only called when there is an instrumentation)
+      """
+      self.instrumentation.observe ('lookup',
+                                    time.perf_counter() - start_time,
+                                    method = method)
+      self.instrumentation.count ('lookups_total', method = method,
+                                  result = 'hit' if is_hit else 'miss')
+      return
+
+   def setColumnarCache (self, columnar_cache):
+      """
+        Set the format (None, 'arrow' or 'parquet') of the columnar copy
+        of the main POR file. When set, that copy is written (and kept up
+        to date) by downloadFilesIfNeeded(), and preferred to the POR file
+        when loading the POR records.
+      """
+      if columnar_cache is not None:
+         checkColumnarCache (columnar_cache)
+      self.columnar_cache = columnar_cache
+      self.local_columnar_cache_filepath = None
+      if columnar_cache is not None:
+         self.local_columnar_cache_filepath = \
+            os.path.splitext (self.local_snapshot_filepath)[0] \
+            + columnar_cache_extensions[columnar_cache]
+      return
+
    def __repr__(self):
       repr_msg = "OpenTravelData:\n" \
          f"\tLocal IATA/ICAO POR file: {self.local_iata_por_filepath}\n" \
@@ -290,6 +475,12 @@ class OpenTravelData():
    def localUNLCPORFilepath(self):
       return self.local_unlc_por_filepath
 
+   def localSnapshotFilepath(self):
+      return self.local_snapshot_filepath
+
+   def localMappedIndexFilepath(self):
+      return self.local_mmap_index_filepath
+
    def doLocalFilesExist(self):
       do_files_exist = os.path.isfile(self.local_iata_por_filepath) and \
          os.path.isfile(self.local_unlc_por_filepath)
@@ -320,8 +511,8 @@ class OpenTravelData():
       # file system, where they are expected to be)
       self.assumeFilesExist()
       
-      iata_por_file_size = os.path.getsize(self.local_iata_por_filepath)
-      unlc_por_file_size = os.path.getsize(self.local_unlc_por_filepath)
+      iata_por_file_size = uncompressedFileSize(self.local_iata_por_filepath)
+      unlc_por_file_size = uncompressedFileSize(self.local_unlc_por_filepath)
       if self.verbose:
          print("[Opentraveldata::fileSizes] Sizes - "
                f"{self.local_iata_por_filepath}: {iata_por_file_size} ; "
@@ -382,10 +573,27 @@ class OpenTravelData():
          os.remove (self.local_iata_por_filepath)
          os.remove (self.local_unlc_por_filepath)
 
-         if verbose:
+         if self.verbose:
             print ("[Opentraveldata::deleteLocalFiles] " \
                    f"{self.local_iata_por_filepath} and  " \
                    f"{self.local_unlc_por_filepath} have been deleted")
+
+      # The snapshot and the mapped index would anyway be rebuilt, as they
+      # are keyed on the content of the main POR file. They are deleted
+      # so as not to leave them behind, as are the files used when
+      # downloading the data files
+      derived_filepath_list = [self.local_snapshot_filepath,
+                               self.local_mmap_index_filepath,
+                               f"{self.local_mmap_index_filepath}.lock"]
+      derived_filepath_list.extend (
+         os.path.splitext (self.local_snapshot_filepath)[0] + extension
+         for extension in columnar_cache_extensions.values())
+      for local_por_filepath in (self.local_iata_por_filepath,
+                                 self.local_unlc_por_filepath):
+         derived_filepath_list.extend (downloadFilepaths (local_por_filepath))
+      for derived_filepath in derived_filepath_list:
+         if os.path.isfile (derived_filepath):
+            os.remove (derived_filepath)
                
       # Sanity check
       do_files_exist = self.doLocalFilesExist()
@@ -397,57 +605,66 @@ class OpenTravelData():
       #
       return
 
-   def downloadIATAPORFile (self):
+   def downloadPORFile (self, por_file_url, local_por_filepath):
       """
-        Download the IATA POR file from the OpenTravelData (OPTD) GitHub
-        repository.
+        Download a POR file from the OpenTravelData (OPTD) GitHub
+        repository, if it has changed since it was last downloaded
+        (resuming any previously interrupted download). Return the outcome
+        of the download (see the opentraveldata.download module).
       """
       if self.verbose:
-         print ("[OpenTravelData::downloadIATAPORFile] Downloading " \
-                f"{self.local_iata_por_filepath} from " \
-                f"{self.iata_por_file_url}...")
+         print ("[OpenTravelData::downloadPORFile] Downloading " \
+                f"{local_por_filepath} from {por_file_url}...")
 
+      por_filename = os.path.basename (local_por_filepath)
       try:
-         with urllib.request.urlopen (self.iata_por_file_url) as response, \
-              open (self.local_iata_por_filepath, 'wb') as out_file:
-            shutil.copyfileobj (response, out_file)
-      except:
-         err_msg = "[OpenTravelData::init] Error while downloading " \
-            f"{self.iata_por_file_url} as {self.local_iata_por_filepath}"
+         with self.instrumentedSpan ('download', file = por_filename):
+            download_status = downloadFile (por_file_url, local_por_filepath)
+      except Exception:
+         self.instrumentedCount ('downloads_total', file = por_filename,
+                                 status = 'error')
+         err_msg = "[OpenTravelData::downloadPORFile] Error while " \
+            f"downloading {por_file_url} as {local_por_filepath}"
          raise OPTDDownloadFileError (err_msg)
-         
+      self.instrumentedCount ('downloads_total', file = por_filename,
+                              status = download_status)
+
       if self.verbose:
-         file_size = os.path.getsize (self.local_iata_por_filepath)
-         print ("[Opentraveldata::downloadIATAPORFile] ... done. " \
-                f"{self.local_iata_por_filepath} - Size: {file_size}")
-      return
+         file_size = os.path.getsize (local_por_filepath)
+         print ("[Opentraveldata::downloadPORFile] ... done " \
+                f"({download_status}). {local_por_filepath} - " \
+                f"Size: {file_size}")
+      return download_status
+
+   def downloadIATAPORFile (self):
+      """
+        Download the IATA POR file from the OpenTravelData (OPTD) GitHub
+        repository.
+      """
+      return self.downloadPORFile (self.iata_por_file_url,
+                                   self.local_iata_por_filepath)
      
    def downloadUNLCPORFile (self):
       """
         Download the UN/LOCODE POR file from the OpenTravelData (OPTD) GitHub
         repository.
       """
-      if self.verbose:
-         print ("[OpenTravelData::downloadUNLCPORFile] Downloading " \
-                f"{self.local_unlc_por_filepath} from " \
-                f"{self.unlc_por_file_url}...")
+      return self.downloadPORFile (self.unlc_por_file_url,
+                                   self.local_unlc_por_filepath)
 
-      try:
-         with urllib.request.urlopen (self.unlc_por_file_url) as response, \
-              open (self.local_unlc_por_filepath, 'wb') as out_file:
-            shutil.copyfileobj (response, out_file)
-      except:
-         err_msg = "[OpenTravelData::init] Error while downloading " \
-            f"{self.unlc_por_file_url} as {self.local_unlc_por_filepath}"
-         raise OPTDDownloadFileError (err_msg)
-         
-      if self.verbose:
-         file_size = os.path.getsize (self.local_unlc_por_filepath)
-         print ("[Opentraveldata::downloadIATAPORFile] ... done. " \
-                f"{self.local_unlc_por_filepath} - Size: {file_size}")
-      return
+   def downloadPORFiles (self):
+      """
+        Download the IATA and UN/LOCODE POR files concurrently. Return
+        the outcomes of both downloads.
+      """
+      with concurrent.futures.ThreadPoolExecutor (max_workers = 2) \
+           as executor:
+         iata_future = executor.submit (self.downloadIATAPORFile)
+         unlc_future = executor.submit (self.downloadUNLCPORFile)
+         download_status_list = (iata_future.result(), unlc_future.result())
+      return download_status_list
      
-   def downloadFilesIfNeeded (self):
+   def downloadFilesIfNeeded (self, refresh = False, columnar_cache = None):
       """
         Download the IATA and UN/LOCODE POR files from the
         OpenTravelData (OPTD) GitHub repository, if those files have not
@@ -455,15 +672,23 @@ class OpenTravelData():
         locally stored version of those files is too old.
 
         As there is no good automatic check for deprecation of those files,
-        it is nevertheless advised to call the deleteLocalFiles() method
-        from times to times to force the downloading of newer versions.
+        it is nevertheless advised to call that method with refresh set
+        to True from times to times: the POR files are then downloaded
+        again only if they have changed (conditional HTTP requests),
+        which costs almost nothing otherwise. Calling the
+        deleteLocalFiles() method forces the downloading of the files.
+
+        columnar_cache: when given ('arrow' or 'parquet'), the format of the
+        columnar copy of the main POR file (see setColumnarCache()). That
+        copy is (re-)written whenever it is missing or stale.
       """
+      if columnar_cache is not None:
+         self.setColumnarCache (columnar_cache)
 
       # Check whether the OPTD data file has already been downloaded
       do_files_exist = self.doLocalFilesExist()
-      if not do_files_exist:
-         self.downloadUNLCPORFile()
-         self.downloadIATAPORFile()
+      if refresh or not do_files_exist:
+         self.downloadPORFiles()
            
       iata_por_file_size, unlc_por_file_size = self.fileSizes()
       mtime = os.path.getmtime (self.local_iata_por_filepath)
@@ -480,11 +705,82 @@ class OpenTravelData():
                 "(downloadFilesIfNeeded())")
 
       # Validate the size of the downloaded data files
-      self.validateFileSizes()
+      if self.validate_file_sizes:
+         self.validateFileSizes()
+
+      # Keep the columnar copy of the main POR file up to date
+      if self.columnar_cache is not None:
+         self.updateColumnarCache()
 
       #
       return
 
+   def updateColumnarCache (self):
+      """
+        Convert the main POR file into its columnar copy (see
+        setColumnarCache()), unless that copy is already up to date
+      """
+      if isColumnarCacheFresh (self.local_columnar_cache_filepath,
+                               self.columnar_cache,
+                               self.local_iata_por_filepath):
+         self.instrumentedCount ('columnar_cache_checks_total',
+                                 result = 'fresh')
+         return
+      self.instrumentedCount ('columnar_cache_checks_total', result = 'stale')
+
+      if self.verbose:
+         print ("[OpenTravelData::updateColumnarCache] Converting " \
+                f"{self.local_iata_por_filepath} into " \
+                f"{self.local_columnar_cache_filepath}...")
+      try:
+         writeColumnarCache (self.local_columnar_cache_filepath,
+                             self.columnar_cache, self.local_iata_por_filepath)
+      except OSError:
+         err_msg = "[OpenTravelData::updateColumnarCache] Error while " \
+            f"writing the {self.local_columnar_cache_filepath} columnar cache"
+         raise OPTDLocalFileError (err_msg)
+      return
+
+   def getPORTable (self, columns = None, filters = None):
+      """
+        Read the POR records of the main POR file from its columnar copy
+        (see setColumnarCache()), as an Arrow table of strings. Only the
+        requested columns are read (by default, all of them), and only
+        the rows matching the filters, which are either an Arrow dataset
+        expression or a list of (column, operator, value) tuples, e.g.,
+        [('location_type', '=', 'A'), ('iata_code', '!=', '')]. With the
+        Parquet format, the row groups not matching the filters are
+        skipped altogether.
+      """
+      if self.columnar_cache is None:
+         err_msg = "[OpenTravelData::getPORTable] No columnar cache " \
+            "format has been set (see setColumnarCache())"
+         raise OPTDLocalFileError (err_msg)
+
+      self.downloadFilesIfNeeded()
+      dataset = openColumnarCache (self.local_columnar_cache_filepath,
+                                   self.columnar_cache)
+      self.checkPORColumns (columns, dataset.schema.names,
+                            self.local_columnar_cache_filepath)
+      return dataset.to_table (columns = columns,
+                               filter = filterExpression (filters))
+
+   def checkPORColumns (self, columns, header, por_filepath):
+      """
+        Check that the requested columns are known from a POR file
+      """
+      if columns is None:
+         return
+      unknown_columns = [column for column in columns
+                         if not column in header]
+      if unknown_columns:
+         err_msg = "[OpenTravelData::checkPORColumns] The " \
+            f"{unknown_columns} columns are not known from the " \
+            f"{por_filepath} POR file. " \
+            f"Known columns: {header}"
+         raise OPTDColumnError (err_msg)
+      return
+
    def displayFilesHead (self, lines = 10):
       """
         Display the first 10 lines of the POR files.
@@ -496,7 +792,8 @@ class OpenTravelData():
       # IATA POR file
       print (f"Header of the '{self.local_iata_por_filepath}' file")
       #
-      with open (self.local_iata_por_filepath, newline='') as csvfile:
+      with openCompressedFile (self.local_iata_por_filepath,
+                               newline='') as csvfile:
          file_reader = csv.reader (csvfile, delimiter='^')
          for i in range (lines):
             print (','.join(file_reader.__next__()))
@@ -504,7 +801,8 @@ class OpenTravelData():
       # UN/LOCODE POR file
       print (f"Header of the '{self.local_unlc_por_filepath}' file")
       #
-      with open (self.local_unlc_por_filepath, newline='') as csvfile:
+      with openCompressedFile (self.local_unlc_por_filepath,
+                               newline='') as csvfile:
          file_reader = csv.reader (csvfile, delimiter='^')
          for i in range (lines):
             print (','.join(file_reader.__next__()))
@@ -522,7 +820,7 @@ class OpenTravelData():
         
       # IATA POR
       header_line_iata_por = ''
-      with open (self.local_iata_por_filepath) as tmpfile:
+      with openCompressedFile (self.local_iata_por_filepath) as tmpfile:
          header_line_iata_por = tmpfile.readline().strip()
            
       #
@@ -538,125 +836,619 @@ class OpenTravelData():
         
       # UN/LOCODE POR
       header_line_unlc_por = ''
-      with open (self.local_unlc_por_filepath) as tmpfile:
+      with openCompressedFile (self.local_unlc_por_filepath) as tmpfile:
          header_line_unlc_por = tmpfile.readline().strip()
            
       #
       return header_line_unlc_por
 
-   def extractPORSubsetFromOPTD (self):
+   def iterPOR (self, columns = None, predicate = None,
+                file_type = FileType.MAIN):
+      """
+        Stream the records of a POR file, in constant memory, without
+        building any POR dictionary.
+
+        columns: the names of the columns to retrieve (e.g.,
+        ['iata_code', 'timezone', 'population']), by default all of them.
+        Only those columns are extracted from the rows.
+        predicate: when given, a callable, called with each record, stating
+        whether that record should be yielded.
+        file_type: FileType.MAIN for the main (IATA/ICAO) POR file,
+        FileType.UNLC for the UN/LOCODE POR file.
+
+        The records are yielded as named tuples, the fields of which
+        are the requested columns (e.g., por_rec.timezone), in that order.
+
+        When a columnar copy of the main POR file is set (see
+        setColumnarCache()), the records of that file are read from it,
+        by batches, and only for the requested columns.
+      """
+      # Download the OPTD data files if needed
+      self.downloadFilesIfNeeded()
+
+      if file_type == FileType.MAIN and self.columnar_cache is not None:
+         yield from self.iterPORFromColumnarCache (columns, predicate)
+         return
+
+      if file_type == FileType.UNLC:
+         por_filepath = self.local_unlc_por_filepath
+      else:
+         por_filepath = self.local_iata_por_filepath
+
+      with openCompressedFile (por_filepath, newline='') as csvfile:
+         file_reader = csv.reader (csvfile, delimiter='^')
+         header = next (file_reader)
+         if columns is None:
+            columns = header
+         self.checkPORColumns (columns, header, por_filepath)
+
+         # Only the requested columns are extracted from the rows,
+         # and directly packed into (lightweight) named tuples
+         por_record_type = collections.namedtuple ('PORRow', columns)
+         column_idx_list = [header.index (column) for column in columns]
+         new_por_record = tuple.__new__
+         if len (column_idx_list) == 1:
+            column_idx = column_idx_list[0]
+            get_por_values = lambda row: (row[column_idx],)
+         else:
+            get_por_values = operator.itemgetter (*column_idx_list)
+
+         for row in file_reader:
+            # Skip empty lines
+            if not row:
+               continue
+
+            por_rec = new_por_record (por_record_type, get_por_values (row))
+            if predicate is None or predicate (por_rec):
+               yield por_rec
+
+      #
+      return
+
+   def iterPORFromColumnarCache (self, columns = None, predicate = None):
+      """
+        Stream the records of the main POR file from its columnar copy
+        (see iterPOR())
+      """
+      dataset = openColumnarCache (self.local_columnar_cache_filepath,
+                                   self.columnar_cache)
+      header = dataset.schema.names
+      if columns is None:
+         columns = header
+      self.checkPORColumns (columns, header,
+                            self.local_columnar_cache_filepath)
+
+      por_record_type = collections.namedtuple ('PORRow', columns)
+      new_por_record = tuple.__new__
+      for batch in dataset.to_batches (columns = list (columns)):
+         batch_columns = [batch.column (column_idx).to_pylist()
+                          for column_idx in range (batch.num_columns)]
+         for por_values in zip (*batch_columns):
+            por_rec = new_por_record (por_record_type, por_values)
+            if predicate is None or predicate (por_rec):
+               yield por_rec
+
+      #
+      return
+
+   def extractPORSubsetFromOPTD (self, index_names = por_index_names):
       """
         Extract a few details from the OpenTravelData (OPTD)
         POR (points of reference)
+
+        index_names: the POR dictionaries to build, among 'iata'
+        (iata_por_dict), 'unlc' (unlc_por_dict) and 'geo' (geo_por_dict).
+        By default, all of them are built. Each dictionary is otherwise
+        built on first use, for instance by getPORByGeoID() for the
+        Geonames one. The POR records themselves are parsed only once,
+        that single pass feeding the requested dictionaries; dictionaries
+        requested later on are built from the POR store. When no
+        dictionary is requested, only the POR store is built.
       """
 
-      # If the dictionaries have already been initialized, just move on,
-      # no need to re-initialize it
-      if not self.iata_por_dict:
-         # Sanity check: either all POR dictionaries should have been
-         # initialized, or none. But one dictionary cannot have been
-         # initialized, while the others were not
-         err_msg = "[OpenTravelData::extractPORSubsetFromOPTD] " \
-            "Consistency error with the two POR dictionaries"
-         assert not self.unlc_por_dict, err_msg
-         assert not self.geo_por_dict, err_msg
-            
-         #
-         self.iata_por_dict = dict()
-         self.unlc_por_dict = dict()
-         self.geo_por_dict = dict()
-      else:
+      # If the requested dictionaries have already been initialized,
+      # just move on, no need to re-initialize them
+      missing_index_names = [index_name for index_name in index_names
+                             if self.porIndex (index_name) is None]
+      if not missing_index_names and self.por_store is not None:
          return
 
-      # Download the OPTD data files if needed
-      self.downloadFilesIfNeeded()        
+      # The POR data, as well as the indexes derived from it on first use
+      # (e.g., the spatial one), are built under a lock, and each of them
+      # is set only once complete, so that concurrent readers (e.g.,
+      # the threads of a server) neither build them twice nor see them
+      # partially built
+      with self.build_lock:
+         missing_index_names = [index_name for index_name in index_names
+                                if self.porIndex (index_name) is None]
+         if not missing_index_names and self.por_store is not None:
+            return
+
+         with self.instrumentedSpan ('extract'):
+            self.loadPORData (index_names, missing_index_names)
+
+         # Sizes of the POR store and dictionaries
+         if self.instrumentation is not None:
+            self.instrumentedGauge ('por_store_rows', len (self.por_store))
+            for index_name in por_index_names:
+               por_index = self.porIndex (index_name)
+               if por_index is not None:
+                  self.instrumentedGauge ('por_index_entries',
+                                          len (por_index), index = index_name)
+
+      #
+      return
+
+   def loadPORData (self, index_names, missing_index_names):
+      """
+        Load the POR records and build the requested POR dictionaries
+        (see extractPORSubsetFromOPTD()), missing_index_names being those
+        which have not been built yet
+      """
+      # The POR records have to be extracted first
+      if self.por_store is None:
+         # Download the OPTD data files if needed
+         self.downloadFilesIfNeeded()        
+
+         # The POR dictionaries may be memory-mapped from a shared index
+         # file. All of them are then available at once
+         if self.use_mmap_index:
+            self.openPORMappedIndex()
+            self.instrumentedCount ('por_loads_total', source = 'mmap')
+
+         # If a snapshot has been built from the same version of the main
+         # POR file, the POR records, and the POR dictionaries it contains,
+         # are just loaded from it
+         source_key = None
+         if self.use_snapshot and self.por_store is None:
+            source_key = sourceFileKey (self.local_iata_por_filepath)
+            if self.loadPORSnapshot (source_key):
+               self.instrumentedCount ('snapshot_lookups_total',
+                                       result = 'hit')
+               self.instrumentedCount ('por_loads_total', source = 'snapshot')
+            else:
+               self.instrumentedCount ('snapshot_lookups_total',
+                                       result = 'miss')
+
+         if self.por_store is None:
+            # Read the POR records from the columnar copy of the main
+            # POR file when set, otherwise parse that latter, feeding
+            # the missing dictionaries
+            por_source = 'file' if self.columnar_cache is None \
+               else 'columnar'
+            start_time = time.perf_counter()
+            with self.instrumentedSpan ('parse', source = por_source):
+               if self.columnar_cache is not None:
+                  (por_store, por_index_dict) = \
+                     self.loadPORColumnarCache (missing_index_names)
+               else:
+                  (por_store, por_index_dict) = \
+                     self.parsePORFile (missing_index_names)
+            if self.instrumentation is not None:
+               self.instrumentedCount ('por_loads_total', source = por_source)
+               self.instrumentedCount ('por_rows_parsed_total',
+                                       len (por_store), source = por_source)
+               self.instrumentedGauge ('parse_rows_per_second',
+                                       len (por_store) / (time.perf_counter()
+                                                          - start_time),
+                                       source = por_source)
+            self.por_store = por_store
+            self.setPORIndexes (por_index_dict)
+
+            # Save the POR dictionaries, so that next processes do not
+            # have to parse the main POR file again
+            if self.use_snapshot:
+               self.savePORSnapshot (source_key)
+
+      # Build the remaining dictionaries from the POR store
+      missing_index_names = [index_name for index_name in index_names
+                             if self.porIndex (index_name) is None]
+      if missing_index_names:
+         if self.verbose:
+            print ("[OpenTravelData::extractPORSubsetFromOPTD] Building " \
+                   f"the {missing_index_names} POR dictionaries")
+         self.setPORIndexes (buildPORIndexes (self.por_store,
+                                              missing_index_names))
+
+      # The graph of the serving POR is precomputed along with the IATA
+      # POR dictionary
+      if self.iata_por_dict is not None and self.serving_por_graph is None:
+         self.buildServingPORGraph()
+
+      return
+
+   def extractUNLCPORSubsetFromOPTD (self):
+      """
+        Parse the OpenTravelData (OPTD) UN/LOCODE POR file, and index its
+        records by UN/LOCODE code (unlc_file_dict) and by Geonames ID
+        (unlc_file_geo_dict). In contrast to unlc_por_dict, which is
+        derived from the main (IATA/ICAO) POR file, those indexes include
+        the POR having only a UN/LOCODE code (e.g., ports, inland depots).
+      """
+      # If the dictionaries have already been initialized, just move on
+      if self.unlc_store is not None:
+         return
+
+      with self.build_lock:
+         if self.unlc_store is not None:
+            return
+
+         # Download the OPTD data files if needed
+         self.downloadFilesIfNeeded()
+
+         if self.verbose:
+            print ("[OpenTravelData::extractUNLCPORSubsetFromOPTD] " \
+                   "Extracting UN/LOCODE POR from " \
+                   f"{self.local_unlc_por_filepath}")
+
+         (unlc_store, unlc_index_dict) = \
+            parseUNLCPORFile (self.local_unlc_por_filepath)
+         unlc_file_dict = PORIndex (unlc_store, unlc_index_dict['unlc'])
+         unlc_file_geo_dict = PORIndex (unlc_store, unlc_index_dict['geo'])
+
+         # The store is set last, as it tells whether the dictionaries
+         # have been initialized
+         self.unlc_file_dict = unlc_file_dict
+         self.unlc_file_geo_dict = unlc_file_geo_dict
+         self.unlc_store = unlc_store
+
+      if self.verbose:
+         print ("[OpenTravelData::extractUNLCPORSubsetFromOPTD] " \
+                f"{len (unlc_store)} UN/LOCODE POR extracted, with " \
+                f"{len (unlc_file_dict)} distinct UN/LOCODE codes")
+      return
+
+   def joinUNLCPORRecord (self, unlc_rec):
+      """
+        Convert a record of the UN/LOCODE POR file into a plain dictionary,
+        joined (on the Geonames ID) to the record of the main POR file,
+        under the 'optd_por' key (None if there is no such record)
+      """
+      unlc_por_rec = dict (unlc_rec)
+      optd_por_rec = None
+      if unlc_por_rec['geonames_id'] in self.geo_por_dict:
+         optd_por_rec = dict (self.geo_por_dict[unlc_por_rec['geonames_id']])
+      unlc_por_rec['optd_por'] = optd_por_rec
+      return unlc_por_rec
+
+   def getUNLCPORList (self, unlc_code):
+      """
+        Retrieve the POR (points of reference) of the UN/LOCODE POR file
+        having a specific UN/LOCODE code (e.g., 'CNSHA'), as plain
+        dictionaries, joined to the records of the main POR file
+        (see joinUNLCPORRecord()). An empty list is returned when
+        the UN/LOCODE code is not known.
+      """
+      self.extractUNLCPORSubsetFromOPTD()
+      self.extractPORSubsetFromOPTD (('geo',))
+
+      if not unlc_code in self.unlc_file_dict:
+         if self.verbose:
+            print ("[OpenTravelData::getUNLCPORList] Error - The " \
+                   f"{unlc_code} UN/LOCODE code cannot be found in OPTD")
+         return []
+
+      return [self.joinUNLCPORRecord (unlc_rec)
+              for unlc_rec in self.unlc_file_dict[unlc_code].values()]
+
+   def getUNLCPORListByGeoID (self, por_geo_id):
+      """
+        Retrieve the POR (points of reference) of the UN/LOCODE POR file
+        corresponding to a specific Geonames ID, as plain dictionaries,
+        joined to the records of the main POR file
+        (see joinUNLCPORRecord()). An empty list is returned when that
+        Geonames ID has no UN/LOCODE code.
+      """
+      self.extractUNLCPORSubsetFromOPTD()
+      self.extractPORSubsetFromOPTD (('geo',))
+
+      if not por_geo_id in self.unlc_file_geo_dict:
+         if self.verbose:
+            print ("[OpenTravelData::getUNLCPORListByGeoID] Error - No " \
+                   f"UN/LOCODE POR with {por_geo_id} as Geonames ID " \
+                   "can be found in OPTD")
+         return []
+
+      return [self.joinUNLCPORRecord (unlc_rec)
+              for unlc_rec in self.unlc_file_geo_dict[por_geo_id].values()]
+
+   def prewarmPORIndexes (self, index_names = por_index_names):
+      """
+        Build the given POR dictionaries (among 'iata', 'unlc' and 'geo')
+        upfront, for instance before serving requests, rather than
+        on first use
+      """
+      self.extractPORSubsetFromOPTD (index_names)
+      return
+
+   def porIndex (self, index_name):
+      """
+        Retrieve a POR dictionary ('iata', 'unlc' or 'geo') by name.
+        None is returned when that dictionary has not been built yet.
+      """
+      return getattr (self, por_index_attributes[index_name])
+
+   def setPORIndexes (self, por_index_dict):
+      """
+        Set the POR dictionaries from (in-memory) indexes on the POR store
+      """
+      for index_name, por_index in por_index_dict.items():
+         setattr (self, por_index_attributes[index_name],
+                  PORIndex (self.por_store, por_index))
+      return
 
+   def parsePORFile (self, index_names = por_index_names):
+      """
+        Parse the main (IATA/ICAO) POR file into a POR store and the
+        requested (in-memory) indexes of its records, by IATA code,
+        UN/LOCODE code and/or Geonames ID. Return the POR store and
+        a dictionary of those indexes, by index name.
+
+        When parse_workers is greater than 1, the (uncompressed) POR file
+        is parsed by that many processes, each one parsing a range
+        of lines (see the parallelparse module), with the same results.
+      """
       # Reporting
       if self.verbose:
-         print ("[OpenTravelData::extractPORSubsetFromOPTD] Extracting " \
+         print ("[OpenTravelData::parsePORFile] Extracting " \
                 f"POR dictionaries from {self.local_iata_por_filepath} " \
                 f"and {self.local_unlc_por_filepath}...")
-           
+
+      # A compressed file cannot be split into byte ranges
+      if self.parse_workers > 1 and self.compression is None:
+         return parsePORFileParallel (self.local_iata_por_filepath,
+                                      index_names, self.parse_workers)
+
+      # The POR records are stored in a compact (column-oriented) store.
+      # The POR dictionaries just reference those records by row ID
+      por_store = PORStore()
+      por_index_dict = {index_name: dict() for index_name in index_names}
+
       # OPTD-maintained list of POR
-      with open (self.local_iata_por_filepath, newline='') as csvfile:
-         file_reader = csv.DictReader (csvfile, delimiter='^')
+      with openCompressedFile (self.local_iata_por_filepath,
+                               newline='') as csvfile:
+         file_reader = csv.reader (csvfile, delimiter='^')
+         header = next (file_reader)
+         get_por_values = operator.itemgetter (*[header.index (field)
+                                                 for field in por_fields])
          for row in file_reader:
-            optd_por_code = row['iata_code']
-            optd_loc_type = row['location_type']
-            optd_geo_id = row['geoname_id']
-            optd_env_id = row['envelope_id']
-            optd_coord_lat = row['latitude']
-            optd_coord_lon = row['longitude']
-            optd_por_name = row['name']
-            optd_page_rank = row['page_rank']
-            optd_ctry_code = row['country_code']
-            optd_ctry_name = row['country_name']
-            optd_adm1_code = row['adm1_code']
-            optd_adm1_name = row['adm1_name_utf']
-            city_code_list_str = row['city_code_list']
-            city_code_list = city_code_list_str.split(',')
-            tvl_por_list_str = row['tvl_por_list']
-            tvl_por_list = tvl_por_list_str.split(',')
-            unlc_list_str = row['unlc_list']
-            unlc_list_tmp = unlc_list_str.split('|')
-            unlc_list = unlc_list_tmp[:-1]
-            
-            optd_por_rec = {'iata_code': optd_por_code,
-                            'location_type': optd_loc_type,
-                            'geoname_id': optd_geo_id,
-                            'envelope_id': optd_env_id,
-                            'latitude': optd_coord_lat,
-                            'longitude': optd_coord_lon,
-                            'name': optd_por_name,
-                            'page_rank': optd_page_rank,
-                            'country_code': optd_ctry_code,
-                            'country_name': optd_ctry_name,
-                            'adm1_code': optd_adm1_code,
-                            'adm1_name_utf': optd_adm1_name,
-                            'city_code_list': city_code_list,
-                            'tvl_por_list': tvl_por_list,
-                            'unlc_list': unlc_list}
-
-            # UN/LOCODE POR dictionary
-            # There may be several POR (points of reference)
-            # with the same UN/LOCODE code. The Geonames ID
-            # then allows to differentiate them
-            for unlc in unlc_list:
-               if not unlc in self.unlc_por_dict:
-                  self.unlc_por_dict[unlc] = dict()
-                  
-               self.unlc_por_dict[unlc][optd_geo_id] = optd_por_rec
-                    
-            # Geonames POR dictionary
-            # There is a single POR (point of reference)
-            # for a specific Geonames ID.
-            if not optd_geo_id in self.geo_por_dict:
-               self.geo_por_dict[optd_geo_id] = optd_por_rec
-               
-            # IATA POR dictionary
-            # Only the POR with a currently valid IATA code are
-            # interesting from this stage onwards
-            if optd_por_code == '' or optd_env_id != '':
+            # Skip empty lines
+            if not row:
                continue
-                 
-            # There may be several POR (points of reference)
-            # with the same IATA code. The location type (e.g.,
-            # 'C' for city, 'A' for airrport) then allows
-            # to differentiate them
-            if not optd_por_code in self.iata_por_dict:
-               self.iata_por_dict[optd_por_code] = dict()
 
-            self.iata_por_dict[optd_por_code][optd_loc_type] = optd_por_rec
+            por_values = get_por_values (row)
+            row_id = por_store.append (por_values)
+            indexPORRecord (por_index_dict, row_id, *por_values[:4],
+                            por_values[por_unlc_list_idx])
 
-      #
+      return (por_store, por_index_dict)
+
+   def loadPORColumnarCache (self, index_names = por_index_names):
+      """
+        Load the POR records from the columnar copy of the main POR file
+        (see setColumnarCache()), reading only the columns of the POR
+        store, and build the requested (in-memory) indexes of those
+        records. Return the same as parsePORFile().
+      """
+      if self.verbose:
+         print ("[OpenTravelData::loadPORColumnarCache] Loading POR " \
+                f"records from {self.local_columnar_cache_filepath}")
+
+      por_table = openColumnarCache (self.local_columnar_cache_filepath,
+                                     self.columnar_cache) \
+                                     .to_table (columns = list (por_fields))
+      por_store = PORStore ({field: por_table.column (field).to_pylist()
+                             for field in por_fields})
+      return (por_store, buildPORIndexes (por_store, index_names))
+
+   def openPORMappedIndex (self):
+      """
+        Memory-map the POR index file, so that the POR dictionaries are
+        shared (through the page cache) by all the processes using the
+        same local directory. If that index file is missing, or has been
+        built from another version of the main POR file, it is first
+        (re-)built by the first process getting there.
+      """
+      try:
+         por_store = openMappedIndex (self.local_mmap_index_filepath,
+                                      self.local_iata_por_filepath,
+                                      self.parsePORFile)
+      except OSError:
+         err_msg = "[OpenTravelData::openPORMappedIndex] Error while " \
+            f"building or mapping the {self.local_mmap_index_filepath} " \
+            "index file"
+         raise OPTDLocalFileError (err_msg)
+
+      self.por_store = por_store
+      self.iata_por_dict = por_store.index ('iata')
+      self.unlc_por_dict = por_store.index ('unlc')
+      self.geo_por_dict = por_store.index ('geo')
+
+      if self.verbose:
+         print ("[OpenTravelData::openPORMappedIndex] POR dictionaries " \
+                f"mapped from {self.local_mmap_index_filepath}")
       return
 
+   def loadPORSnapshot (self, source_key):
+      """
+        Load the POR dictionaries from the binary snapshot, if that latter
+        has been built from the version of the main POR file identified
+        by the given key. Return whether the snapshot could be used.
+      """
+      payload = loadSnapshot (self.local_snapshot_filepath, source_key)
+      if payload is None:
+         if self.verbose:
+            print ("[OpenTravelData::loadPORSnapshot] No up-to-date " \
+                   f"snapshot in {self.local_snapshot_filepath}")
+         return False
+
+      # The snapshot only holds plain data, from which the POR store
+      # and the POR dictionaries it contains (all of them may not have
+      # been built when the snapshot was saved) are re-built. The values
+      # of the store come already pooled (see snapshot.py)
+      try:
+         columns = payload['columns']
+         if not all (isinstance (columns[field], list)
+                     for field in PORStore.fields):
+            raise TypeError ("POR columns are expected to be lists")
+         por_store = PORStore (columns, is_pooled = True)
+         por_index_dict = {index_name: payload[index_name]
+                           for index_name in por_index_names
+                           if index_name in payload}
+         for por_index in por_index_dict.values():
+            if not isinstance (por_index, dict):
+               raise TypeError ("POR dictionaries are expected to be dict")
+      except (KeyError, TypeError, ValueError):
+         if self.verbose:
+            print ("[OpenTravelData::loadPORSnapshot] Malformed " \
+                   f"snapshot in {self.local_snapshot_filepath}")
+         return False
+
+      self.por_store = por_store
+      self.setPORIndexes (por_index_dict)
+
+      if self.verbose:
+         print ("[OpenTravelData::loadPORSnapshot] POR dictionaries " \
+                f"loaded from {self.local_snapshot_filepath}")
+      return True
+
+   def savePORSnapshot (self, source_key):
+      """
+        Save the POR dictionaries into the binary snapshot, keyed on the
+        given key of the main POR file.
+      """
+      payload = {'columns': self.por_store.columns}
+      for index_name in por_index_names:
+         por_index = self.porIndex (index_name)
+         if por_index is not None:
+            payload[index_name] = por_index.index
+      try:
+         saveSnapshot (self.local_snapshot_filepath, source_key, payload)
+      except OSError:
+         err_msg = "[OpenTravelData::savePORSnapshot] Error while " \
+            f"writing the {self.local_snapshot_filepath} snapshot"
+         raise OPTDLocalFileError (err_msg)
+
+      if self.verbose:
+         print ("[OpenTravelData::savePORSnapshot] POR dictionaries " \
+                f"saved into {self.local_snapshot_filepath}")
+      return
+
+   def addPORRefreshListener (self, listener):
+      """
+        Register a callable, which is called with the summary of the
+        changes (see refreshPORData()) whenever the POR data is refreshed,
+        for instance to invalidate downstream caches
+      """
+      self.por_refresh_listeners.append (listener)
+      return
+
+   def refreshPORData (self):
+      """
+        Refresh the POR data from a new release of the OPTD data files,
+        without re-building the POR dictionaries from scratch.
+
+        The data files are downloaded again if they have changed
+        (see downloadFilesIfNeeded()). If the main POR file has changed,
+        it is parsed and diffed against the POR records currently loaded,
+        keyed by Geonames ID, IATA code and location type. Only the added,
+        changed and removed POR records are then applied to the POR store
+        and to the POR dictionaries built so far. The indexes derived from
+        those (serving POR graph, location type and spatial indexes)
+        are re-built on next use. When the POR dictionaries are
+        memory-mapped, the mapped index is re-built and re-mapped as
+        a whole instead.
+
+        Return the summary of the changes, i.e., a dictionary of the lists
+        of the (Geonames ID, IATA code, location type) keys of the 'added',
+        'changed' and 'removed' POR records, which is also passed to the
+        registered listeners (see addPORRefreshListener()).
+      """
+      por_change_summary = {'added': [], 'changed': [], 'removed': []}
+
+      (iata_download_status, unlc_download_status) = self.downloadPORFiles()
+      if self.validate_file_sizes:
+         self.validateFileSizes()
+      if self.columnar_cache is not None:
+         self.updateColumnarCache()
+
+      # The UN/LOCODE POR file is parsed again on next use
+      if unlc_download_status != 'not-modified':
+         self.unlc_store = None
+         self.unlc_file_dict = None
+         self.unlc_file_geo_dict = None
+
+      # Nothing to refresh when the main POR file has not changed or has
+      # not been loaded yet (it will then be parsed on first use)
+      if iata_download_status == 'not-modified' or self.por_store is None:
+         if self.verbose:
+            print ("[OpenTravelData::refreshPORData] No POR data to refresh")
+         return por_change_summary
+
+      if self.use_mmap_index:
+         old_por_store = self.por_store
+         self.openPORMappedIndex()
+         por_delta = diffPORStores (old_por_store, self.por_store)
+      else:
+         (new_por_store, _) = self.parsePORFile (())
+         por_delta = diffPORStores (self.por_store, new_por_store)
+         por_index_dict = dict()
+         for index_name in por_index_names:
+            por_index = self.porIndex (index_name)
+            if por_index is not None:
+               por_index_dict[index_name] = por_index.index
+         applyPORDelta (self.por_store, por_index_dict, por_delta)
+
+      # The derived indexes are re-built on next use
+      self.por_type_index = None
+      self.por_spatial_index = None
+      self.por_name_index = None
+      self.por_fuzzy_name_index = None
+      self.por_typed_columns = None
+      self.serving_por_graph = None
+      if self.iata_por_dict is not None:
+         self.buildServingPORGraph()
+
+      por_change_summary = summarizePORDelta (por_delta)
+      if self.verbose:
+         print ("[OpenTravelData::refreshPORData] POR data refreshed - " \
+                f"Added: {len (por_change_summary['added'])}, changed: " \
+                f"{len (por_change_summary['changed'])}, removed: " \
+                f"{len (por_change_summary['removed'])}")
+
+      for listener in self.por_refresh_listeners:
+         listener (por_change_summary)
+      return por_change_summary
+
+   def memoryFootprint (self):
+      """
+        Estimate the memory used by the POR store and dictionaries,
+        in Bytes
+      """
+      # Only the POR dictionaries built so far are accounted for
+      footprint_dict = dict()
+      if self.por_store is not None:
+         footprint_dict['por_store'] = self.por_store.memoryFootprint()
+      for index_name in por_index_names:
+         por_index = self.porIndex (index_name)
+         if por_index is not None:
+            footprint_dict[por_index_attributes[index_name]] = \
+               por_index.memoryFootprint()
+      if self.unlc_store is not None:
+         footprint_dict['unlc_store'] = self.unlc_store.memoryFootprint()
+         footprint_dict['unlc_file_dict'] = \
+            self.unlc_file_dict.memoryFootprint()
+         footprint_dict['unlc_file_geo_dict'] = \
+            self.unlc_file_geo_dict.memoryFootprint()
+      return footprint_dict
+
    def isAirport (self, loc_type = None):
       """
         That method states whether the lcation type corresponds
         to an airport
       """
-      is_airport = re.search ("A", loc_type)
+      is_airport = bool (parseLocationType (loc_type)
+                   & LocationType.AIRPORT)
       return is_airport
      
    def isHeliport (self, loc_type = None):
@@ -664,7 +1456,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to an heliport
       """
-      is_heliport = re.search ("H", loc_type)
+      is_heliport = bool (parseLocationType (loc_type)
+                    & LocationType.HELIPORT)
       return is_heliport
      
    def isPort (self, loc_type = None):
@@ -672,7 +1465,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to a maritime/river port
       """
-      is_port = re.search ("P", loc_type)
+      is_port = bool (parseLocationType (loc_type)
+                & LocationType.PORT)
       return is_port
      
    def isRailwayStation (self, loc_type = None):
@@ -680,7 +1474,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to a railway station
       """
-      is_railway_station = re.search ("R", loc_type)
+      is_railway_station = bool (parseLocationType (loc_type)
+                           & LocationType.RAILWAY_STATION)
       return is_railway_station
      
    def isBusStation (self, loc_type = None):
@@ -688,7 +1483,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to a bus station
       """
-      is_bus_station = re.search ("B", loc_type)
+      is_bus_station = bool (parseLocationType (loc_type)
+                       & LocationType.BUS_STATION)
       return is_bus_station
      
    def isOffline (self, loc_type = None):
@@ -696,7 +1492,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to an offline point
       """
-      is_offpoint = re.search ("O", loc_type)
+      is_offpoint = bool (parseLocationType (loc_type)
+                    & LocationType.OFFLINE)
       return is_offpoint
      
    def isTransportRelated (self, loc_type = None):
@@ -704,9 +1501,8 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to a serving POR wrt travel or transport
       """
-      is_tvl = self.isAirport (loc_type) or self.isHeliport (loc_type) \
-         or self.isPort (loc_type) or self.isRailwayStation (loc_type) \
-         or self.isBusStation (loc_type) or self.isOffline (loc_type)
+      is_tvl = bool (parseLocationType (loc_type)
+                     & LocationType.TRANSPORT_RELATED)
       return is_tvl
      
    def isCity (self, loc_type = None):
@@ -714,9 +1510,360 @@ class OpenTravelData():
         That method states whether the lcation type corresponds
         to a city
       """
-      is_city = re.search ("C", loc_type) or re.search ("O", loc_type)
+      is_city = bool (parseLocationType (loc_type)
+                      & (LocationType.CITY | LocationType.OFFLINE))
       return is_city
 
+   def getPORListByType (self, loc_type_flags, country_code = None,
+                         match_all = False):
+      """
+        Retrieve the (current) POR (points of reference) of the given
+        location types, optionally in a given country (ISO 3166-1 code).
+
+        loc_type_flags: LocationType bit flags (e.g., LocationType.AIRPORT
+        | LocationType.HELIPORT), or an OPTD location type string
+        (e.g., 'AH'). POR having any of those location types are retrieved
+        or, when match_all is True, only the POR having all of them.
+
+        The POR records are returned as plain dictionaries, in the order
+        of the main POR file.
+      """
+      if isinstance (loc_type_flags, str):
+         loc_type_flags = parseLocationType (loc_type_flags)
+
+      # The location type index is built on first use
+      if self.por_type_index is None:
+         with self.build_lock:
+            if self.por_type_index is None:
+               self.extractPORSubsetFromOPTD (())
+               self.por_type_index = PORTypeIndex (self.por_store)
+
+      row_ids = self.por_type_index.rowIDs (loc_type_flags, country_code,
+                                            match_all)
+      por_list = [dict (self.por_store.record (row_id)) for row_id in row_ids]
+      return por_list
+
+   def porSpatialIndex (self):
+      """
+        Retrieve the spatial index of the (current) POR, building it
+        on first use
+      """
+      if self.por_spatial_index is None:
+         with self.build_lock:
+            if self.por_spatial_index is None:
+               self.extractPORSubsetFromOPTD (())
+               self.por_spatial_index = PORSpatialIndex (self.por_store)
+               if self.verbose:
+                  print ("[OpenTravelData::porSpatialIndex] Spatial index " \
+                         f"built for {len (self.por_spatial_index)} POR")
+      return self.por_spatial_index
+
+   def porDistanceList (self, dist_list):
+      """
+        Convert a list of (distance, row ID) tuples into a list
+        of (distance, POR record as a plain dictionary) tuples
+      """
+      return [(distance, dict (self.por_store.record (row_id)))
+              for (distance, row_id) in dist_list]
+
+   def getNearestPORList (self, latitude, longitude, k = 1,
+                          loc_type_flags = None):
+      """
+        Retrieve the k (current) POR (points of reference) nearest to
+        the given point (latitude and longitude in degrees), as a list
+        of (distance in kilometers, POR record) tuples, sorted by distance.
+
+        loc_type_flags: when given, LocationType bit flags
+        (e.g., LocationType.AIRPORT) or OPTD location type string
+        (e.g., 'A'), restricting the POR to those having any of those
+        location types
+      """
+      dist_list = self.porSpatialIndex().nearest (latitude, longitude, k,
+                                                  loc_type_flags)
+      return self.porDistanceList (dist_list)
+
+   def getNearestPORLists (self, points, k = 1, loc_type_flags = None):
+      """
+        Batch version of getNearestPORList(), for a sequence
+        of (latitude, longitude) points
+      """
+      por_spatial_index = self.porSpatialIndex()
+      return [self.porDistanceList (dist_list) for dist_list in
+              por_spatial_index.nearestBatch (points, k, loc_type_flags)]
+
+   def getPORListWithinRadius (self, latitude, longitude, radius_km,
+                               loc_type_flags = None):
+      """
+        Retrieve the (current) POR (points of reference) within the given
+        radius (in kilometers) of the given point, as a list of (distance
+        in kilometers, POR record) tuples, sorted by distance.
+        See getNearestPORList() for loc_type_flags.
+      """
+      dist_list = self.porSpatialIndex().withinRadius (latitude, longitude,
+                                                       radius_km,
+                                                       loc_type_flags)
+      return self.porDistanceList (dist_list)
+
+   def getPORListsWithinRadius (self, points, radius_km,
+                                loc_type_flags = None):
+      """
+        Batch version of getPORListWithinRadius(), for a sequence
+        of (latitude, longitude) points
+      """
+      por_spatial_index = self.porSpatialIndex()
+      return [self.porDistanceList (dist_list) for dist_list in
+              por_spatial_index.withinRadiusBatch (points, radius_km,
+                                                   loc_type_flags)]
+
+   def porNameIndex (self):
+      """
+        Retrieve the prefix (typeahead) index of the (current) POR,
+        on their names, building it on first use
+      """
+      if self.por_name_index is None:
+         with self.build_lock:
+            if self.por_name_index is None:
+               self.extractPORSubsetFromOPTD (())
+               self.por_name_index = PORNameIndex (self.por_store)
+               if self.verbose:
+                  print ("[OpenTravelData::porNameIndex] Name index built " \
+                         f"with {len (self.por_name_index)} entries")
+      return self.por_name_index
+
+   def getPORListByName (self, prefix, k = 10, languages = None,
+                         loc_type_flags = None):
+      """
+        Retrieve the (up to) k (current) POR (points of reference) having
+        a name (name, ASCII name or alternate name) one of the words
+        of which starts with the given prefix, e.g., for autocompletion.
+        The names are compared once normalized (without accents, case
+        nor punctuation). The POR are ranked by decreasing PageRank, and
+        returned as a list of (matched name, POR record) tuples.
+
+        languages: when given, the languages (e.g., ['en', 'fr']) to which
+        the alternate names are restricted
+        loc_type_flags: see getNearestPORList()
+      """
+      name_list = self.porNameIndex().search (prefix, k, languages,
+                                              loc_type_flags)
+      return [(name, dict (self.por_store.record (row_id)))
+              for (name, row_id) in name_list]
+
+   def porFuzzyNameIndex (self):
+      """
+        Retrieve the trigram index of the (current) POR, on their names,
+        building it on first use
+      """
+      if self.por_fuzzy_name_index is None:
+         with self.build_lock:
+            if self.por_fuzzy_name_index is None:
+               self.extractPORSubsetFromOPTD (())
+               self.por_fuzzy_name_index = PORFuzzyNameIndex (self.por_store)
+               if self.verbose:
+                  print ("[OpenTravelData::porFuzzyNameIndex] Trigram " \
+                         f"index built for {len (self.por_fuzzy_name_index)} " \
+                         "names")
+      return self.por_fuzzy_name_index
+
+   def porScoredList (self, match_list):
+      """
+        Convert a list of (score, matched name, row ID) tuples into a list
+        of (score, matched name, POR record as a plain dictionary) tuples
+      """
+      return [(score, name, dict (self.por_store.record (row_id)))
+              for (score, name, row_id) in match_list]
+
+   def matchPORName (self, name, k = 5, min_score = 0.3, country_code = None,
+                     loc_type_flags = None):
+      """
+        Match a free-text name, possibly misspelled or transliterated
+        differently, to the (current) POR (points of reference) having
+        the most similar names (name, ASCII name or alternate name). The
+        similarity is the Jaccard index of the character trigrams of the
+        names, once normalized (without accents, case nor punctuation).
+
+        Return the (up to) k best matching POR, with a similarity of at
+        least min_score, as a list of (score, matched name, POR record)
+        tuples, sorted by decreasing score (and then PageRank).
+
+        country_code: when given, the country to which the POR are
+        restricted (e.g., 'UA')
+        loc_type_flags: see getNearestPORList()
+      """
+      match_list = self.porFuzzyNameIndex().match (name, k, min_score,
+                                                   country_code,
+                                                   loc_type_flags)
+      return self.porScoredList (match_list)
+
+   def matchPORNames (self, names, k = 5, min_score = 0.3,
+                      country_code = None, loc_type_flags = None,
+                      workers = 1):
+      """
+        Batch version of matchPORName(), for a sequence of names, e.g.,
+        to reconcile the names of a partner feed offline. Each distinct
+        name is matched once and, when workers is greater than 1, the names
+        are matched by that many processes.
+      """
+      match_lists = self.porFuzzyNameIndex().matchBatch (
+         names, k, min_score, country_code, loc_type_flags, workers)
+      return [self.porScoredList (match_list) for match_list in match_lists]
+
+   def getPORColumns (self, fields = None):
+      """
+        Retrieve the (not removed) POR records as typed columns, by field
+        name (see the export module): arrays of floats or integers for the
+        numeric fields (e.g., latitude, page_rank), dictionary-encoded
+        columns for the categorical ones (e.g., country_code,
+        location_type). By default, all the fields are retrieved.
+
+        The typed columns are converted once, on first use, and then
+        shared by the NumPy, pandas and Arrow exports.
+      """
+      self.extractPORSubsetFromOPTD (())
+      if fields is None:
+         fields = por_fields
+
+      # The typed columns built so far are replaced by a new dictionary,
+      # rather than updated, so that concurrent readers never see
+      # a partially built one
+      por_typed_columns = self.por_typed_columns or dict()
+      missing_fields = [field for field in fields
+                        if not field in por_typed_columns]
+      if missing_fields:
+         with self.build_lock:
+            por_typed_columns = dict (self.por_typed_columns or dict())
+            missing_fields = [field for field in fields
+                              if not field in por_typed_columns]
+            por_typed_columns.update (typedPORColumns (self.por_store,
+                                                       missing_fields))
+            self.por_typed_columns = por_typed_columns
+         if self.verbose:
+            print ("[OpenTravelData::getPORColumns] Typed columns built " \
+                   f"for {', '.join (missing_fields)}")
+      return {field: por_typed_columns[field] for field in fields}
+
+   def getPORNumPyArrays (self, fields = None):
+      """
+        Retrieve the POR records as NumPy arrays, by field name (see
+        getPORColumns()). The dictionary-encoded columns are given as
+        (codes, categories) tuples of arrays. Requires NumPy.
+      """
+      return columnsToNumPy (self.getPORColumns (fields))
+
+   def getPORDataFrame (self, fields = None):
+      """
+        Retrieve the POR records as a pandas DataFrame (see getPORColumns()),
+        with categorical columns for the dictionary-encoded fields.
+        Requires pandas.
+      """
+      return columnsToPandas (self.getPORColumns (fields))
+
+   def getPORArrowTable (self, fields = None):
+      """
+        Retrieve the POR records as an Arrow table (see getPORColumns()),
+        with dictionary arrays for the dictionary-encoded fields.
+        Requires pyarrow.
+      """
+      return columnsToArrow (self.getPORColumns (fields))
+
+   def porRowIDByCode (self, por_code, loc_type = None):
+      """
+        Row ID of the (current) POR having a given IATA code or Geonames ID
+        (all digits), or None when there is no such POR. An IATA code
+        may correspond to several POR, e.g., a city and an airport: the POR
+        of the given location type (e.g., 'C') is then retrieved when
+        given, otherwise the first travel-/transport-related one, if any.
+        The POR dictionaries may be in-memory or memory-mapped.
+      """
+      # Geonames IDs may be given as integers, e.g., as returned
+      # by getServingPORList()
+      if isinstance (por_code, int):
+         por_code = str (por_code)
+      if por_code.isdigit():
+         if self.geo_por_dict is None:
+            self.extractPORSubsetFromOPTD (('geo',))
+         row_ids = self.geo_por_dict.rowIDs (por_code)
+         return row_ids[0] if row_ids else None
+
+      if self.iata_por_dict is None:
+         self.extractPORSubsetFromOPTD (('iata',))
+      row_ids = self.iata_por_dict.rowIDs (por_code)
+      if not row_ids:
+         return None
+      por_loc_types = [self.por_store.value (row_id, 'location_type')
+                       for row_id in row_ids]
+      if loc_type is not None:
+         if not loc_type in por_loc_types:
+            return None
+         return row_ids[por_loc_types.index (loc_type)]
+      for por_loc_type, row_id in zip (por_loc_types, row_ids):
+         if parseLocationType (por_loc_type) & LocationType.TRANSPORT_RELATED:
+            return row_id
+      return row_ids[0]
+
+   def porPoints (self, por_codes, loc_type = None):
+      """
+        Coordinates of the POR having the given IATA codes or Geonames IDs
+        (see porRowIDByCode()), as point arrays (see the distancematrix
+        module). Unknown POR get NaN coordinates.
+      """
+      self.extractPORSubsetFromOPTD (('iata', 'geo'))
+      lats = []
+      lons = []
+      unknown_codes = []
+      for por_code in por_codes:
+         row_id = self.porRowIDByCode (por_code, loc_type)
+         try:
+            lats.append (float (self.por_store.value (row_id, 'latitude')))
+            lons.append (float (self.por_store.value (row_id, 'longitude')))
+         except (TypeError, ValueError):
+            unknown_codes.append (por_code)
+            lats.append (float ('nan'))
+            lons.append (float ('nan'))
+
+      if unknown_codes and self.verbose:
+         print ("[OpenTravelData::porPoints] No coordinates for " \
+                f"{unknown_codes}")
+      return PointArrays (lats, lons)
+
+   def getPORDistanceMatrix (self, origin_codes, destination_codes,
+                             loc_type = None):
+      """
+        Compute the matrix of the great-circle distances, in kilometers,
+        between each origin (rows) and each destination (columns), given
+        by their IATA codes or Geonames IDs (see porRowIDByCode() for
+        loc_type). The distances are NaN for the unknown POR.
+
+        The distances are computed over whole arrays of coordinates by
+        NumPy, when it is installed: the matrix is then a 2D NumPy array.
+        Otherwise, it is a list of rows (arrays of floats).
+      """
+      return haversineMatrix (self.porPoints (origin_codes, loc_type),
+                              self.porPoints (destination_codes, loc_type))
+
+   def iterPORDistanceMatrix (self, origin_codes, destination_codes,
+                              chunk_size = 1024, loc_type = None):
+      """
+        Chunked version of getPORDistanceMatrix(), for matrices too large
+        to be held in memory: the matrix is yielded by blocks of (at most)
+        chunk_size rows (origins), as (index of the first origin, block)
+        tuples
+      """
+      return iterHaversineMatrix (self.porPoints (origin_codes, loc_type),
+                                  self.porPoints (destination_codes, loc_type),
+                                  chunk_size)
+
+   def getPORPairDistances (self, origin_codes, destination_codes,
+                            loc_type = None):
+      """
+        Element-wise version of getPORDistanceMatrix(), e.g., for a list
+        of routes: the distance between the i-th origin and the i-th
+        destination, for each i. The distances are a NumPy array when
+        NumPy is installed, an array of floats otherwise.
+      """
+      return haversinePairs (self.porPoints (origin_codes, loc_type),
+                             self.porPoints (destination_codes, loc_type))
+
    def getPORByGeoID (self, por_geo_id):
       """
         Retrieve the POR (point of reference) corresponding to a specific
@@ -725,19 +1872,27 @@ class OpenTravelData():
         https://geonames.org/<geonames-id>
       """
       optd_por_rec = None
+      instrumentation = self.instrumentation
+      if instrumentation is not None:
+         start_time = time.perf_counter()
        
-      # If the dictionary is still empty, initialize it
-      if not self.geo_por_dict:
-         self.extractPORSubsetFromOPTD()
+      # If the dictionary has not been built yet, build it
+      if self.geo_por_dict is None:
+         self.extractPORSubsetFromOPTD (('geo',))
 
       #
+      # The POR record is returned as a plain (mutable, JSON-serializable)
+      # dictionary, rather than as a view on the POR store
       if por_geo_id in self.geo_por_dict:
-         optd_por_rec = self.geo_por_dict[por_geo_id]
+         optd_por_rec = dict (self.geo_por_dict[por_geo_id])
       else:
          if self.verbose:
             print ("[OpenTravelData::getPORByGeoID] Error - A POR with " \
                    f"{por_geo_id} as Geonames ID cannot be found in OPTD")
 
+      if instrumentation is not None:
+         self.recordLookup ('getPORByGeoID', start_time,
+                            optd_por_rec is not None)
       return optd_por_rec
 
    def isPORRecInTvlList (self, tvl_list, tvl_sht_rec):
@@ -769,143 +1924,111 @@ class OpenTravelData():
           {'DPA', 'MDW', 'ORD', 'PWK', 'RFD'}
       """
        
-      # If the dictionary is still empty, initialize it
-      if not self.iata_por_dict:
-         self.extractPORSubsetFromOPTD()
-
-      # Initialize the return structure (list)
-      original_por_rec = {'iata_code': por_code, 'location_type': None,
-                          'geoname_id': None, 'envelope_id': None,
-                          'name': None,
-                          'country_code': None, 'country_name': None,
-                          'adm1_code': None, 'adm1_name_utf': None}
-      tvl_list = []
-      srv_dict = {'original': original_por_rec, 'tvl_list': tvl_list}
-
-      # Retrieve the OPTD POR corresponding to the given POR IATA code
-      if not por_code in self.iata_por_dict:
+      # Nothing but that check is done when there is no instrumentation
+      instrumentation = self.instrumentation
+      if instrumentation is not None:
+         start_time = time.perf_counter()
+
+      # The serving POR are read from the precomputed graph
+      serving_por_graph = self.servingPORGraph()
+      if not por_code in serving_por_graph:
+         if instrumentation is not None:
+            self.recordLookup ('getServingPORList', start_time, False)
          err_msg = f"[OpenTravelData::getAirportList] The {por_code} " \
             "IATA code does not seem to be valid in OPTD"
          raise OPTDIATACodeError (err_msg)
 
-      optd_por_rec_dict = self.iata_por_dict[por_code]
-      have_city_details_been_set = False
-      for optd_loc_type, optd_por_rec in optd_por_rec_dict.items():
-         # Retrieve the details of the POR
-         geo_id = optd_por_rec['geoname_id']
-         geo_id = int (geo_id)
-         env_id = optd_por_rec['envelope_id']
-         por_name = optd_por_rec['name']
-         ctry_code = optd_por_rec['country_code']
-         ctry_name = optd_por_rec['country_name']
-         adm1_code = optd_por_rec['adm1_code']
-         adm1_name_utf = optd_por_rec['adm1_name_utf']
-           
-         # If the POR is transport-related, add it to the target list
-         # (tvl_list), if not already there.
-         is_transport_related = self.isTransportRelated (optd_loc_type)
-         if is_transport_related:
-            tvl_sht_rec = {'iata_code': por_code,
-                           'location_type': optd_loc_type,
-                           'geoname_id': geo_id,
-                           'envelope_id': env_id,
-                           'name': por_name,
-                           'country_code': ctry_code,
-                           'country_name': ctry_name,
-                           'adm1_code': adm1_code,
-                           'adm1_name_utf': adm1_name_utf}
-            
-            # Add to the list only if not already there
-            if not self.isPORRecInTvlList (tvl_list, tvl_sht_rec):
-               tvl_list.append (tvl_sht_rec)
-
-            # If the details for a city have not already been set,
-            # update the original POR details (as it may not be a city,
-            # like for instance CDG, LHR or ORD)
-            if not have_city_details_been_set:
-               original_por_rec['location_type'] = optd_loc_type
-               original_por_rec['geoname_id'] = geo_id
-               original_por_rec['envelope_id'] = env_id
-               original_por_rec['name'] = por_name
-               original_por_rec['country_code'] = ctry_code
-               original_por_rec['country_name'] = ctry_name
-               original_por_rec['adm1_code'] = adm1_code
-               original_por_rec['adm1_name_utf'] = adm1_name_utf
-                 
-         # When the POR is a city (e.g., BAK, IEV), the list
-         # of airports, among the list of serving
-         # travel-/transport-related points, have to be retrieved.
-         # Note that non-airport POR (e.g., railway stations, ports)
-         # may also serve a given city.
-         is_city = re.search ("C", optd_loc_type)
-
-         # When the POR is not city (and can no longer be a
-         # transport-/travel-related serving POR, or an offline point,
-         # as those cases have been handled above), there is no
-         # travel-/transport-related serving POR, by definition.
-         if not is_city: continue
-
-         # The update of the details for the (city) POR has to be done once.
-         # Example of multiple city POR having the same IATA code: RDU
-         if have_city_details_been_set: continue
-           
-         # Record that the details for the city POR will have been set (once
-         # the following code will be executed)
-         have_city_details_been_set = True
-         original_por_rec['location_type'] = optd_loc_type
-         original_por_rec['geoname_id'] = geo_id
-         original_por_rec['envelope_id'] = env_id
-         original_por_rec['name'] = por_name
-         original_por_rec['country_code'] = ctry_code
-         original_por_rec['country_name'] = ctry_name
-         original_por_rec['adm1_code'] = adm1_code
-         original_por_rec['adm1_name_utf'] = adm1_name_utf
-           
-         # Derive the serving travel-/transport-related points
-         tvl_por_list = optd_por_rec['tvl_por_list']
-           
-         for tvl_por_code in tvl_por_list:
-            if not tvl_por_code in self.iata_por_dict:
-               err_msg = "[OpenTravelData::getAirportList] The " \
-                  f"{tvl_por_code} IATA code (transport-related), " \
-                  f"serving {por_code} (city), does not seem " \
-                  "to be valid in OPTD"
+      srv_dict = serving_por_graph.servingPORStruct (por_code)
+      if instrumentation is not None:
+         self.recordLookup ('getServingPORList', start_time, True)
+      return srv_dict
+
+   def getServingPORLists (self, por_codes, only_when_city_code_differs = True,
+                           collect_errors = False):
+      """
+        Derive the lists of travel-/transport-related POR (point of
+        reference) for many IATA codes at once, in the same format as
+        getServingPORList(). Each distinct code is resolved once.
+
+        Return a tuple made of a dictionary of the results, by IATA code,
+        and of a dictionary of the errors, by IATA code. When collect_errors
+        is False, the first invalid IATA code raises OPTDIATACodeError
+        (as getServingPORList() does), and the dictionary of the errors
+        is therefore always empty. When collect_errors is True, the invalid
+        IATA codes are reported in that latter dictionary, with the
+        OPTDIATACodeError exception they would have raised.
+
+        Duplicated codes yield the same result object.
+      """
+      serving_por_graph = self.servingPORGraph()
+
+      srv_dict_by_code = dict()
+      err_dict_by_code = dict()
+      for por_code in por_codes:
+         if por_code in srv_dict_by_code or por_code in err_dict_by_code:
+            continue
+
+         if not por_code in serving_por_graph:
+            err_msg = f"[OpenTravelData::getServingPORLists] The " \
+               f"{por_code} IATA code does not seem to be valid in OPTD"
+            if not collect_errors:
                raise OPTDIATACodeError (err_msg)
+            err_dict_by_code[por_code] = OPTDIATACodeError (err_msg)
+            continue
 
-            # Browse the various location types for that IATA code
-            tvl_por_rec_dict = self.iata_por_dict[tvl_por_code]
-            for tvl_loc_type, tvl_por_rec in tvl_por_rec_dict.items():
-               # From the full POR record, retrieve the Geonames ID
-               is_transport_related = self.isTransportRelated (tvl_loc_type)
-               if is_transport_related:
-                  # Retrieve the Geonames ID and the envelope ID
-                  geo_id = tvl_por_rec['geoname_id']
-                  geo_id = int (geo_id)
-                  env_id = tvl_por_rec['envelope_id']
-                  por_name = tvl_por_rec['name']
-                  ctry_code = tvl_por_rec['country_code']
-                  ctry_name = tvl_por_rec['country_name']
-                  adm1_code = tvl_por_rec['adm1_code']
-                  adm1_name_utf = tvl_por_rec['adm1_name_utf']
-
-                  # Insert into the target list (tvl_list)
-                  # only if not already present there
-                  # As dictionaries are not hashables,
-                  # a direct comparison cannot be made
-                  tvl_sht_rec = {'iata_code': tvl_por_code,
-                                 'location_type': tvl_loc_type,
-                                 'geoname_id': geo_id,
-                                 'envelope_id': env_id,
-                                 'name': por_name,
-                                 'country_code': ctry_code,
-                                 'country_name': ctry_name,
-                                 'adm1_code': adm1_code,
-                                 'adm1_name_utf': adm1_name_utf}
-
-                  # Add to the list only if not already there
-                  if not self.isPORRecInTvlList (tvl_list, tvl_sht_rec):
-                     tvl_list.append (tvl_sht_rec)
+         srv_dict_by_code[por_code] = \
+            serving_por_graph.servingPORStruct (por_code)
 
-      #
-      return srv_dict
+      return (srv_dict_by_code, err_dict_by_code)
+
+   def getServedPORList (self, tvl_por_code):
+      """
+        Derive the list of the IATA codes (e.g., cities) served by a given
+        travel-/transport-related POR (e.g., airport) IATA code, i.e.,
+        the reverse of getServingPORList()
+      """
+      serving_por_graph = self.servingPORGraph()
+      if not tvl_por_code in serving_por_graph:
+         err_msg = f"[OpenTravelData::getServedPORList] The " \
+            f"{tvl_por_code} IATA code does not seem to be valid in OPTD"
+         raise OPTDIATACodeError (err_msg)
+
+      return serving_por_graph.servedCodeList (tvl_por_code)
+
+   def servingPORGraph (self):
+      """
+        Retrieve the graph of the serving POR, building the IATA POR
+        dictionary (and that graph along with it) if needed
+      """
+      if self.serving_por_graph is None:
+         with self.build_lock:
+            self.extractPORSubsetFromOPTD (('iata',))
+            if self.serving_por_graph is None:
+               self.buildServingPORGraph()
+      return self.serving_por_graph
+
+   def buildServingPORGraph (self):
+      """
+        Precompute the graph of the travel-/transport-related POR serving
+        each IATA code (and its reverse) from the IATA POR dictionary.
+        The integrity issues of that latter (e.g., unknown IATA codes of
+        serving POR) are detected and reported once, at that stage.
+      """
+      self.serving_por_graph = ServingPORGraph (self.iata_por_dict,
+                                                self.isTransportRelated)
 
+      issue_list = self.serving_por_graph.issues()
+      if self.verbose:
+         print ("[OpenTravelData::buildServingPORGraph] Serving POR graph " \
+                f"built for {len (self.serving_por_graph.codes)} IATA " \
+                f"codes, with {len (issue_list)} integrity issue(s)")
+         for issue in issue_list:
+            print (f"[OpenTravelData::buildServingPORGraph] {issue}")
+      return
+
+   def servingPORGraphIssues (self):
+      """
+        Return the integrity issues detected when building the graph
+        of the serving POR
+      """
+      return self.servingPORGraph().issues()
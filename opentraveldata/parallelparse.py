@@ -0,0 +1,152 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import io
+import os
+import csv
+import operator
+import concurrent.futures
+from .porstore import PORStore, por_fields, por_pooled_fields, \
+   por_unlc_list_idx, indexPORRecord
+
+# Parallel parsing of the main (IATA/ICAO) POR file. The file is split into
+# byte ranges, aligned on the beginning of lines, which are parsed
+# by a pool of processes. Each process returns the columns of the POR
+# records of its range, along with the indexes of those records (with
+# row IDs relative to the range). The partial results are then merged,
+# in the order of the ranges, so that the row IDs and the indexes are
+# exactly the same as when the file is parsed by a single process.
+#
+# The OPTD POR files have one record per line (no quoted field spans
+# several lines), which is what allows to split them on line boundaries.
+parse_min_range_size = 1 << 20
+
+
+def splitFileRanges (filepath, n_ranges):
+   """
+     Split a file, but its header line, into (at most) n_ranges byte ranges,
+     each starting at the beginning of a line and ending at the beginning
+     of the next range. Return the header line (as a string) and the list
+     of (start, end) offsets.
+   """
+   file_size = os.path.getsize (filepath)
+   with open (filepath, 'rb') as por_file:
+      header_line = por_file.readline()
+      data_start = por_file.tell()
+
+      range_size = max (parse_min_range_size,
+                        (file_size - data_start) // max (1, n_ranges) + 1)
+      offset_list = [data_start]
+      while offset_list[-1] + range_size < file_size:
+         # Move to the beginning of the line following the target offset
+         por_file.seek (offset_list[-1] + range_size)
+         por_file.readline()
+         next_offset = por_file.tell()
+         if next_offset >= file_size:
+            break
+         offset_list.append (next_offset)
+      offset_list.append (file_size)
+
+   range_list = list (zip (offset_list[:-1], offset_list[1:]))
+   return (header_line.decode ('utf8').rstrip ('\r\n'), range_list)
+
+
+def parsePORFileRange (filepath, start, end, column_idx_list, index_names):
+   """
+     Parse a byte range of the main POR file. Return the columns of the
+     POR records (a list of values by field, in the order of the por_fields
+     tuple) and the requested indexes, with row IDs relative to the range.
+   """
+   # The lines are split the same way as when the file is read
+   # sequentially (newline=''), i.e., not on the other line boundaries
+   # of str.splitlines() (e.g., U+2028), which may appear within fields
+   with open (filepath, 'rb') as por_file:
+      por_file.seek (start)
+      range_file = io.StringIO (por_file.read (end - start).decode ('utf8'),
+                                newline = '')
+
+   # Pooling the values within the range makes the results smaller
+   # to transfer back, as each distinct object is pickled only once
+   string_pool = dict()
+   pooled_field_idx_list = [field_idx
+                            for field_idx, field in enumerate (por_fields)
+                            if field in por_pooled_fields]
+   columns = [[] for _ in por_fields]
+   index_dict = {index_name: dict() for index_name in index_names}
+   get_por_values = operator.itemgetter (*column_idx_list)
+   row_id = 0
+   for row in csv.reader (range_file, delimiter='^'):
+      # Skip empty lines
+      if not row:
+         continue
+
+      por_values = get_por_values (row)
+      for field_idx, value in enumerate (por_values):
+         columns[field_idx].append (value)
+      indexPORRecord (index_dict, row_id, *por_values[:4],
+                      por_values[por_unlc_list_idx])
+      row_id += 1
+
+   for field_idx in pooled_field_idx_list:
+      columns[field_idx] = [string_pool.setdefault (value, value)
+                            for value in columns[field_idx]]
+
+   return (columns, index_dict)
+
+
+def mergePORIndexes (index_dict, range_index_dict, row_id_offset):
+   """
+     Merge the indexes of a byte range into the indexes of the preceding
+     ranges, with the same semantics as a single pass over the file:
+     - by Geonames ID, the first POR record wins
+     - by IATA code and location type, the last POR record wins
+     - by UN/LOCODE code and Geonames ID, the last POR record wins
+   """
+   geo_index = index_dict.get ('geo')
+   if geo_index is not None:
+      for geo_id, row_id in range_index_dict['geo'].items():
+         if not geo_id in geo_index:
+            geo_index[geo_id] = row_id + row_id_offset
+
+   for index_name in ('iata', 'unlc'):
+      por_index = index_dict.get (index_name)
+      if por_index is None:
+         continue
+      for key, range_row_ids in range_index_dict[index_name].items():
+         row_ids = por_index.get (key)
+         if row_ids is None:
+            row_ids = dict()
+            por_index[key] = row_ids
+         for sub_key, row_id in range_row_ids.items():
+            row_ids[sub_key] = row_id + row_id_offset
+
+   #
+   return
+
+
+def parsePORFileParallel (filepath, index_names, n_workers):
+   """
+     Parse the main (IATA/ICAO) POR file with a pool of n_workers processes,
+     into a POR store and the requested (in-memory) indexes. Return the same
+     POR store and dictionary of indexes as a single-process parsing.
+   """
+   (header_line, range_list) = splitFileRanges (filepath, n_workers)
+   header = next (csv.reader ([header_line], delimiter='^'))
+   column_idx_list = [header.index (field) for field in por_fields]
+
+   por_store = PORStore()
+   index_dict = {index_name: dict() for index_name in index_names}
+   with concurrent.futures.ProcessPoolExecutor (max_workers = n_workers) \
+        as executor:
+      future_list = [executor.submit (parsePORFileRange, filepath, start, end,
+                                      column_idx_list, index_names)
+                     for (start, end) in range_list]
+
+      # The partial results are merged in the order of the ranges
+      for future in future_list:
+         (columns, range_index_dict) = future.result()
+         mergePORIndexes (index_dict, range_index_dict, len (por_store))
+         por_store.extend (columns)
+
+   return (por_store, index_dict)
@@ -0,0 +1,340 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import sys
+import collections.abc
+
+# Fields of the POR (points of reference) records kept from the main
+# (IATA/ICAO) OPTD POR file
+por_fields = ('iata_code', 'location_type', 'geoname_id', 'envelope_id',
+              'latitude', 'longitude', 'name', 'page_rank',
+              'country_code', 'country_name', 'adm1_code', 'adm1_name_utf',
+              'city_code_list', 'tvl_por_list', 'unlc_list',
+              'asciiname', 'alt_name_section')
+
+# Positions, in the values of a POR record (i.e., in the order of the
+# por_fields tuple), of the fields used as keys by the indexes
+por_unlc_list_idx = por_fields.index ('unlc_list')
+
+# Fields having few distinct values. A single string object is then kept
+# for all the occurrences of a given value
+por_pooled_fields = frozenset (('iata_code', 'location_type', 'envelope_id',
+                                'page_rank', 'country_code', 'country_name',
+                                'adm1_code', 'adm1_name_utf',
+                                'city_code_list', 'tvl_por_list'))
+
+# Fields holding lists. They are stored as the raw strings of the OPTD file,
+# and split only when accessed
+por_list_fields = {'city_code_list': ',', 'tvl_por_list': ',',
+                   'unlc_list': '|'}
+
+
+# Indexes on the POR records, by index name: by IATA code (and then by
+# location type), by UN/LOCODE code (and then by Geonames ID) and
+# by Geonames ID
+por_index_names = ('iata', 'unlc', 'geo')
+
+
+def splitPORListField (field, value_str):
+   """
+     Split the raw string of a list field, the same way as the OPTD POR file
+     is parsed. The UN/LOCODE list comes with a trailing separator
+     (e.g., 'UAIEV|'), which does not yield any code.
+   """
+   value_list = value_str.split (por_list_fields[field])
+   if field == 'unlc_list':
+      value_list = value_list[:-1]
+   return value_list
+
+
+class PORRecord (collections.abc.Mapping):
+   """
+   Lightweight, read-only view on a POR record of a POR store.
+   It behaves like the dictionary it replaces, with the same field names
+   (those of the store).
+   """
+   __slots__ = ('_store', '_row_id')
+
+   def __init__ (self, store, row_id):
+      self._store = store
+      self._row_id = row_id
+
+   def __getitem__ (self, field):
+      return self._store.value (self._row_id, field)
+
+   def __iter__ (self):
+      return iter (self._store.fields)
+
+   def __len__ (self):
+      return len (self._store.fields)
+
+   def __repr__ (self):
+      return repr (dict (self))
+
+   def rowID (self):
+      return self._row_id
+
+
+class PORStore():
+   """
+   Compact, column-oriented store of the POR (points of reference) records.
+   Each record is identified by its (integer) row ID, i.e., its position
+   in the columns.
+   """
+   # Fields of the records, those having few distinct values, and those
+   # holding lists
+   fields = por_fields
+   pooled_fields = por_pooled_fields
+   list_fields = por_list_fields
+
+   columns = None
+   string_pool = None
+   removed_row_ids = None
+
+   def __init__ (self, columns = None, is_pooled = False):
+      self.columns = {field: [] for field in self.fields}
+      self.string_pool = dict()
+      self.removed_row_ids = set()
+
+      # Re-build the store from existing columns (e.g., from a snapshot),
+      # the values being pooled again, unless they already are (i.e., each
+      # distinct value of the pooled fields is a single string object),
+      # in which case the columns are adopted as they are
+      if columns is not None:
+         n_rows = len (columns[self.fields[0]])
+         for field in self.fields:
+            column = columns[field]
+            if len (column) != n_rows:
+               raise ValueError (f"Inconsistent length for the {field} column")
+            if field in self.pooled_fields:
+               if is_pooled:
+                  self.string_pool.update ((value, value)
+                                           for value in set (column))
+               else:
+                  column = [self.string_pool.setdefault (value, value)
+                            for value in column]
+            self.columns[field] = column if is_pooled else list (column)
+
+   def __len__ (self):
+      return len (self.columns[self.fields[0]])
+
+   def append (self, values):
+      """
+        Append a POR record, given as a sequence of values in the order
+        of the fields tuple. Return the row ID of that record.
+      """
+      row_id = len (self)
+      string_pool = self.string_pool
+      pooled_fields = self.pooled_fields
+      for field, value in zip (self.fields, values):
+         if field in pooled_fields:
+            value = string_pool.setdefault (value, value)
+         self.columns[field].append (value)
+
+      return row_id
+
+   def extend (self, columns):
+      """
+        Append POR records, given as columns, i.e., as a sequence of lists
+        of values, in the order of the fields tuple
+      """
+      string_pool = self.string_pool
+      for field, column in zip (self.fields, columns):
+         if field in self.pooled_fields:
+            column = [string_pool.setdefault (value, value)
+                      for value in column]
+         self.columns[field].extend (column)
+      return
+
+   def update (self, row_id, values):
+      """
+        Replace the values of a POR record, given as a sequence of values
+        in the order of the fields tuple
+      """
+      string_pool = self.string_pool
+      pooled_fields = self.pooled_fields
+      for field, value in zip (self.fields, values):
+         if field in pooled_fields:
+            value = string_pool.setdefault (value, value)
+         self.columns[field][row_id] = value
+      return
+
+   def remove (self, row_id):
+      """
+        Remove a POR record. Its row is kept (so that the row IDs of the
+        other records do not change), but is no longer part of the store
+        (see rowIDs())
+      """
+      self.removed_row_ids.add (row_id)
+      return
+
+   def rowIDs (self):
+      """
+        Iterate over the row IDs of the (not removed) POR records
+      """
+      removed_row_ids = self.removed_row_ids
+      return (row_id for row_id in range (len (self))
+              if not row_id in removed_row_ids)
+
+   def rowValues (self, row_id):
+      """
+        Retrieve the (raw) values of a POR record, in the order
+        of the fields tuple
+      """
+      return tuple (self.columns[field][row_id] for field in self.fields)
+
+   def value (self, row_id, field):
+      """
+        Retrieve the value of a field for a given POR record
+      """
+      value = self.columns[field][row_id]
+      if field in self.list_fields:
+         value = splitPORListField (field, value)
+      return value
+
+   def record (self, row_id):
+      """
+        Retrieve a (lightweight) view on a given POR record
+      """
+      return PORRecord (self, row_id)
+
+   def memoryFootprint (self):
+      """
+        Estimate the memory used by the store, in Bytes. Each string object
+        is counted once, even when it is referenced several times.
+      """
+      footprint = sys.getsizeof (self.columns) \
+         + sys.getsizeof (self.string_pool)
+      seen_ids = set()
+      for column in self.columns.values():
+         footprint += sys.getsizeof (column)
+         for value in column:
+            if id (value) in seen_ids:
+               continue
+            seen_ids.add (id (value))
+            footprint += sys.getsizeof (value)
+
+      return footprint
+
+
+class PORIndex (collections.abc.Mapping):
+   """
+   Read-only dictionary-like index on the POR records of a POR store.
+   The underlying index maps keys either to row IDs, or to dictionaries
+   of row IDs (e.g., by location type). The values are returned
+   as POR record views, so that the index may be used the same way as
+   the dictionaries of dictionaries it replaces.
+   """
+   store = None
+   index = None
+
+   def __init__ (self, store, index):
+      self.store = store
+      self.index = index
+
+   def __getitem__ (self, key):
+      row_ids = self.index[key]
+      if isinstance (row_ids, int):
+         return self.store.record (row_ids)
+      return {sub_key: self.store.record (row_id)
+              for sub_key, row_id in row_ids.items()}
+
+   def __contains__ (self, key):
+      return key in self.index
+
+   def __iter__ (self):
+      return iter (self.index)
+
+   def rowIDs (self, key):
+      """
+        Retrieve the row IDs of the POR records indexed by a given key,
+        in the insertion order of the index (empty when the key is not
+        known)
+      """
+      row_ids = self.index.get (key)
+      if row_ids is None:
+         return []
+      if isinstance (row_ids, int):
+         return [row_ids]
+      return list (row_ids.values())
+
+   def __len__ (self):
+      return len (self.index)
+
+   def memoryFootprint (self):
+      """
+        Estimate the memory used by the index (the POR records themselves
+        being accounted for by the store), in Bytes.
+      """
+      footprint = sys.getsizeof (self.index)
+      for row_ids in self.index.values():
+         if not isinstance (row_ids, int):
+            footprint += sys.getsizeof (row_ids)
+
+      return footprint
+
+
+def indexPORRecord (index_dict, row_id, optd_por_code, optd_loc_type,
+                    optd_geo_id, optd_env_id, unlc_list_str):
+   """
+     Add a POR record to the (in-memory) indexes of the given dictionary
+     (by index name). Only the indexes present in that dictionary are fed,
+     so that a single pass over the POR records may build any subset
+     of the indexes.
+   """
+   # UN/LOCODE POR dictionary
+   # There may be several POR (points of reference)
+   # with the same UN/LOCODE code. The Geonames ID
+   # then allows to differentiate them
+   unlc_por_index = index_dict.get ('unlc')
+   if unlc_por_index is not None:
+      for unlc in splitPORListField ('unlc_list', unlc_list_str):
+         if not unlc in unlc_por_index:
+            unlc_por_index[unlc] = dict()
+
+         unlc_por_index[unlc][optd_geo_id] = row_id
+
+   # Geonames POR dictionary
+   # There is a single POR (point of reference)
+   # for a specific Geonames ID.
+   geo_por_index = index_dict.get ('geo')
+   if geo_por_index is not None and not optd_geo_id in geo_por_index:
+      geo_por_index[optd_geo_id] = row_id
+
+   # IATA POR dictionary
+   # Only the POR with a currently valid IATA code are
+   # interesting from this stage onwards
+   iata_por_index = index_dict.get ('iata')
+   if iata_por_index is None or optd_por_code == '' or optd_env_id != '':
+      return
+
+   # There may be several POR (points of reference)
+   # with the same IATA code. The location type (e.g.,
+   # 'C' for city, 'A' for airrport) then allows
+   # to differentiate them
+   if not optd_por_code in iata_por_index:
+      iata_por_index[optd_por_code] = dict()
+
+   iata_por_index[optd_por_code][optd_loc_type] = row_id
+
+
+def buildPORIndexes (store, index_names):
+   """
+     Build the given (in-memory) indexes from the records of a POR store,
+     without having to parse the POR file again. Return a dictionary
+     of those indexes, by index name.
+   """
+   index_dict = {index_name: dict() for index_name in index_names}
+   columns = store.columns
+   removed_row_ids = store.removed_row_ids
+   for row_id, por_values in enumerate (zip (columns['iata_code'],
+                                             columns['location_type'],
+                                             columns['geoname_id'],
+                                             columns['envelope_id'],
+                                             columns['unlc_list'])):
+      if row_id in removed_row_ids:
+         continue
+      indexPORRecord (index_dict, row_id, *por_values)
+
+   return index_dict
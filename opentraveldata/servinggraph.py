@@ -0,0 +1,183 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+
+# Fields of the short POR records, as returned by getServingPORList()
+sht_rec_fields = ('iata_code', 'location_type', 'geoname_id', 'envelope_id',
+                  'name', 'country_code', 'country_name',
+                  'adm1_code', 'adm1_name_utf')
+
+
+class ServingPORGraph():
+   """
+   Graph of the travel-/transport-related POR (points of reference)
+   serving each IATA code, and its reverse (the IATA codes served by
+   each travel-/transport-related POR), precomputed once from the IATA
+   POR dictionary.
+
+   Each distinct short POR record is stored once, as a tuple of values
+   (in the order of the sht_rec_fields tuple). Both graphs are stored
+   as adjacency arrays: for the i-th IATA code, the neighbours are
+   the elements of the targets array between offsets[i] and offsets[i+1].
+
+   The integrity issues (e.g., serving POR whose IATA code is not known)
+   are detected when the graph is built, and recorded in the issue list.
+   """
+   codes = None
+   code_idx = None
+   sht_recs = None
+   original_rec_ids = None
+   tvl_offsets = None
+   tvl_targets = None
+   served_offsets = None
+   served_targets = None
+   issue_list = None
+
+   def __init__ (self, iata_por_dict, is_tvl_loc_type):
+      """
+        iata_por_dict: the IATA POR dictionary, i.e., the POR records by
+        IATA code and location type.
+        is_tvl_loc_type: callable stating whether a location type
+        corresponds to a travel-/transport-related POR
+      """
+      self.codes = sorted (iata_por_dict)
+      self.code_idx = {code: idx for idx, code in enumerate (self.codes)}
+      self.sht_recs = []
+      self.original_rec_ids = array.array ('i')
+      self.tvl_offsets = array.array ('I', [0])
+      self.tvl_targets = array.array ('I')
+      self.issue_list = []
+
+      sht_rec_ids = dict()
+      tvl_loc_type_cache = dict()
+
+      def isTvlLocType (loc_type):
+         is_tvl = tvl_loc_type_cache.get (loc_type)
+         if is_tvl is None:
+            is_tvl = bool (is_tvl_loc_type (loc_type))
+            tvl_loc_type_cache[loc_type] = is_tvl
+         return is_tvl
+
+      def getShtRecID (iata_code, loc_type, optd_por_rec):
+         sht_rec_key = (iata_code, loc_type)
+         sht_rec_id = sht_rec_ids.get (sht_rec_key)
+         if sht_rec_id is None:
+            sht_rec = (iata_code, loc_type, int (optd_por_rec['geoname_id']),
+                       optd_por_rec['envelope_id'], optd_por_rec['name'],
+                       optd_por_rec['country_code'],
+                       optd_por_rec['country_name'],
+                       optd_por_rec['adm1_code'],
+                       optd_por_rec['adm1_name_utf'])
+            sht_rec_id = len (self.sht_recs)
+            self.sht_recs.append (sht_rec)
+            sht_rec_ids[sht_rec_key] = sht_rec_id
+         return sht_rec_id
+
+      # Forward graph (IATA code -> serving POR), derived the same way
+      # as getServingPORList() used to do at query time
+      for por_code in self.codes:
+         optd_por_rec_dict = iata_por_dict[por_code]
+         original_rec_id = -1
+         tvl_rec_id_list = []
+         have_city_details_been_set = False
+         for optd_loc_type, optd_por_rec in optd_por_rec_dict.items():
+            sht_rec_id = getShtRecID (por_code, optd_loc_type, optd_por_rec)
+
+            # A transport-related POR serves itself. Unless a city has
+            # already been found, it is the original POR
+            if isTvlLocType (optd_loc_type):
+               if sht_rec_id not in tvl_rec_id_list:
+                  tvl_rec_id_list.append (sht_rec_id)
+               if not have_city_details_been_set:
+                  original_rec_id = sht_rec_id
+
+            # The (first) city becomes the original POR, and brings
+            # its serving travel-/transport-related POR
+            if not 'C' in optd_loc_type or have_city_details_been_set:
+               continue
+            have_city_details_been_set = True
+            original_rec_id = sht_rec_id
+
+            for tvl_por_code in optd_por_rec['tvl_por_list']:
+               # Cities without serving POR come with an empty list
+               if tvl_por_code == '':
+                  continue
+
+               if not tvl_por_code in iata_por_dict:
+                  self.issue_list.append (
+                     f"The {tvl_por_code} IATA code (transport-related), "
+                     f"serving {por_code} (city), does not seem "
+                     "to be valid in OPTD")
+                  continue
+
+               tvl_por_rec_dict = iata_por_dict[tvl_por_code]
+               for tvl_loc_type, tvl_por_rec in tvl_por_rec_dict.items():
+                  if not isTvlLocType (tvl_loc_type):
+                     continue
+                  tvl_rec_id = getShtRecID (tvl_por_code, tvl_loc_type,
+                                            tvl_por_rec)
+                  if tvl_rec_id not in tvl_rec_id_list:
+                     tvl_rec_id_list.append (tvl_rec_id)
+
+         self.original_rec_ids.append (original_rec_id)
+         self.tvl_targets.extend (tvl_rec_id_list)
+         self.tvl_offsets.append (len (self.tvl_targets))
+
+      # Reverse graph (serving POR IATA code -> served IATA codes)
+      served_code_lists = [[] for _ in self.codes]
+      for code_id in range (len (self.codes)):
+         for sht_rec_id in self.tvl_targets[self.tvl_offsets[code_id]:
+                                            self.tvl_offsets[code_id + 1]]:
+            tvl_code_id = self.code_idx[self.sht_recs[sht_rec_id][0]]
+            if tvl_code_id != code_id \
+               and code_id not in served_code_lists[tvl_code_id]:
+               served_code_lists[tvl_code_id].append (code_id)
+      self.served_offsets = array.array ('I', [0])
+      self.served_targets = array.array ('I')
+      for served_code_list in served_code_lists:
+         self.served_targets.extend (served_code_list)
+         self.served_offsets.append (len (self.served_targets))
+
+   def __contains__ (self, por_code):
+      return por_code in self.code_idx
+
+   def servingPORStruct (self, por_code):
+      """
+        Return the structure of getServingPORList() for a given IATA code,
+        i.e., a dictionary with the original POR and the list of serving
+        travel-/transport-related POR. A KeyError is raised when the IATA
+        code is not known.
+      """
+      code_id = self.code_idx[por_code]
+      original_rec_id = self.original_rec_ids[code_id]
+      if original_rec_id >= 0:
+         original_por_rec = dict (zip (sht_rec_fields,
+                                       self.sht_recs[original_rec_id]))
+      else:
+         original_por_rec = dict.fromkeys (sht_rec_fields)
+         original_por_rec['iata_code'] = por_code
+
+      tvl_list = [dict (zip (sht_rec_fields, self.sht_recs[sht_rec_id]))
+                  for sht_rec_id in
+                  self.tvl_targets[self.tvl_offsets[code_id]:
+                                   self.tvl_offsets[code_id + 1]]]
+      return {'original': original_por_rec, 'tvl_list': tvl_list}
+
+   def servedCodeList (self, tvl_por_code):
+      """
+        Return the list of the IATA codes (e.g., cities) served by a given
+        travel-/transport-related POR IATA code. A KeyError is raised
+        when the IATA code is not known.
+      """
+      code_id = self.code_idx[tvl_por_code]
+      return [self.codes[served_code_id] for served_code_id in
+              self.served_targets[self.served_offsets[code_id]:
+                                  self.served_offsets[code_id + 1]]]
+
+   def issues (self):
+      """
+        Return the integrity issues detected when the graph was built
+      """
+      return list (self.issue_list)
@@ -0,0 +1,139 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import stat
+import struct
+import gc
+import json
+import marshal
+import hashlib
+
+# Binary snapshots of the parsed POR (points of reference) indexes.
+# A snapshot file is made of:
+# - a fixed-size header: magic string and format version
+# - the key of the source (CSV) file the snapshot has been built from,
+#   length-prefixed and JSON-encoded
+# - the marshal-encoded payload (the POR store columns and indexes)
+# The key is checked before the payload is decoded, so that a stale
+# snapshot costs only a few bytes of I/O.
+#
+# The payload is restricted to plain data (lists, dictionaries, strings
+# and numbers), so that decoding a snapshot never executes code. It is
+# encoded with marshal rather than JSON, as marshal decodes about twice
+# as fast, and keeps the strings referenced several times (e.g., the pooled
+# values of the POR store) as single objects, so that they do not have to
+# be pooled again once loaded.
+# Snapshots are stored in the local directory, which may be shared
+# (e.g., /tmp/opentraveldata). A snapshot is therefore only loaded when
+# it is owned by the current user and cannot be written by other users;
+# otherwise, the POR file is parsed again.
+#
+# The format version has to be increased whenever the structure of the
+# payload changes, so that older snapshots get automatically rebuilt.
+snapshot_magic = b'OPTDSNAP'
+snapshot_version = 5
+snapshot_header_fmt = '>8sHI'
+snapshot_hash_chunk_size = 1 << 20
+
+
+def sourceFileKey (filepath):
+   """
+     Derive the key identifying the content of a source file, namely
+     the tuple made of its size, its modification time (in nanoseconds)
+     and the SHA-256 hash of its content.
+   """
+   file_stat = os.stat (filepath)
+   content_hash = hashlib.sha256()
+   with open (filepath, 'rb') as source_file:
+      for chunk in iter (lambda: source_file.read (snapshot_hash_chunk_size),
+                         b''):
+         content_hash.update (chunk)
+
+   return (file_stat.st_size, file_stat.st_mtime_ns, content_hash.hexdigest())
+
+
+def isSnapshotTrusted (snapshot_filepath):
+   """
+     State whether a snapshot file may be loaded, i.e., whether it is
+     owned by the current user and is not writable by the group or by
+     other users.
+   """
+   snapshot_stat = os.stat (snapshot_filepath)
+   if hasattr (os, 'getuid') and snapshot_stat.st_uid != os.getuid():
+      return False
+   if snapshot_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+      return False
+   return True
+
+
+def saveSnapshot (snapshot_filepath, source_key, payload):
+   """
+     Save the payload into a snapshot file, along with the key of the
+     source file. The snapshot is first written into a temporary file,
+     which is then atomically renamed, so that concurrent readers never
+     see a partially written snapshot.
+   """
+   encoded_key = json.dumps (list (source_key)).encode ('utf8')
+   tmp_filepath = f"{snapshot_filepath}.{os.getpid()}.tmp"
+   try:
+      with open (tmp_filepath, 'wb') as snapshot_file:
+         os.chmod (tmp_filepath, 0o644)
+         snapshot_file.write (struct.pack (snapshot_header_fmt, snapshot_magic,
+                                           snapshot_version, len (encoded_key)))
+         snapshot_file.write (encoded_key)
+         marshal.dump (payload, snapshot_file)
+      os.replace (tmp_filepath, snapshot_filepath)
+   finally:
+      if os.path.exists (tmp_filepath):
+         os.remove (tmp_filepath)
+
+   #
+   return
+
+
+def loadSnapshot (snapshot_filepath, source_key):
+   """
+     Load the payload from a snapshot file. None is returned when the
+     snapshot does not exist, cannot be trusted (see isSnapshotTrusted()),
+     has been written with another format version, has been built from
+     another version of the source file or cannot be decoded.
+   """
+   if not os.path.isfile (snapshot_filepath):
+      return None
+
+   header_size = struct.calcsize (snapshot_header_fmt)
+   try:
+      if not isSnapshotTrusted (snapshot_filepath):
+         return None
+
+      with open (snapshot_filepath, 'rb') as snapshot_file:
+         header = snapshot_file.read (header_size)
+         if len (header) != header_size:
+            return None
+
+         magic, version, key_size = struct.unpack (snapshot_header_fmt, header)
+         if magic != snapshot_magic or version != snapshot_version:
+            return None
+
+         snapshot_key = json.loads (snapshot_file.read (key_size))
+         if snapshot_key != list (source_key):
+            return None
+
+         # The payload is made of many small containers, which would
+         # otherwise trigger several (useless) garbage collections
+         is_gc_enabled = gc.isenabled()
+         gc.disable()
+         try:
+            payload = marshal.loads (snapshot_file.read())
+         finally:
+            if is_gc_enabled:
+               gc.enable()
+   except Exception:
+      # Whatever the reason (truncated, corrupted or foreign file),
+      # the snapshot is just not used, and gets rebuilt
+      return None
+
+   #
+   return payload
@@ -0,0 +1,205 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import array
+import math
+from .loctype import parseLocationType
+
+# Mean radius of the Earth, in kilometers
+earth_radius_km = 6371.0088
+
+
+def haversineDistance (lat1, lon1, lat2, lon2):
+   """
+     Great-circle distance, in kilometers, between two points given
+     by their latitudes and longitudes (in degrees)
+   """
+   phi1 = math.radians (lat1)
+   phi2 = math.radians (lat2)
+   sin_dphi = math.sin ((phi2 - phi1) / 2)
+   sin_dlambda = math.sin (math.radians (lon2 - lon1) / 2)
+   a = sin_dphi * sin_dphi \
+      + math.cos (phi1) * math.cos (phi2) * sin_dlambda * sin_dlambda
+   return 2 * earth_radius_km * math.asin (min (1.0, math.sqrt (a)))
+
+
+class PORSpatialIndex():
+   """
+   Spatial index of the (current) POR records of a POR store, on their
+   latitudes and longitudes. The POR are bucketed into a grid of cells
+   of a few degrees, so that a query only computes the distances to the
+   POR of the cells overlapping the queried area. The POR records
+   without valid coordinates are not indexed.
+   """
+   cell_size = None
+   n_lat_cells = 0
+   n_lon_cells = 0
+   row_ids = None
+   lats = None
+   lons = None
+   cos_lats = None
+   flags = None
+   cells = None
+
+   def __init__ (self, store, cell_size = 1.0):
+      """
+        store: a POR store (in-memory or memory-mapped)
+        cell_size: size of the grid cells, in degrees
+      """
+      self.cell_size = cell_size
+      self.n_lat_cells = math.ceil (180 / cell_size)
+      self.n_lon_cells = math.ceil (360 / cell_size)
+      self.row_ids = array.array ('I')
+      self.lats = array.array ('d')
+      self.lons = array.array ('d')
+      self.cos_lats = array.array ('d')
+      self.flags = array.array ('H')
+      self.cells = dict()
+
+      for row_id in store.rowIDs():
+         # Historical POR (with an envelope ID) are not indexed
+         if store.value (row_id, 'envelope_id') != '':
+            continue
+         try:
+            lat = float (store.value (row_id, 'latitude'))
+            lon = float (store.value (row_id, 'longitude'))
+         except ValueError:
+            continue
+         if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            continue
+
+         entry_id = len (self.row_ids)
+         self.row_ids.append (row_id)
+         self.lats.append (math.radians (lat))
+         self.lons.append (math.radians (lon))
+         self.cos_lats.append (math.cos (math.radians (lat)))
+         self.flags.append (parseLocationType (store.value (row_id,
+                                                            'location_type')))
+         cell = self.cellOf (lat, lon)
+         if not cell in self.cells:
+            self.cells[cell] = array.array ('I')
+         self.cells[cell].append (entry_id)
+
+   def __len__ (self):
+      return len (self.row_ids)
+
+   def cellOf (self, lat, lon):
+      """
+        Grid cell, as a (latitude index, longitude index) tuple, of a point
+      """
+      lat_idx = min (int ((lat + 90) // self.cell_size), self.n_lat_cells - 1)
+      lon_idx = int ((lon + 180) // self.cell_size) % self.n_lon_cells
+      return (lat_idx, lon_idx)
+
+   def candidateCells (self, lat, lon, radius_km):
+      """
+        Grid cells (having POR) overlapping the bounding box of the circle
+        of the given radius around the given point
+      """
+      angular_radius = radius_km / earth_radius_km
+      phi = math.radians (lat)
+      lat_min = math.degrees (phi - angular_radius)
+      lat_max = math.degrees (phi + angular_radius)
+      lat_range = range (max (0, int ((lat_min + 90) // self.cell_size)),
+                         min (self.n_lat_cells - 1,
+                              int ((lat_max + 90) // self.cell_size)) + 1)
+
+      # Longitude extent of the circle. When the circle includes a pole,
+      # it spans all the longitudes
+      all_lons = lat_min <= -90 or lat_max >= 90
+      if not all_lons:
+         sin_dlambda = math.sin (angular_radius) / math.cos (phi)
+         all_lons = sin_dlambda >= 1
+      if all_lons:
+         lon_idx_range = range (self.n_lon_cells)
+      else:
+         dlon = math.degrees (math.asin (sin_dlambda))
+         lon_idx_min = int ((lon - dlon + 180) // self.cell_size)
+         lon_idx_max = int ((lon + dlon + 180) // self.cell_size)
+         if lon_idx_max - lon_idx_min + 1 >= self.n_lon_cells:
+            lon_idx_range = range (self.n_lon_cells)
+         else:
+            lon_idx_range = [lon_idx % self.n_lon_cells for lon_idx
+                             in range (lon_idx_min, lon_idx_max + 1)]
+
+      # For large areas, it is cheaper to go through the non-empty cells
+      if len (lat_range) * len (lon_idx_range) > len (self.cells):
+         lon_idx_set = set (lon_idx_range)
+         return [entry_ids for (lat_idx, lon_idx), entry_ids
+                 in self.cells.items()
+                 if lat_idx in lat_range and lon_idx in lon_idx_set]
+
+      cells = self.cells
+      return [cells[(lat_idx, lon_idx)] for lat_idx in lat_range
+              for lon_idx in lon_idx_range if (lat_idx, lon_idx) in cells]
+
+   def withinRadius (self, lat, lon, radius_km, loc_type_flags = None):
+      """
+        Return the POR within the given radius (in kilometers) of the given
+        point, as a list of (distance in kilometers, row ID) tuples, sorted
+        by distance. When given, loc_type_flags (LocationType bit flags or
+        OPTD location type string) restricts the POR to those having any
+        of those location types.
+      """
+      if isinstance (loc_type_flags, str):
+         loc_type_flags = parseLocationType (loc_type_flags)
+
+      phi = math.radians (lat)
+      lam = math.radians (lon)
+      cos_phi = math.cos (phi)
+      # Haversine of the angular radius, to which the haversine of the
+      # angular distances are compared, so as to avoid computing
+      # the inverse sine for the POR outside the circle
+      max_hav = math.sin (min (math.pi, radius_km / earth_radius_km) / 2) ** 2
+      lats, lons, cos_lats, flags = self.lats, self.lons, self.cos_lats, \
+         self.flags
+      sin, asin, sqrt = math.sin, math.asin, math.sqrt
+      dist_list = []
+      for entry_ids in self.candidateCells (lat, lon, radius_km):
+         for entry_id in entry_ids:
+            if loc_type_flags is not None \
+               and not flags[entry_id] & loc_type_flags:
+               continue
+            sin_dphi = sin ((lats[entry_id] - phi) / 2)
+            sin_dlambda = sin ((lons[entry_id] - lam) / 2)
+            hav = sin_dphi * sin_dphi \
+               + cos_phi * cos_lats[entry_id] * sin_dlambda * sin_dlambda
+            if hav <= max_hav:
+               dist_list.append ((2 * earth_radius_km
+                                  * asin (min (1.0, sqrt (hav))),
+                                  self.row_ids[entry_id]))
+
+      dist_list.sort()
+      return dist_list
+
+   def nearest (self, lat, lon, k = 1, loc_type_flags = None):
+      """
+        Return the k POR nearest to the given point, as a list
+        of (distance in kilometers, row ID) tuples, sorted by distance.
+        See withinRadius() for loc_type_flags.
+      """
+      # The search radius is doubled until at least k POR are found
+      # within it. Any other POR being farther than that radius,
+      # the k first ones are then the nearest ones
+      half_circumference_km = math.pi * earth_radius_km
+      radius_km = self.cell_size * math.pi / 180 * earth_radius_km
+      while True:
+         dist_list = self.withinRadius (lat, lon, radius_km, loc_type_flags)
+         if len (dist_list) >= k or radius_km >= half_circumference_km:
+            return dist_list[:k]
+         radius_km *= 2
+
+   def withinRadiusBatch (self, points, radius_km, loc_type_flags = None):
+      """
+        Batch version of withinRadius(), for (latitude, longitude) points
+      """
+      return [self.withinRadius (lat, lon, radius_km, loc_type_flags)
+              for (lat, lon) in points]
+
+   def nearestBatch (self, points, k = 1, loc_type_flags = None):
+      """
+        Batch version of nearest(), for (latitude, longitude) points
+      """
+      return [self.nearest (lat, lon, k, loc_type_flags)
+              for (lat, lon) in points]
@@ -0,0 +1,443 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import os
+import sys
+import random
+import argparse
+from .csvwriter import CSVWriter
+from .compression import checkCompression, compression_extensions
+from .opentraveldata import optd_por_all_rel_path, optd_por_unlc_rel_path
+
+# Generator of synthetic OPTD data files (main POR file and UN/LOCODE POR
+# file), with the same formats as the real ones, at a configurable scale,
+# so that OpenTravelData may be tested, and benchmarked on growing data,
+# without downloading anything.
+#
+# The POR are generated by clusters, each one around a city: a city having
+# an IATA code is served by travel-related POR (airports, railway and bus
+# stations, heliports, ports), which reference that city (city_code_list,
+# city_detail_list) and are referenced by it (tvl_por_list). Most of the
+# clusters are, as in the real file, cities and ports without IATA code,
+# having only a UN/LOCODE code. A few POR have historical records (with
+# an envelope ID). The UN/LOCODE POR file holds a record for each UN/LOCODE
+# code of the main POR file, joined on the Geonames ID, and a few records
+# of POR not in the main POR file.
+#
+# The IATA codes (three letters) and the UN/LOCODE codes (country code
+# and three characters) are drawn from their whole (finite) code spaces:
+# once a code space is exhausted, which happens beyond the 1x scale for
+# the IATA codes, and beyond a few times that scale for the UN/LOCODE
+# codes, the subsequent POR have no such code, like most of the real POR.
+
+# Number of records of the real main POR file (1x scale)
+optd_por_row_count = 123000
+
+por_file_header = (
+   'iata_code', 'icao_code', 'faa_code', 'is_geonames', 'geoname_id',
+   'envelope_id', 'name', 'asciiname', 'latitude', 'longitude', 'fclass',
+   'fcode', 'page_rank', 'date_from', 'date_until', 'comment',
+   'country_code', 'cc2', 'country_name', 'continent_name', 'adm1_code',
+   'adm1_name_utf', 'adm1_name_ascii', 'adm2_code', 'adm2_name_utf',
+   'adm2_name_ascii', 'adm3_code', 'adm4_code', 'population', 'elevation',
+   'gtopo30', 'timezone', 'gmt_offset', 'dst_offset', 'raw_offset',
+   'moddate', 'city_code_list', 'city_name_list', 'city_detail_list',
+   'tvl_por_list', 'iso31662', 'location_type', 'wiki_link',
+   'alt_name_section', 'wac', 'wac_name', 'ccy_code', 'unlc_list',
+   'uic_list', 'geoname_lat', 'geoname_lon')
+
+unlc_file_header = ('unlocode', 'latitude', 'longitude', 'geonames_id',
+                    'iso31662_code', 'iso31662_name', 'feat_class',
+                    'feat_code')
+
+# Countries: code, name, continent, time zone, GMT/DST/raw offsets,
+# currency, World Area Code, language of the local names, and the
+# latitude/longitude box of the POR
+synthetic_countries = (
+   ('US', 'United States', 'North America', 'America/Chicago',
+    '-6.0', '-5.0', '-6.0', 'USD', '41', 'en', (30, 47), (-120, -75)),
+   ('CA', 'Canada', 'North America', 'America/Toronto',
+    '-5.0', '-4.0', '-5.0', 'CAD', '71', 'fr', (43, 55), (-125, -65)),
+   ('BR', 'Brazil', 'South America', 'America/Sao_Paulo',
+    '-3.0', '-3.0', '-3.0', 'BRL', '311', 'pt', (-30, -3), (-60, -35)),
+   ('FR', 'France', 'Europe', 'Europe/Paris',
+    '1.0', '2.0', '1.0', 'EUR', '427', 'fr', (43, 50), (-2, 7)),
+   ('DE', 'Germany', 'Europe', 'Europe/Berlin',
+    '1.0', '2.0', '1.0', 'EUR', '429', 'de', (48, 54), (6, 14)),
+   ('ES', 'Spain', 'Europe', 'Europe/Madrid',
+    '1.0', '2.0', '1.0', 'EUR', '449', 'es', (37, 43), (-8, 3)),
+   ('IT', 'Italy', 'Europe', 'Europe/Rome',
+    '1.0', '2.0', '1.0', 'EUR', '433', 'it', (38, 46), (8, 17)),
+   ('GB', 'United Kingdom', 'Europe', 'Europe/London',
+    '0.0', '1.0', '0.0', 'GBP', '493', 'en', (50, 58), (-5, 1)),
+   ('UA', 'Ukraine', 'Europe', 'Europe/Kyiv',
+    '2.0', '3.0', '2.0', 'UAH', '458', 'uk', (45, 52), (23, 40)),
+   ('RU', 'Russia', 'Europe', 'Europe/Moscow',
+    '3.0', '3.0', '3.0', 'RUB', '455', 'ru', (45, 65), (30, 60)),
+   ('AZ', 'Azerbaijan', 'Asia', 'Asia/Baku',
+    '4.0', '4.0', '4.0', 'AZN', '642', 'az', (39, 41), (45, 50)),
+   ('IR', 'Iran', 'Asia', 'Asia/Tehran',
+    '3.5', '4.5', '3.5', 'IRR', '632', 'fa', (27, 38), (46, 60)),
+   ('IN', 'India', 'Asia', 'Asia/Kolkata',
+    '5.5', '5.5', '5.5', 'INR', '681', 'hi', (9, 30), (70, 88)),
+   ('CN', 'China', 'Asia', 'Asia/Shanghai',
+    '8.0', '8.0', '8.0', 'CNY', '785', 'zh', (22, 45), (100, 122)),
+   ('JP', 'Japan', 'Asia', 'Asia/Tokyo',
+    '9.0', '9.0', '9.0', 'JPY', '821', 'ja', (31, 43), (130, 145)),
+   ('AU', 'Australia', 'Oceania', 'Australia/Sydney',
+    '10.0', '11.0', '10.0', 'AUD', '802', 'en', (-38, -12), (115, 153)),
+   ('NG', 'Nigeria', 'Africa', 'Africa/Lagos',
+    '1.0', '1.0', '1.0', 'NGN', '554', 'yo', (5, 13), (3, 14)),
+   ('ZA', 'South Africa', 'Africa', 'Africa/Johannesburg',
+    '2.0', '2.0', '2.0', 'ZAR', '580', 'af', (-34, -23), (18, 32)),
+)
+
+# Kinds of POR clusters, and their weights. The clusters with IATA codes
+# (cities served by travel-related POR, cities with an airport on the same
+# record, off-line points) make up about a fifth of the records of the
+# real main POR file, in fewer clusters
+cluster_kind_weights = (('iata_city', 0.025), ('city_airport', 0.012),
+                        ('offline', 0.005), ('city', 0.88), ('port', 0.078))
+
+# Travel-related POR (location type, Geonames feature class and code,
+# suffix of the name) and the maximum numbers of them around a city
+travel_por_kinds = (('A', 'S', 'AIRP', 'International Airport', 2),
+                    ('R', 'S', 'RSTN', 'Railway Station', 1),
+                    ('B', 'S', 'BUSTN', 'Bus Station', 1),
+                    ('H', 'S', 'AIRH', 'Heliport', 1),
+                    ('P', 'L', 'PRT', 'Port', 1))
+
+syllables = tuple ([consonant + vowel for consonant in 'bcdfghjklmnprstvz'
+                    for vowel in 'aeiou']
+                   + [consonant + vowel + coda
+                      for consonant in 'bcdfghjklmnprstvz'
+                      for vowel in 'aeiou' for coda in 'nrslk'])
+
+# Accented variants of some vowels, for the (UTF-8) names differing
+# from their ASCII versions
+accented_vowels = str.maketrans ({'a': 'ā', 'e': 'é', 'o': 'ö', 'u': 'ū'})
+
+unlc_code_chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ23456789'
+
+# Languages of the alternate names, besides the local ones
+alt_name_languages = ('ar', 'de', 'es', 'fr', 'it', 'ja', 'pl', 'pt', 'ru',
+                      'zh')
+
+
+class SyntheticOPTDGenerator():
+   """
+   Generator of the records of synthetic OPTD data files (see the module
+   documentation), reproducible for a given seed
+   """
+   rng = None
+   iata_codes = None
+   unlc_codes = None
+   adm1_dict = None
+   next_geo_id = None
+
+   def __init__ (self, seed = 42):
+      self.rng = random.Random (seed)
+      letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+      self.iata_codes = [first + second + third for first in letters
+                         for second in letters for third in letters]
+      self.rng.shuffle (self.iata_codes)
+      self.unlc_codes = dict()
+      self.adm1_dict = {country[0]: [(f"{idx:02d}", self.name (1))
+                                     for idx in range (1, 21)]
+                        for country in synthetic_countries}
+      self.next_geo_id = 100000
+
+   def word (self):
+      rng = self.rng
+      return ''.join (rng.choice (syllables)
+                      for _ in range (rng.randint (1, 3))).capitalize()
+
+   def name (self, max_words = 3):
+      return ' '.join (self.word()
+                       for _ in range (self.rng.randint (1, max_words)))
+
+   def geoID (self):
+      self.next_geo_id += self.rng.randint (1, 40)
+      return self.next_geo_id
+
+   def iataCode (self):
+      """
+        A new IATA code, or None once they have all been drawn
+      """
+      if self.iata_codes:
+         return self.iata_codes.pop()
+      return None
+
+   def unlcCode (self, country_code):
+      """
+        A new UN/LOCODE code in the given country, or None once they have
+        all been drawn
+      """
+      code_list = self.unlc_codes.get (country_code)
+      if code_list is None:
+         code_list = [first + second + third for first in unlc_code_chars
+                      for second in unlc_code_chars
+                      for third in unlc_code_chars]
+         self.rng.shuffle (code_list)
+         self.unlc_codes[country_code] = code_list
+      if code_list:
+         return country_code + code_list.pop()
+      return None
+
+   def porRecord (self, country, region, name, location_type, fclass, fcode,
+                  coordinates):
+      """
+        Record (dictionary) of a POR, without any code nor cross-reference,
+        region being its (admin. level 1) code and name
+      """
+      rng = self.rng
+      (country_code, country_name, continent_name, timezone, gmt_offset,
+       dst_offset, raw_offset, ccy_code, wac, language, _, _) = country
+      (adm1_code, adm1_name) = region
+
+      # Some names have accents, and local alternate names
+      asciiname = name
+      if rng.random() < 0.1:
+         name = name.translate (accented_vowels)
+      alt_name_section = f"en|{asciiname}|"
+      if rng.random() < 0.5:
+         alt_name_section += f"={language}|{self.name (2)}|"
+      for alt_name_language in rng.sample (alt_name_languages,
+                                           rng.randint (0, 3)):
+         alt_name_section += f"={alt_name_language}|{asciiname}|"
+
+      return {
+         'iata_code': '', 'icao_code': '', 'faa_code': '', 'is_geonames': 'Y',
+         'geoname_id': str (self.geoID()), 'envelope_id': '',
+         'name': name, 'asciiname': asciiname,
+         'latitude': f"{coordinates[0]:.5f}",
+         'longitude': f"{coordinates[1]:.5f}", 'fclass': fclass,
+         'fcode': fcode, 'page_rank': '', 'date_from': '', 'date_until': '',
+         'comment': '', 'country_code': country_code, 'cc2': '',
+         'country_name': country_name, 'continent_name': continent_name,
+         'adm1_code': adm1_code, 'adm1_name_utf': adm1_name,
+         'adm1_name_ascii': adm1_name, 'adm2_code': '', 'adm2_name_utf': '',
+         'adm2_name_ascii': '', 'adm3_code': '', 'adm4_code': '',
+         'population': '0', 'elevation': '',
+         'gtopo30': str (rng.randint (-5, 1500)), 'timezone': timezone,
+         'gmt_offset': gmt_offset, 'dst_offset': dst_offset,
+         'raw_offset': raw_offset,
+         'moddate': f"{rng.randint (2010, 2023)}-{rng.randint (1, 12):02d}-" \
+         f"{rng.randint (1, 28):02d}",
+         'city_code_list': '', 'city_name_list': '', 'city_detail_list': '',
+         'tvl_por_list': '', 'iso31662': '', 'location_type': location_type,
+         'wiki_link': '', 'alt_name_section': alt_name_section, 'wac': wac,
+         'wac_name': country_name, 'ccy_code': ccy_code, 'unlc_list': '',
+         'uic_list': '', 'geoname_lat': '', 'geoname_lon': ''}
+
+   def setCityReference (self, por_rec, city_rec):
+      """
+        Reference the city (having an IATA code) serving a POR
+      """
+      por_rec['city_code_list'] = city_rec['iata_code']
+      por_rec['city_name_list'] = city_rec['asciiname']
+      por_rec['city_detail_list'] = f"{city_rec['iata_code']}|" \
+         f"{city_rec['geoname_id']}|{city_rec['name']}|{city_rec['asciiname']}"
+
+   def setUNLCCode (self, por_rec, unlc_rec_list):
+      """
+        Give a UN/LOCODE code to a POR (when there are some left), and add
+        the corresponding record of the UN/LOCODE POR file
+      """
+      unlc_code = self.unlcCode (por_rec['country_code'])
+      if unlc_code is None:
+         return
+      por_rec['unlc_list'] = f"{unlc_code}|"
+      unlc_rec_list.append ((unlc_code, por_rec['latitude'],
+                             por_rec['longitude'], por_rec['geoname_id'],
+                             f"{por_rec['country_code']}-" \
+                             f"{por_rec['adm1_code']}",
+                             por_rec['adm1_name_utf'], por_rec['fclass'],
+                             por_rec['fcode']))
+
+      # A few UN/LOCODE codes have several records, the other ones
+      # referencing POR not in the main POR file (e.g., a heliport)
+      if self.rng.random() < 0.05:
+         unlc_rec_list.append ((unlc_code, por_rec['latitude'],
+                                por_rec['longitude'], str (self.geoID()),
+                                '', '', 'S', 'AIRH'))
+
+   def historicalRecord (self, por_rec):
+      """
+        Historical record of a POR (with an envelope ID and an older name)
+      """
+      historical_rec = dict (por_rec)
+      historical_rec['envelope_id'] = '1'
+      historical_rec['name'] = historical_rec['asciiname'] = self.name (2) \
+         + ' ' + por_rec['name'].split()[-1]
+      historical_rec['page_rank'] = ''
+      historical_rec['wiki_link'] = ''
+      historical_rec['alt_name_section'] = ''
+      historical_rec['unlc_list'] = ''
+      historical_rec['moddate'] = '2012-02-27'
+      return historical_rec
+
+   def clusterRecords (self):
+      """
+        Generate the records of a cluster of POR, as a list of records
+        of the main POR file (dictionaries) and a list of records of the
+        UN/LOCODE POR file (tuples)
+      """
+      rng = self.rng
+      por_rec_list = []
+      unlc_rec_list = []
+      country = rng.choice (synthetic_countries)
+      region = rng.choice (self.adm1_dict[country[0]])
+      (lat_range, lon_range) = country[-2:]
+      coordinates = (rng.uniform (*lat_range), rng.uniform (*lon_range))
+      city_name = self.name()
+      kind = rng.choices ([kind for (kind, _) in cluster_kind_weights],
+                          [weight for (_, weight) in cluster_kind_weights])[0]
+
+      iata_code = None
+      if kind in ('iata_city', 'city_airport', 'offline'):
+         iata_code = self.iataCode()
+         # The IATA codes having all been drawn
+         if iata_code is None:
+            kind = 'city'
+
+      if kind == 'port':
+         port_rec = self.porRecord (country, region, f"Port of {city_name}",
+                                    'P', 'L', 'PRT', coordinates)
+         self.setUNLCCode (port_rec, unlc_rec_list)
+         return ([port_rec], unlc_rec_list)
+
+      if kind == 'offline':
+         offline_rec = self.porRecord (country, region, f"{city_name} Hotel",
+                                       'O', 'S', 'HTL', coordinates)
+         offline_rec['iata_code'] = iata_code
+         return ([offline_rec], unlc_rec_list)
+
+      # City
+      city_loc_type = 'CA' if kind == 'city_airport' else 'C'
+      city_fcode = rng.choices (('PPL', 'PPLA', 'PPLA2', 'PPLC'),
+                                (0.85, 0.08, 0.06, 0.01))[0]
+      city_rec = self.porRecord (country, region, city_name, city_loc_type,
+                                 'P', city_fcode, coordinates)
+      city_rec['population'] = str (int (rng.paretovariate (1.2) * 1000))
+      self.setUNLCCode (city_rec, unlc_rec_list)
+      por_rec_list.append (city_rec)
+      if iata_code is None:
+         return (por_rec_list, unlc_rec_list)
+
+      city_rec['iata_code'] = iata_code
+      city_rec['page_rank'] = f"{rng.uniform (0.001, 0.2):.4f}"
+      city_rec['wiki_link'] = "https://en.wikipedia.org/wiki/" \
+         + city_rec['asciiname'].replace (' ', '_')
+      self.setCityReference (city_rec, city_rec)
+      if kind == 'city_airport':
+         city_rec['icao_code'] = country[0][0] + ''.join (
+            rng.choice (unlc_code_chars[:26]) for _ in range (3))
+         return (por_rec_list, unlc_rec_list)
+
+      # Travel-related POR serving the city. The (first) airport often
+      # has the IATA code of the city
+      tvl_code_list = []
+      for (loc_type, fclass, fcode, name_suffix, max_count) \
+          in travel_por_kinds:
+         count = rng.randint (1 if loc_type == 'A' else 0, max_count)
+         for idx in range (count):
+            tvl_coordinates = (coordinates[0] + rng.uniform (-0.3, 0.3),
+                               coordinates[1] + rng.uniform (-0.3, 0.3))
+            tvl_name = f"{city_name} {name_suffix}"
+            if idx > 0:
+               tvl_name = f"{city_name} {self.word()} {name_suffix}"
+            tvl_rec = self.porRecord (country, region, tvl_name, loc_type,
+                                      fclass, fcode, tvl_coordinates)
+            if loc_type == 'A' and idx == 0 and rng.random() < 0.7:
+               tvl_code = iata_code
+            else:
+               tvl_code = self.iataCode()
+               if tvl_code is None:
+                  continue
+            tvl_rec['iata_code'] = tvl_code
+            tvl_code_list.append (tvl_code)
+            self.setCityReference (tvl_rec, city_rec)
+
+            if loc_type == 'A':
+               tvl_rec['icao_code'] = country[0][0] + ''.join (
+                  rng.choice (unlc_code_chars[:26]) for _ in range (3))
+               tvl_rec['page_rank'] = f"{rng.uniform (0.001, 0.15):.4f}"
+               tvl_rec['elevation'] = str (rng.randint (0, 1500))
+               tvl_rec['wiki_link'] = "https://en.wikipedia.org/wiki/" \
+                  + tvl_rec['asciiname'].replace (' ', '_')
+               if rng.random() < 0.3:
+                  self.setUNLCCode (tvl_rec, unlc_rec_list)
+            elif loc_type == 'R':
+               tvl_rec['uic_list'] = f"{rng.randint (1000000, 9999999)}|"
+            elif loc_type == 'P':
+               self.setUNLCCode (tvl_rec, unlc_rec_list)
+
+            # Historical record, before the current one
+            if rng.random() < 0.05:
+               por_rec_list.append (self.historicalRecord (tvl_rec))
+            por_rec_list.append (tvl_rec)
+
+      city_rec['tvl_por_list'] = ','.join (tvl_code_list)
+      return (por_rec_list, unlc_rec_list)
+
+
+def writeSyntheticOPTDFiles (local_dir, scale = 1, seed = 42,
+                             compression = None):
+   """
+     Write synthetic OPTD data files (see the module documentation) into
+     the given directory, under the names expected by OpenTravelData
+     (with the same compression), the main POR file having about
+     scale x 123,000 records (e.g., scale = 0.01, 1, 10 or 100).
+     Return the numbers of records of the main POR file and of the
+     UN/LOCODE POR file.
+   """
+   checkCompression (compression)
+   compression_extension = compression_extensions[compression]
+   os.makedirs (local_dir, exist_ok = True)
+   por_filepath = os.path.join (
+      local_dir, os.path.basename (optd_por_all_rel_path)
+      + compression_extension)
+   unlc_filepath = os.path.join (
+      local_dir, os.path.basename (optd_por_unlc_rel_path)
+      + compression_extension)
+
+   generator = SyntheticOPTDGenerator (seed)
+   n_por_rows = max (1, round (optd_por_row_count * scale))
+   with CSVWriter (por_filepath) as por_writer, \
+        CSVWriter (unlc_filepath) as unlc_writer:
+      por_writer.write (por_file_header)
+      unlc_writer.write (unlc_file_header)
+      while por_writer.n_rows <= n_por_rows:
+         (por_rec_list, unlc_rec_list) = generator.clusterRecords()
+         por_writer.writerows ([[por_rec[field] for field in por_file_header]
+                                for por_rec in por_rec_list])
+         unlc_writer.writerows (unlc_rec_list)
+
+   # The headers are not counted
+   return (por_writer.n_rows - 1, unlc_writer.n_rows - 1)
+
+
+def main():
+   parser = argparse.ArgumentParser (description = "Generate synthetic " \
+                                     "OPTD data files")
+   parser.add_argument ('--local-dir', default = '/tmp/opentraveldata',
+                        help = "directory of the data files")
+   parser.add_argument ('--scale', type = float, default = 1,
+                        help = "scale of the main POR file, 1 for about " \
+                        f"{optd_por_row_count} records")
+   parser.add_argument ('--seed', type = int, default = 42,
+                        help = "seed of the random generator")
+   parser.add_argument ('--compression', choices = ('gzip', 'zstd'),
+                        help = "compression of the data files")
+   args = parser.parse_args()
+
+   (n_por_rows, n_unlc_rows) = writeSyntheticOPTDFiles (
+      args.local_dir, args.scale, args.seed, args.compression)
+   print (f"{n_por_rows} POR records and {n_unlc_rows} UN/LOCODE POR " \
+          f"records written into {args.local_dir}")
+   return 0
+
+if __name__ == '__main__':
+   sys.exit (main())
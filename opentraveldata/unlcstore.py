@@ -0,0 +1,63 @@
+#
+# https://github.com/opentraveldata/python-opentraveldata/tree/master/opentraveldata
+#
+
+import csv
+import operator
+from .porstore import PORStore
+from .compression import openCompressedFile
+
+# Fields of the records of the OPTD UN/LOCODE POR file
+unlc_fields = ('unlocode', 'latitude', 'longitude', 'geonames_id',
+               'iso31662_code', 'iso31662_name', 'feat_class', 'feat_code')
+
+# Fields having few distinct values
+unlc_pooled_fields = frozenset (('iso31662_code', 'iso31662_name',
+                                 'feat_class', 'feat_code'))
+
+# Indexes on the UN/LOCODE POR records, by index name: by UN/LOCODE code
+# (and then by Geonames ID) and by Geonames ID (and then by UN/LOCODE code)
+unlc_index_names = ('unlc', 'geo')
+
+
+class UNLCStore (PORStore):
+   """
+   Compact, column-oriented store of the records of the OPTD UN/LOCODE
+   POR file
+   """
+   fields = unlc_fields
+   pooled_fields = unlc_pooled_fields
+   list_fields = dict()
+
+
+def parseUNLCPORFile (unlc_por_filepath):
+   """
+     Parse the OPTD UN/LOCODE POR file into a UN/LOCODE store and its
+     (in-memory) indexes, by UN/LOCODE code and by Geonames ID. Return
+     the store and a dictionary of those indexes, by index name.
+
+     There may be several POR with the same UN/LOCODE code (e.g., a city
+     and its airport), and several UN/LOCODE codes for the same POR;
+     both indexes therefore map their keys to dictionaries of row IDs.
+   """
+   unlc_store = UNLCStore()
+   unlc_index = dict()
+   geo_index = dict()
+
+   with openCompressedFile (unlc_por_filepath, newline='') as csvfile:
+      file_reader = csv.reader (csvfile, delimiter='^')
+      header = next (file_reader)
+      get_unlc_values = operator.itemgetter (*[header.index (field)
+                                               for field in unlc_fields])
+      for row in file_reader:
+         # Skip empty lines
+         if not row:
+            continue
+
+         unlc_values = get_unlc_values (row)
+         row_id = unlc_store.append (unlc_values)
+         unlc_code, geo_id = unlc_values[0], unlc_values[3]
+         unlc_index.setdefault (unlc_code, dict())[geo_id] = row_id
+         geo_index.setdefault (geo_id, dict())[unlc_code] = row_id
+
+   return (unlc_store, {'unlc': unlc_index, 'geo': geo_index})
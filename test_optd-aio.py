@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import asyncio
+import threading
+import opentraveldata
+from opentraveldata import AsyncOpenTravelData
+
+def test_shared_load (optd_local_dir):
+    """
+    Test that concurrent first-time lookups wait on a single load,
+    run off the event loop
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            use_snapshot = False)
+    parse_threads = []
+    parsePORFile = myOPTD.parsePORFile
+    def countingParsePORFile (*args):
+        parse_threads.append (threading.current_thread())
+        return parsePORFile (*args)
+    myOPTD.parsePORFile = countingParsePORFile
+
+    async def lookUp():
+        async with AsyncOpenTravelData (myOPTD) as asyncOPTD:
+            return await asyncio.gather (
+                *[asyncOPTD.getServingPORList ('IEV') for _ in range (10)],
+                asyncOPTD.getServedPORList ('KBP'))
+
+    results = asyncio.run (lookUp())
+    assert len (parse_threads) == 1
+    assert parse_threads[0] is not threading.main_thread()
+    assert results[:10] == [myOPTD.getServingPORList ('IEV')] * 10
+    assert results[10] == ['IEV']
+
+def test_lookups (optd_local_dir):
+    """
+    Test the awaitable lookups
+    """
+    async def lookUp():
+        async with AsyncOpenTravelData (local_dir = optd_local_dir,
+                                        validate_file_sizes = False) \
+                                        as asyncOPTD:
+            await asyncOPTD.downloadFilesIfNeeded()
+            por_rec = await asyncOPTD.getPORByGeoID ('6300952')
+            dist_list = await asyncOPTD.getNearestPORList (50.45, 30.52, k = 2,
+                                                           loc_type_flags = 'A')
+            unlc_list = await asyncOPTD.getUNLCPORList ('UAKBP')
+            return (por_rec, dist_list, unlc_list)
+
+    (por_rec, dist_list, unlc_list) = asyncio.run (lookUp())
+    assert por_rec['iata_code'] == 'KBP'
+    assert [por['iata_code'] for (_, por) in dist_list] == ['IEV', 'KBP']
+    assert [por['geonames_id'] for por in unlc_list] == ['6300952']
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+from opentraveldata.columnarcache import checkColumnarCache, pyarrow
+
+def test_columnar_cache_format (optd_local_dir):
+    """
+    Test the check of the format of the columnar cache
+    """
+    with pytest.raises (ValueError):
+        opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                       columnar_cache = 'orc')
+    if pyarrow is None:
+        with pytest.raises (ImportError):
+            checkColumnarCache ('parquet')
+
+@pytest.mark.parametrize ('cache_format', ['arrow', 'parquet'])
+def test_columnar_cache (optd_local_dir, cache_format):
+    """
+    Test the loading of the POR records from the columnar cache
+    """
+    pytest.importorskip ('pyarrow')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            use_snapshot = False)
+    myOPTD.downloadFilesIfNeeded (columnar_cache = cache_format)
+    cache_filepath = myOPTD.local_columnar_cache_filepath
+    assert cache_filepath.endswith ('.' + cache_format)
+    assert os.path.isfile (cache_filepath)
+
+    # Same POR records and dictionaries as when parsing the POR file
+    myOPTD.extractPORSubsetFromOPTD()
+    refOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                             validate_file_sizes = False,
+                                             use_snapshot = False)
+    refOPTD.extractPORSubsetFromOPTD()
+    assert myOPTD.por_store.columns == refOPTD.por_store.columns
+    assert myOPTD.iata_por_dict.index == refOPTD.iata_por_dict.index
+    assert list (myOPTD.iterPOR (['iata_code', 'name'])) \
+        == list (refOPTD.iterPOR (['iata_code', 'name']))
+
+    # Column pruning and predicate pushdown
+    table = myOPTD.getPORTable (['iata_code', 'location_type'],
+                                [('location_type', '=', 'A'),
+                                 ('iata_code', '!=', '')])
+    assert table.column_names == ['iata_code', 'location_type']
+    assert sorted (table.column ('iata_code').to_pylist()) \
+        == sorted (por.iata_code for por in refOPTD.iterPOR (
+            ['iata_code', 'location_type'],
+            lambda por: por.location_type == 'A' and por.iata_code != ''))
+
+    # The cache is not converted again while the POR file is unchanged,
+    # and it is when that latter changes
+    cache_mtime = os.stat (cache_filepath).st_mtime_ns
+    myOPTD.downloadFilesIfNeeded()
+    assert os.stat (cache_filepath).st_mtime_ns == cache_mtime
+    with open (myOPTD.local_iata_por_filepath, 'a') as por_file:
+        por_file.write ('\n')
+    myOPTD.downloadFilesIfNeeded()
+    assert os.stat (cache_filepath).st_mtime_ns != cache_mtime
+
+    myOPTD.deleteLocalFiles()
+    assert not os.path.exists (cache_filepath)
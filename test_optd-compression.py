@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+import os
+import gzip
+import pytest
+import opentraveldata
+from opentraveldata.compression import uncompressedFileSize
+
+def compressFixtures (local_dir, compress, extension):
+    """
+    Replace the (uncompressed) data files of a local directory by their
+    compressed versions
+    """
+    for filename in ('optd_por_public_all.csv', 'optd_por_unlc.csv'):
+        filepath = os.path.join (local_dir, filename)
+        with open (filepath, 'rb') as data_file:
+            content = data_file.read()
+        with open (filepath + extension, 'wb') as compressed_file:
+            compressed_file.write (compress (content))
+        os.remove (filepath)
+
+def test_read_compressed_files (optd_local_dir, capsys):
+    """
+    Test that compressed data files are read transparently
+    """
+    plainOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                               validate_file_sizes = False,
+                                               use_snapshot = False)
+    file_sizes = plainOPTD.fileSizes()
+    header = plainOPTD.extractIATAPORFileHeader()
+    srv_dict = plainOPTD.getServingPORList ('IEV')
+
+    compressFixtures (optd_local_dir, gzip.compress, '.gz')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            compression = 'gzip')
+    assert myOPTD.localIATAPORFilepath().endswith ('.csv.gz')
+    assert myOPTD.fileSizes() == file_sizes
+    assert myOPTD.extractIATAPORFileHeader() == header
+    assert myOPTD.extractUNLCPORFileHeader().startswith ('unlocode^')
+    assert myOPTD.getServingPORList ('IEV') == srv_dict
+
+    myOPTD.displayFilesHead (2)
+    assert capsys.readouterr().out.count ('iata_code,icao_code') == 1
+
+def test_uncompressed_file_size_cache (tmp_path, monkeypatch):
+    """
+    Test that the uncompressed size of a compressed file is computed
+    once per version of that file
+    """
+    filepath = str (tmp_path / 'data.csv.gz')
+    with open (filepath, 'wb') as compressed_file:
+        compressed_file.write (gzip.compress (b'a^b\n' * 1000))
+
+    opened_files = []
+    openCompressedFile = opentraveldata.compression.openCompressedFile
+    def trackedOpenCompressedFile (filepath, *args, **kwargs):
+        opened_files.append (filepath)
+        return openCompressedFile (filepath, *args, **kwargs)
+    monkeypatch.setattr (opentraveldata.compression, 'openCompressedFile',
+                         trackedOpenCompressedFile)
+
+    assert uncompressedFileSize (filepath) == 4000
+    assert uncompressedFileSize (filepath) == 4000
+    assert len (opened_files) == 1, \
+        "The size of an unchanged file should not be computed again"
+
+    # Once the file changes, its size is computed again
+    with open (filepath, 'wb') as compressed_file:
+        compressed_file.write (gzip.compress (b'a^b\n' * 10))
+    assert uncompressedFileSize (filepath) == 40
+    assert len (opened_files) == 2
+
+def test_read_zstd_compressed_files (optd_local_dir):
+    """
+    Test that zstd-compressed data files are read transparently
+    """
+    zstandard = pytest.importorskip ('zstandard')
+    compressFixtures (optd_local_dir, zstandard.ZstdCompressor().compress,
+                      '.zst')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            compression = 'zstd')
+    assert myOPTD.getPORByGeoID ('703448')['name'] == 'Kyiv'
+
+def test_compressed_download (optd_server, optd_local_dir, tmp_path_factory):
+    """
+    Test that the data files are compressed while being downloaded,
+    whether the transfer is itself compressed or not
+    """
+    plainOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                               validate_file_sizes = False)
+    for (path, local_por_filepath) in \
+        (('/optd_por_public_all.csv', plainOPTD.localIATAPORFilepath()),
+         ('/optd_por_unlc.csv', plainOPTD.localUNLCPORFilepath())):
+        with open (local_por_filepath, 'rb') as por_file:
+            optd_server.files[path] = (por_file.read(), f'"{path}"')
+
+    base_url = f"http://127.0.0.1:{optd_server.server_port}"
+    for gzip_encoding in (False, True):
+        optd_server.gzip_encoding = gzip_encoding
+        local_dir = str (tmp_path_factory.mktemp ('compressed'))
+        myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                                validate_file_sizes = False,
+                                                compression = 'gzip')
+        myOPTD.iata_por_file_url = f"{base_url}/optd_por_public_all.csv"
+        myOPTD.unlc_por_file_url = f"{base_url}/optd_por_unlc.csv"
+        myOPTD.downloadFilesIfNeeded()
+        assert optd_server.requests[-1][1]['Accept-Encoding'] == 'gzip'
+        assert myOPTD.fileSizes() == plainOPTD.fileSizes()
+        assert os.path.getsize (myOPTD.localIATAPORFilepath()) \
+            < os.path.getsize (plainOPTD.localIATAPORFilepath())
+        assert myOPTD.getPORByGeoID ('703448')['name'] == 'Kyiv'
+        assert myOPTD.downloadPORFiles() == ('not-modified', 'not-modified')
+
+def test_unknown_compression():
+    """
+    Test that unknown compressions are rejected
+    """
+    with pytest.raises (ValueError):
+        opentraveldata.OpenTravelData (local_dir = '/nonexistent',
+                                       compression = 'lzma')
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 
-import os, json
+import os, csv, gzip, json
 import pytest
 from opentraveldata import CSVWriter, OpenTravelData
+from opentraveldata.compression import openCompressedFile
 
 def test_csvwriter_writing():
     """
@@ -18,3 +19,66 @@ def test_csvwriter_writing():
     doesFileExist = os.path.isfile (csv_test_filepath)
     assert doesFileExist, f"Error in writing {csv_test_filepath}"
 
+
+def test_csvwriter_bulk (tmp_path):
+    """
+    Test the bulk writing, with a small buffer, by the calling thread
+    or by a background thread
+    """
+    rows = [['IEV', 'A', f"Kyiv^{idx}", idx] for idx in range (1000)]
+    expected_content = ''.join (f'IEV^A^"Kyiv^{idx}"^{idx}\n'
+                                for idx in range (1000))
+    for background in (False, True):
+        csv_test_filepath = str (tmp_path / f"optd-test-{background}.csv")
+        progress_list = []
+        with CSVWriter (csv_test_filepath, buffer_size = 1000,
+                        background = background,
+                        progress_callback = lambda n_rows, n_bytes:
+                        progress_list.append ((n_rows, n_bytes))) as csvwriter:
+            csvwriter.write (rows[0])
+            csvwriter.writerows (iter (rows[1:]), batch_size = 64)
+            assert csvwriter.fname() == csv_test_filepath
+        assert csvwriter.n_rows == 1000
+        assert csvwriter.size() == csvwriter.n_bytes \
+            == len (expected_content.encode ('utf8'))
+        with open (csv_test_filepath, encoding = 'utf8') as csv_file:
+            assert csv_file.read() == expected_content
+
+        # Progress reported once per chunk
+        assert len (progress_list) > 1
+        assert progress_list == sorted (progress_list)
+        assert progress_list[-1] == (1000, csvwriter.n_bytes)
+
+def test_csvwriter_compression (tmp_path):
+    """
+    Test the writing of compressed CSV files
+    """
+    rows = [['NCE', 'CA', 'Nice Côte d\'Azur', idx] for idx in range (500)]
+    csv_test_filepath = str (tmp_path / 'optd-test.csv.gz')
+    with CSVWriter (csv_test_filepath, background = True) as csvwriter:
+        csvwriter.writerows (rows)
+    assert csvwriter.size() < csvwriter.n_bytes
+    with gzip.open (csv_test_filepath, 'rt', encoding = 'utf8') as csv_file:
+        assert list (csv.reader (csv_file, delimiter = '^')) \
+            == [[str (field) for field in row] for row in rows]
+
+    pytest.importorskip ('zstandard')
+    csv_test_filepath = str (tmp_path / 'optd-test.csv.zst')
+    with CSVWriter (csv_test_filepath) as csvwriter:
+        csvwriter.writerows (rows)
+    with openCompressedFile (csv_test_filepath, 'rt',
+                             encoding = 'utf8') as csv_file:
+        assert len (csv_file.read().splitlines()) == len (rows)
+
+def test_csvwriter_write_error (tmp_path):
+    """
+    Test that an error of the background thread is raised by the writer
+    """
+    csv_test_filepath = str (tmp_path / 'optd-test.csv')
+    csvwriter = CSVWriter (csv_test_filepath, buffer_size = 10,
+                           background = True)
+    csvwriter.fp.close()
+    csvwriter.write (['IEV', 'A'])
+    with pytest.raises (ValueError):
+        csvwriter.close()
+    assert csvwriter.write_thread is None
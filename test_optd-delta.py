@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+
+def porDicts (myOPTD):
+    """
+    Plain version of the POR dictionaries, so that they may be compared
+    """
+    iata_por_dict = {iata_code: {loc_type: dict (por_rec)
+                                 for loc_type, por_rec in por_recs.items()}
+                     for iata_code, por_recs in myOPTD.iata_por_dict.items()}
+    unlc_por_dict = {unlc_code: {geo_id: dict (por_rec)
+                                 for geo_id, por_rec in por_recs.items()}
+                     for unlc_code, por_recs in myOPTD.unlc_por_dict.items()}
+    geo_por_dict = {geo_id: dict (por_rec)
+                    for geo_id, por_rec in myOPTD.geo_por_dict.items()}
+    return (iata_por_dict, unlc_por_dict, geo_por_dict)
+
+@pytest.mark.parametrize ('use_mmap_index', [False, True])
+def test_refresh_por_data (optd_server, optd_local_dir, tmp_path_factory,
+                           use_mmap_index):
+    """
+    Test that the changes of a new release of the main POR file are applied
+    to the POR dictionaries already loaded
+    """
+    with open (os.path.join (optd_local_dir, 'optd_por_public_all.csv'),
+               encoding = 'utf8') as por_file:
+        por_lines = por_file.read().splitlines (keepends = True)
+    with open (os.path.join (optd_local_dir, 'optd_por_unlc.csv'),
+               'rb') as unlc_file:
+        optd_server.files['/optd_por_unlc.csv'] = (unlc_file.read(), '"u1"')
+    optd_server.files['/optd_por_public_all.csv'] = \
+        (''.join (por_lines).encode ('utf8'), '"v1"')
+
+    base_url = f"http://127.0.0.1:{optd_server.server_port}"
+    def newOPTD():
+        local_dir = str (tmp_path_factory.mktemp ('delta'))
+        myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                                validate_file_sizes = False,
+                                                use_mmap_index = use_mmap_index)
+        myOPTD.iata_por_file_url = f"{base_url}/optd_por_public_all.csv"
+        myOPTD.unlc_por_file_url = f"{base_url}/optd_por_unlc.csv"
+        myOPTD.prewarmPORIndexes()
+        return myOPTD
+
+    myOPTD = newOPTD()
+    assert myOPTD.getServedPORList ('XCN') == ['NCE']
+    change_summaries = []
+    myOPTD.addPORRefreshListener (change_summaries.append)
+    assert myOPTD.refreshPORData() \
+        == {'added': [], 'changed': [], 'removed': []}
+
+    # New release: KBP renamed and losing its UN/LOCODE code, XCN removed
+    # and a new POR
+    new_por_lines = []
+    for por_line in por_lines:
+        if por_line.startswith ('KBP^'):
+            por_line = por_line.replace ('^Kyiv Boryspil International Airport^',
+                                         '^Boryspil Airport^', 1)
+            por_line = por_line.replace ('^UAKBP|^', '^^')
+        if por_line.startswith ('XCN^'):
+            continue
+        new_por_lines.append (por_line)
+    new_por_lines.append (por_lines[-1].replace ('^7910318^', '^7910319^')
+                          .replace ('^CNSHA|^', '^CNYSN|^'))
+    optd_server.files['/optd_por_public_all.csv'] = \
+        (''.join (new_por_lines).encode ('utf8'), '"v2"')
+
+    change_summary = myOPTD.refreshPORData()
+    assert change_summary == {'added': [('7910319', '', 'P')],
+                              'changed': [('6300952', 'KBP', 'A')],
+                              'removed': [('6940012', 'XCN', 'R')]}
+    assert change_summaries == [change_summary]
+
+    # The refreshed POR dictionaries are the same as if the new release
+    # had been loaded from scratch
+    refreshedOPTD = newOPTD()
+    assert porDicts (myOPTD) == porDicts (refreshedOPTD)
+    assert myOPTD.getPORByGeoID ('6300952')['name'] == 'Boryspil Airport'
+    assert myOPTD.getPORByGeoID ('6940012') is None
+    assert myOPTD.getServingPORList ('NCE') \
+        == refreshedOPTD.getServingPORList ('NCE')
+    assert [por['geoname_id'] for por in myOPTD.getPORListByType ('P')] \
+        == ['7910318', '7910319']
+
+def test_refresh_por_data_key_collisions (optd_server, optd_local_dir,
+                                          tmp_path_factory):
+    """
+    Test that the POR records added by a new release, having the same
+    keys as existing ones, win (or not) the same way as when the new
+    release is loaded from scratch
+    """
+    with open (os.path.join (optd_local_dir, 'optd_por_public_all.csv'),
+               encoding = 'utf8') as por_file:
+        por_lines = por_file.read().splitlines (keepends = True)
+    with open (os.path.join (optd_local_dir, 'optd_por_unlc.csv'),
+               'rb') as unlc_file:
+        optd_server.files['/optd_por_unlc.csv'] = (unlc_file.read(), '"u1"')
+    optd_server.files['/optd_por_public_all.csv'] = \
+        (''.join (por_lines).encode ('utf8'), '"v1"')
+
+    base_url = f"http://127.0.0.1:{optd_server.server_port}"
+    def newOPTD():
+        local_dir = str (tmp_path_factory.mktemp ('delta'))
+        myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                                validate_file_sizes = False,
+                                                use_mmap_index = False)
+        myOPTD.iata_por_file_url = f"{base_url}/optd_por_public_all.csv"
+        myOPTD.unlc_por_file_url = f"{base_url}/optd_por_unlc.csv"
+        myOPTD.prewarmPORIndexes()
+        return myOPTD
+
+    myOPTD = newOPTD()
+
+    # New release, with records added before existing ones: one with
+    # the IATA code and location type of KBP (the last record of a given
+    # IATA code and location type wins), the other one with the Geonames
+    # ID of NCE (the first record of a given Geonames ID wins)
+    header = por_lines[0].rstrip ('\n').split ('^')
+    def changedLine (por_code, loc_type, **changed_fields):
+        for por_line in por_lines:
+            por_values = por_line.rstrip ('\n').split ('^')
+            if por_values[header.index ('iata_code')] == por_code \
+               and por_values[header.index ('location_type')] == loc_type:
+                break
+        for field, value in changed_fields.items():
+            por_values[header.index (field)] = value
+        return '^'.join (por_values) + '\n'
+    new_por_lines = [por_lines[0],
+                     changedLine ('KBP', 'A', geoname_id = '9999991',
+                                  name = 'Other Boryspil'),
+                     changedLine ('NCE', 'C', location_type = 'CA',
+                                  name = 'Other Nice')] + por_lines[1:]
+    optd_server.files['/optd_por_public_all.csv'] = \
+        (''.join (new_por_lines).encode ('utf8'), '"v2"')
+
+    change_summary = myOPTD.refreshPORData()
+    assert change_summary['added'] == [('9999991', 'KBP', 'A'),
+                                       ('2990440', 'NCE', 'CA')]
+
+    refreshedOPTD = newOPTD()
+    assert porDicts (myOPTD) == porDicts (refreshedOPTD)
+    assert myOPTD.iata_por_dict['KBP']['A']['name'] \
+        == 'Kyiv Boryspil International Airport'
+    assert myOPTD.getPORByGeoID ('2990440')['name'] == 'Other Nice'
+    assert list (myOPTD.iata_por_dict['NCE']) \
+        == list (refreshedOPTD.iata_por_dict['NCE'])
+    assert myOPTD.getServingPORList ('NCE') \
+        == refreshedOPTD.getServingPORList ('NCE')
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+import math
+import opentraveldata
+from opentraveldata.spatialindex import haversineDistance
+from opentraveldata.distancematrix import PointArrays, haversinePairs
+
+def test_por_distance_matrix (optd_local_dir):
+    """
+    Test the distance matrix between POR, given by IATA code or Geonames ID
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    origins = ['IEV', 'KBP', 'NCE', 'ZZZ']
+    destinations = ['NCE', 'KBP']
+    matrix = myOPTD.getPORDistanceMatrix (origins, destinations)
+    assert len (matrix) == len (origins)
+
+    for (origin, row) in zip (origins[:-1], matrix):
+       assert len (row) == len (destinations)
+       for (destination, distance) in zip (destinations, row):
+          origin_rec = myOPTD.por_store.record (
+             myOPTD.porRowIDByCode (origin))
+          destination_rec = myOPTD.por_store.record (
+             myOPTD.porRowIDByCode (destination))
+          expected_distance = haversineDistance (
+             float (origin_rec['latitude']), float (origin_rec['longitude']),
+             float (destination_rec['latitude']),
+             float (destination_rec['longitude']))
+          assert math.isclose (distance, expected_distance, rel_tol = 1e-9,
+                               abs_tol = 1e-6)
+    assert matrix[2][0] == 0
+
+    # Unknown POR
+    assert all (math.isnan (distance) for distance in matrix[-1])
+
+    # Geonames ID of the Nice airport
+    nce_geo_id = myOPTD.iata_por_dict['NCE']['A']['geoname_id']
+    geo_matrix = myOPTD.getPORDistanceMatrix (['KBP'], [nce_geo_id],
+                                              loc_type = 'A')
+    assert math.isclose (geo_matrix[0][0],
+                         myOPTD.getPORDistanceMatrix (['KBP'], ['NCE'],
+                                                      loc_type = 'A')[0][0])
+
+def test_por_distance_matrix_chunks (optd_local_dir):
+    """
+    Test that the chunked distance matrix is the same as the full one
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    origins = ['IEV', 'KBP', 'NCE', 'ZZZ', 'KBP']
+    destinations = ['NCE', 'KBP', 'IEV']
+    matrix = myOPTD.getPORDistanceMatrix (origins, destinations)
+
+    row_list = []
+    for (start, block) in myOPTD.iterPORDistanceMatrix (origins, destinations,
+                                                        chunk_size = 2):
+       assert start == len (row_list)
+       assert len (block) <= 2
+       row_list.extend (list (row) for row in block)
+    assert [[str (distance) for distance in row] for row in row_list] \
+        == [[str (distance) for distance in row] for row in matrix]
+
+def test_por_pair_distances (optd_local_dir):
+    """
+    Test the element-wise distances, between pairs of POR
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    origins = ['IEV', 'KBP', 'ZZZ']
+    destinations = ['NCE', 'NCE', 'NCE']
+    distances = myOPTD.getPORPairDistances (origins, destinations)
+    matrix = myOPTD.getPORDistanceMatrix (origins, ['NCE'])
+    assert len (distances) == len (origins)
+    assert math.isclose (distances[0], matrix[0][0])
+    assert math.isclose (distances[1], matrix[1][0])
+    assert math.isnan (distances[2])
+
+    try:
+       haversinePairs (PointArrays ([0.0], [0.0]), PointArrays ([], []))
+       assert False
+    except ValueError:
+       pass
+
+def test_por_distance_matrix_mmap (optd_local_dir):
+    """
+    Test that the distances are the same with memory-mapped POR
+    dictionaries, and that Geonames IDs may be given as integers
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    mappedOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                                validate_file_sizes = False,
+                                                use_mmap_index = True)
+    origins = ['IEV', 'KBP', 'NCE', 'ZZZ', '6299418', 2990440]
+    destinations = ['NCE', 'KBP', 703448]
+    for loc_type in (None, 'A', 'C'):
+       assert [mappedOPTD.porRowIDByCode (por_code, loc_type)
+               for por_code in origins + destinations] \
+           == [myOPTD.porRowIDByCode (por_code, loc_type)
+               for por_code in origins + destinations]
+       matrix = myOPTD.getPORDistanceMatrix (origins, destinations, loc_type)
+       mapped_matrix = mappedOPTD.getPORDistanceMatrix (origins, destinations,
+                                                        loc_type)
+       assert [[str (distance) for distance in row] for row in mapped_matrix] \
+           == [[str (distance) for distance in row] for row in matrix]
+
+    # Integer Geonames IDs are the same as their string versions
+    assert not math.isnan (matrix[-1][-1])
+    assert myOPTD.porRowIDByCode (2990440) \
+        == myOPTD.porRowIDByCode ('2990440') is not None
+
+    distances = mappedOPTD.getPORPairDistances (['KBP', 'IEV'],
+                                                ['NCE', 703448])
+    assert [str (distance) for distance in distances] \
+        == [str (distance) for distance in myOPTD.getPORPairDistances (
+            ['KBP', 'IEV'], ['NCE', 703448])]
+    row_list = []
+    for (_, block) in mappedOPTD.iterPORDistanceMatrix (origins, destinations,
+                                                        chunk_size = 4):
+       row_list.extend (list (row) for row in block)
+    assert len (row_list) == len (origins)
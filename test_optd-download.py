@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import os
+import json
+import pytest
+import opentraveldata
+from opentraveldata.download import downloadFile, downloadFilepaths
+
+def test_conditional_and_resumed_download (optd_server, tmp_path):
+    """
+    Test that unchanged files are not downloaded again, and that
+    interrupted downloads are resumed
+    """
+    content = b'iata_code^name\n' + b'ABC^Somewhere\n' * 1000
+    optd_server.files['/por.csv'] = (content, '"v1"')
+    url = f"http://127.0.0.1:{optd_server.server_port}/por.csv"
+    filepath = str (tmp_path / 'por.csv')
+
+    assert downloadFile (url, filepath) == 'downloaded'
+    with open (filepath, 'rb') as por_file:
+        assert por_file.read() == content
+
+    # Unchanged remote file
+    assert downloadFile (url, filepath) == 'not-modified'
+    assert optd_server.requests[-1][1]['If-None-Match'] == '"v1"'
+
+    # Changed remote file, the transfer of which gets interrupted
+    new_content = content + b'XYZ^Elsewhere\n' * 1000
+    optd_server.files['/por.csv'] = (new_content, '"v2"')
+    (meta_filepath, partial_filepath, partial_meta_filepath) = \
+        downloadFilepaths (filepath)
+    with open (partial_filepath, 'wb') as partial_file:
+        partial_file.write (new_content[:1234])
+    with open (partial_meta_filepath, 'w') as partial_meta_file:
+        json.dump ({'url': url, 'etag': '"v2"'}, partial_meta_file)
+
+    # The data file is left untouched until the new version is complete
+    with open (filepath, 'rb') as por_file:
+        assert por_file.read() == content
+    assert downloadFile (url, filepath) == 'resumed'
+    assert optd_server.requests[-1][1]['Range'] == 'bytes=1234-'
+    with open (filepath, 'rb') as por_file:
+        assert por_file.read() == new_content
+    assert not os.path.exists (partial_filepath)
+
+    # The remote file changes again, the partial file is then dropped
+    optd_server.files['/por.csv'] = (content, '"v3"')
+    with open (partial_filepath, 'wb') as partial_file:
+        partial_file.write (new_content[:1234])
+    with open (partial_meta_filepath, 'w') as partial_meta_file:
+        json.dump ({'url': url, 'etag': '"v2"'}, partial_meta_file)
+    assert downloadFile (url, filepath) == 'downloaded'
+    with open (filepath, 'rb') as por_file:
+        assert por_file.read() == content
+
+def test_download_files_if_needed (optd_server, optd_local_dir,
+                                   tmp_path_factory):
+    """
+    Test the (concurrent) download of both OPTD data files
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    for (path, local_por_filepath) in \
+        (('/optd_por_public_all.csv', myOPTD.localIATAPORFilepath()),
+         ('/optd_por_unlc.csv', myOPTD.localUNLCPORFilepath())):
+        with open (local_por_filepath, 'rb') as por_file:
+            optd_server.files[path] = (por_file.read(), f'"{path}"')
+
+    base_url = f"http://127.0.0.1:{optd_server.server_port}"
+    local_dir = str (tmp_path_factory.mktemp ('download'))
+    otherOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                               validate_file_sizes = False)
+    otherOPTD.iata_por_file_url = f"{base_url}/optd_por_public_all.csv"
+    otherOPTD.unlc_por_file_url = f"{base_url}/optd_por_unlc.csv"
+    otherOPTD.downloadFilesIfNeeded()
+    assert otherOPTD.fileSizes() == myOPTD.fileSizes()
+    assert otherOPTD.downloadPORFiles() == ('not-modified', 'not-modified')
+    otherOPTD.downloadFilesIfNeeded (refresh = True)
+    assert len (optd_server.requests) == 6
+
+    otherOPTD.deleteLocalFiles()
+    assert os.listdir (local_dir) == []
+
+    otherOPTD.unlc_por_file_url = f"{base_url}/missing.csv"
+    with pytest.raises (opentraveldata.opentraveldata.OPTDDownloadFileError):
+        otherOPTD.downloadFilesIfNeeded()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import math
+import pytest
+import opentraveldata
+
+export_fields = ['iata_code', 'location_type', 'geoname_id', 'latitude',
+                 'page_rank', 'country_code', 'tvl_por_list']
+
+def test_typed_columns (optd_local_dir):
+    """
+    Test the typed (numeric and dictionary-encoded) columns of the POR
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD (('iata',))
+    por_columns = myOPTD.getPORColumns (export_fields)
+    assert list (por_columns) == export_fields
+    assert len (por_columns['iata_code']) == len (myOPTD.por_store)
+
+    # Numeric columns
+    assert por_columns['geoname_id'].typecode == 'q'
+    assert por_columns['latitude'].typecode == 'd'
+    row_id = myOPTD.iata_por_dict.index['KBP']['A']
+    assert por_columns['geoname_id'][row_id] == 6300952
+    assert por_columns['latitude'][row_id] \
+        == float (myOPTD.por_store.value (row_id, 'latitude'))
+    # Missing PageRank values are NaN
+    assert any (math.isnan (page_rank)
+                for page_rank in por_columns['page_rank'])
+
+    # Dictionary-encoded columns
+    loc_type_column = por_columns['location_type']
+    assert len (set (loc_type_column.categories)) \
+        == len (loc_type_column.categories)
+    assert loc_type_column[row_id] == 'A'
+    assert [loc_type_column[idx] for idx in range (len (loc_type_column))] \
+        == [myOPTD.por_store.value (idx, 'location_type')
+            for idx in range (len (myOPTD.por_store))]
+
+    # The typed columns are built once
+    assert myOPTD.getPORColumns (['latitude'])['latitude'] \
+        is por_columns['latitude']
+
+    with pytest.raises (KeyError):
+        myOPTD.getPORColumns (['unknown_field'])
+
+def test_typed_columns_mmap (optd_local_dir):
+    """
+    Test that the typed columns of a memory-mapped POR store are the same
+    as those of the in-memory one, including the list fields
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    mappedOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                                validate_file_sizes = False,
+                                                use_mmap_index = True)
+    por_columns = myOPTD.getPORColumns()
+    mapped_por_columns = mappedOPTD.getPORColumns()
+    for field, column in por_columns.items():
+        # Compared as strings, as NaN differs from itself
+        assert list (map (str, mapped_por_columns[field])) \
+            == list (map (str, column)), \
+            f"The {field} column differs when memory-mapped"
+
+    myOPTD.extractPORSubsetFromOPTD (('iata',))
+    row_id = myOPTD.iata_por_dict.index['BAK']['C']
+    assert mapped_por_columns['unlc_list'][row_id] == ['AZBAK']
+
+def test_numpy_export (optd_local_dir):
+    """
+    Test the export to NumPy arrays
+    """
+    numpy = pytest.importorskip ('numpy')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    arrays = myOPTD.getPORNumPyArrays (export_fields)
+    assert arrays['latitude'].dtype == numpy.float64
+    assert arrays['geoname_id'].dtype == numpy.int64
+    # No copy of the numeric columns
+    assert numpy.shares_memory (arrays['latitude'],
+                                myOPTD.getPORNumPyArrays (['latitude'])
+                                ['latitude'])
+    (codes, categories) = arrays['country_code']
+    assert codes.dtype == numpy.int32
+    assert len (categories) == len (set (categories))
+
+def test_pandas_export (optd_local_dir):
+    """
+    Test the export to a pandas DataFrame
+    """
+    pytest.importorskip ('pandas')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    df = myOPTD.getPORDataFrame (export_fields)
+    assert list (df.columns) == export_fields
+    assert str (df.dtypes['location_type']) == 'category'
+    assert str (df.dtypes['page_rank']) == 'float64'
+    assert set (df[df['iata_code'] == 'KBP']['location_type']) == {'A'}
+
+def test_arrow_export (optd_local_dir):
+    """
+    Test the export to an Arrow table
+    """
+    pyarrow = pytest.importorskip ('pyarrow')
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    table = myOPTD.getPORArrowTable (export_fields)
+    assert table.num_rows == len (myOPTD.por_store)
+    assert pyarrow.types.is_dictionary (table.schema.field ('country_code')
+                                        .type)
+    assert table.schema.field ('geoname_id').type == pyarrow.int64()
+    assert table.schema.field ('tvl_por_list').type \
+        == pyarrow.list_ (pyarrow.string())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import opentraveldata
+from opentraveldata.fuzzymatch import nameTrigrams
+
+def test_name_trigrams():
+    """
+    Test the trigrams of the names
+    """
+    assert nameTrigrams ('nice') == {' ni', 'nic', 'ice', 'ce '}
+    assert nameTrigrams ('a') == {' a '}
+
+def test_match_por_name (optd_local_dir):
+    """
+    Test the approximate matching of names to the POR
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+
+    # Misspelled and transliterated names
+    (score, name, por) = myOPTD.matchPORName ('Zhulyany')[0]
+    assert (name, por['iata_code'], por['location_type']) \
+        == ('Zhuliany', 'IEV', 'A')
+    assert 0.3 <= score < 1
+    assert [(name, por['iata_code']) for (_, name, por)
+            in myOPTD.matchPORName ('Boryspol', k = 1)] \
+        == [('Boryspil', 'KBP')]
+    (score, name, por) = myOPTD.matchPORName ('NIZZA')[0]
+    assert (score, name, por['iata_code']) == (1.0, 'Nizza', 'NCE')
+
+    # Sorted by decreasing score
+    score_list = [score for (score, _, _)
+                  in myOPTD.matchPORName ('Kyiv Airport', k = 10,
+                                          min_score = 0.1)]
+    assert score_list == sorted (score_list, reverse = True)
+
+    # Filters
+    assert myOPTD.matchPORName ('Zhulyany', country_code = 'FR') == []
+    assert myOPTD.matchPORName ('Zhulyany', loc_type_flags = 'C') == []
+    assert myOPTD.matchPORName ('zzzzzz') == []
+
+def test_match_por_names (optd_local_dir):
+    """
+    Test the bulk matching of names, by one or several processes
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    names = ['Zhulyany', 'Nizza', 'zhulyany', 'zzzzzz', 'Bakou']
+    match_lists = myOPTD.matchPORNames (names, k = 1)
+    assert match_lists == [myOPTD.matchPORName (name, k = 1)
+                           for name in names]
+    assert myOPTD.matchPORNames (names, k = 1, workers = 2) == match_lists
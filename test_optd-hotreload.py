@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import time
+import threading
+from opentraveldata import HotReloadingOpenTravelData
+
+def test_hot_reload (optd_local_dir):
+    """
+    Test that reader threads keep being answered, from either the old
+    or the new POR data, while the POR data is reloaded
+    """
+    holder = HotReloadingOpenTravelData (local_dir = optd_local_dir,
+                                         validate_file_sizes = False)
+    old_optd = holder.current()
+    assert old_optd.iata_por_dict is not None
+    assert old_optd.geo_por_dict is not None
+    assert holder.getPORByGeoID ('6300952')['name'] \
+        == 'Kyiv Boryspil International Airport'
+    def servingPORCodes (optd):
+        serving_por_dict = optd.getServingPORList ('IEV')
+        return [por['iata_code'] for por in serving_por_dict['tvl_list']]
+    old_serving_por_codes = servingPORCodes (holder)
+
+    # New release: KBP renamed
+    por_filepath = os.path.join (optd_local_dir, 'optd_por_public_all.csv')
+    with open (por_filepath, encoding = 'utf8') as por_file:
+        por_content = por_file.read()
+    with open (por_filepath, 'w', encoding = 'utf8') as por_file:
+        por_file.write (por_content.replace (
+            '^Kyiv Boryspil International Airport^', '^Boryspil Airport^'))
+
+    # Reader threads, each one using a consistent version of the POR data
+    stop_event = threading.Event()
+    errors = []
+    seen_names = set()
+    def readPORData():
+        while not stop_event.is_set():
+            try:
+                optd = holder.current()
+                assert servingPORCodes (optd) == old_serving_por_codes
+                seen_names.add (optd.getPORByGeoID ('6300952')['name'])
+            except Exception as error:
+                errors.append (error)
+                return
+
+    reader_threads = [threading.Thread (target = readPORData)
+                      for _ in range (4)]
+    for reader_thread in reader_threads:
+        reader_thread.start()
+
+    reloaded_optds = []
+    holder.addReloadListener (lambda old, new: reloaded_optds.append (
+        (old, new)))
+    new_optd = holder.reloadPORData (refresh = False).result()
+    stop_event.set()
+    for reader_thread in reader_threads:
+        reader_thread.join()
+    holder.close()
+
+    assert errors == []
+    assert seen_names <= {'Kyiv Boryspil International Airport',
+                          'Boryspil Airport'}
+    assert holder.current() is new_optd
+    assert reloaded_optds == [(old_optd, new_optd)]
+    assert holder.getPORByGeoID ('6300952')['name'] == 'Boryspil Airport'
+    # The old POR data is left untouched
+    assert old_optd.getPORByGeoID ('6300952')['name'] \
+        == 'Kyiv Boryspil International Airport'
+
+def test_concurrent_first_use_builds (optd_local_dir, monkeypatch):
+    """
+    Test that the structures built on first use, on a published
+    OpenTravelData object, are built once and never seen partially built
+    by concurrent reader threads
+    """
+    holder = HotReloadingOpenTravelData (local_dir = optd_local_dir,
+                                         validate_file_sizes = False)
+
+    # Slow builds, so that the reader threads overlap
+    build_counts = {'unlc': 0, 'spatial': 0}
+    opentraveldata_module = sys.modules['opentraveldata.opentraveldata']
+    parseUNLCPORFile = opentraveldata_module.parseUNLCPORFile
+    PORSpatialIndex = opentraveldata_module.PORSpatialIndex
+    def slowParseUNLCPORFile (*args):
+        build_counts['unlc'] += 1
+        time.sleep (0.05)
+        return parseUNLCPORFile (*args)
+    def slowPORSpatialIndex (*args):
+        build_counts['spatial'] += 1
+        time.sleep (0.05)
+        return PORSpatialIndex (*args)
+    monkeypatch.setattr (opentraveldata_module, 'parseUNLCPORFile',
+                         slowParseUNLCPORFile)
+    monkeypatch.setattr (opentraveldata_module, 'PORSpatialIndex',
+                         slowPORSpatialIndex)
+
+    n_readers = 8
+    barrier = threading.Barrier (n_readers)
+    errors = []
+    def readPORData():
+        try:
+            barrier.wait()
+            optd = holder.current()
+            assert optd.getUNLCPORList ('UAKBP') != []
+            assert optd.getNearestPORList (50.345, 30.89472)[0][1] \
+                ['geoname_id'] == '6300952'
+        except Exception as error:
+            errors.append (error)
+
+    reader_threads = [threading.Thread (target = readPORData)
+                      for _ in range (n_readers)]
+    for reader_thread in reader_threads:
+        reader_thread.start()
+    for reader_thread in reader_threads:
+        reader_thread.join()
+    holder.close()
+
+    assert errors == []
+    assert build_counts == {'unlc': 1, 'spatial': 1}
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+from opentraveldata import Instrumentation
+
+def test_load_and_lookup_metrics (optd_local_dir):
+    """
+    Test the metrics of the loading of the POR data and of the lookups
+    """
+    event_list = []
+    instrumentation = Instrumentation (callback = lambda *event:
+                                       event_list.append (event))
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            instrumentation = instrumentation)
+    myOPTD.extractPORSubsetFromOPTD()
+    n_rows = len (myOPTD.por_store)
+    assert instrumentation.counterValue ('snapshot_lookups_total',
+                                         result = 'miss') == 1
+    assert instrumentation.counterValue ('por_rows_parsed_total',
+                                         source = 'file') == n_rows
+    assert instrumentation.spanStats ('parse', source = 'file')[0] == 1
+    assert instrumentation.spanStats ('extract')[0] == 1
+    assert ('gauge', 'por_index_entries', len (myOPTD.geo_por_dict),
+            {'index': 'geo'}) in event_list
+
+    # Lookups, found or not
+    myOPTD.getServingPORList ('IEV')
+    with pytest.raises (opentraveldata.opentraveldata.OPTDIATACodeError):
+        myOPTD.getServingPORList ('ZZZ')
+    myOPTD.getPORByGeoID ('6300952')
+    myOPTD.getPORByGeoID ('6300952')
+    assert instrumentation.counterValue ('lookups_total',
+                                         method = 'getServingPORList',
+                                         result = 'miss') == 1
+    assert instrumentation.counterValue ('lookups_total',
+                                         method = 'getPORByGeoID',
+                                         result = 'hit') == 2
+    (n_spans, duration_sum) = instrumentation.spanStats (
+        'lookup', method = 'getPORByGeoID')
+    assert n_spans == 2 and duration_sum > 0
+    assert event_list[-1] == ('counter', 'lookups_total', 1,
+                              {'method': 'getPORByGeoID', 'result': 'hit'})
+
+    # The next process loads the snapshot
+    otherOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                               validate_file_sizes = False,
+                                               instrumentation = instrumentation)
+    otherOPTD.extractPORSubsetFromOPTD()
+    assert instrumentation.counterValue ('snapshot_lookups_total',
+                                         result = 'hit') == 1
+    assert instrumentation.counterValue ('por_loads_total',
+                                         source = 'snapshot') == 1
+
+    # No metrics once disabled
+    otherOPTD.setInstrumentation (None)
+    otherOPTD.getPORByGeoID ('6300952')
+    assert instrumentation.counterValue ('lookups_total',
+                                         method = 'getPORByGeoID',
+                                         result = 'hit') == 2
+
+def test_prometheus_text():
+    """
+    Test the export of the metrics in the Prometheus text format
+    """
+    instrumentation = Instrumentation (buckets = (1e-3, 1.0))
+    instrumentation.observe ('lookup', 5e-4, method = 'getPORByGeoID')
+    instrumentation.observe ('lookup', 0.5, method = 'getPORByGeoID')
+    instrumentation.count ('lookups_total', method = 'getPORByGeoID',
+                           result = 'hit')
+    instrumentation.setGauge ('por_index_entries', 42, index = 'geo')
+    with instrumentation.span ('download', file = 'a"b.csv'):
+        pass
+
+    line_list = instrumentation.prometheusText().splitlines()
+    assert line_list[:7] == [
+        '# TYPE optd_download_seconds histogram',
+        'optd_download_seconds_bucket{file="a\\"b.csv",le="0.001"} 1',
+        'optd_download_seconds_bucket{file="a\\"b.csv",le="1.0"} 1',
+        'optd_download_seconds_bucket{file="a\\"b.csv",le="+Inf"} 1',
+        line_list[4], 'optd_download_seconds_count{file="a\\"b.csv"} 1',
+        '# TYPE optd_lookup_seconds histogram']
+    assert line_list[7:] == [
+        'optd_lookup_seconds_bucket{method="getPORByGeoID",le="0.001"} 1',
+        'optd_lookup_seconds_bucket{method="getPORByGeoID",le="1.0"} 2',
+        'optd_lookup_seconds_bucket{method="getPORByGeoID",le="+Inf"} 2',
+        'optd_lookup_seconds_sum{method="getPORByGeoID"} 0.5005',
+        'optd_lookup_seconds_count{method="getPORByGeoID"} 2',
+        '# TYPE optd_lookups_total counter',
+        'optd_lookups_total{method="getPORByGeoID",result="hit"} 1',
+        '# TYPE optd_por_index_entries gauge',
+        'optd_por_index_entries{index="geo"} 42']
+
+    instrumentation.reset()
+    assert instrumentation.prometheusText() == '\n'
+
+def test_download_metrics (optd_server, optd_local_dir, tmp_path_factory):
+    """
+    Test the metrics of the downloads
+    """
+    with open (os.path.join (optd_local_dir, 'optd_por_public_all.csv'),
+               'rb') as por_file:
+        optd_server.files['/optd_por_public_all.csv'] = (por_file.read(),
+                                                         '"v1"')
+    instrumentation = Instrumentation()
+    myOPTD = opentraveldata.OpenTravelData (
+        local_dir = str (tmp_path_factory.mktemp ('download')),
+        validate_file_sizes = False, instrumentation = instrumentation)
+    base_url = f"http://127.0.0.1:{optd_server.server_port}"
+    myOPTD.iata_por_file_url = f"{base_url}/optd_por_public_all.csv"
+    myOPTD.unlc_por_file_url = f"{base_url}/missing.csv"
+
+    myOPTD.downloadIATAPORFile()
+    myOPTD.downloadIATAPORFile()
+    with pytest.raises (opentraveldata.opentraveldata.OPTDDownloadFileError):
+        myOPTD.downloadUNLCPORFile()
+    for (filename, status) in (('optd_por_public_all.csv', 'downloaded'),
+                               ('optd_por_public_all.csv', 'not-modified'),
+                               ('optd_por_unlc.csv', 'error')):
+        assert instrumentation.counterValue ('downloads_total',
+                                             file = filename,
+                                             status = status) == 1
+    assert instrumentation.spanStats (
+        'download', file = 'optd_por_public_all.csv')[0] == 2
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+from opentraveldata.opentraveldata import FileType, OPTDColumnError
+
+def test_iter_por (optd_local_dir):
+    """
+    Test the streaming of the POR files, with column projection
+    and row predicate
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    por_rec_list = list (myOPTD.iterPOR (['iata_code', 'timezone',
+                                          'icao_code'],
+                                         lambda por_rec: por_rec.iata_code
+                                         in ('KBP', 'NCE')))
+    assert por_rec_list == [('KBP', 'Europe/Kyiv', 'UKBB'),
+                            ('NCE', 'Europe/Paris', ''),
+                            ('NCE', 'Europe/Paris', 'LFMN')]
+    assert por_rec_list[0].timezone == 'Europe/Kyiv'
+
+    # A single column
+    geo_id_list = [por_rec.geoname_id
+                   for por_rec in myOPTD.iterPOR (['geoname_id'])]
+    assert len (geo_id_list) == 17 and geo_id_list[0] == '11085'
+
+    # All the columns, of the UN/LOCODE POR file
+    unlc_rec = next (myOPTD.iterPOR (file_type = FileType.UNLC))
+    assert unlc_rec._fields[0] == 'unlocode' and unlc_rec.unlocode == 'ADALV'
+
+    # No POR dictionary is built
+    assert myOPTD.por_store is None
+
+    with pytest.raises (OPTDColumnError):
+        next (myOPTD.iterPOR (['iata_code', 'no_such_column']))
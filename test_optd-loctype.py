@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+from opentraveldata import LocationType
+from opentraveldata.loctype import parseLocationType
+
+def test_parse_location_type():
+    """
+    Test the parsing of the OPTD location types into bit flags
+    """
+    assert parseLocationType ('C') == LocationType.CITY
+    assert parseLocationType ('CA') == LocationType.CITY | LocationType.AIRPORT
+    assert parseLocationType ('') == LocationType (0)
+    assert parseLocationType ('R') & LocationType.TRANSPORT_RELATED
+
+    myOPTD = opentraveldata.OpenTravelData (local_dir = '/nonexistent')
+    assert myOPTD.isCity ('CA') and myOPTD.isAirport ('CA')
+    assert myOPTD.isTransportRelated ('CH') and not myOPTD.isPort ('CH')
+    assert not myOPTD.isTransportRelated ('C')
+
+def test_por_list_by_type (optd_local_dir):
+    """
+    Test the filtering of the POR by location type and country
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    por_list = myOPTD.getPORListByType (LocationType.AIRPORT
+                                        | LocationType.HELIPORT, 'FR')
+    assert [(por['iata_code'], por['location_type']) for por in por_list] \
+        == [('NCE', 'A'), ('JCA', 'CH')]
+
+    # Historical POR (with an envelope ID) are left out
+    por_list = myOPTD.getPORListByType ('A', 'UA')
+    assert [por['geoname_id'] for por in por_list] == ['6300960', '6300952']
+
+    assert [por['iata_code'] for por in
+            myOPTD.getPORListByType ('CH', match_all = True)] == ['JCA']
+    assert myOPTD.getPORListByType (LocationType.CITY, 'ZZ') == []
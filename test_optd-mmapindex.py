@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+
+def test_mapped_index_matches_in_memory_dictionaries (optd_local_dir):
+    """
+    Test that the memory-mapped POR index yields the same POR dictionaries
+    as the in-memory ones, and that it is built only once
+    """
+    memOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                             use_snapshot = False,
+                                             validate_file_sizes = False)
+    memOPTD.extractPORSubsetFromOPTD()
+
+    mapOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                             validate_file_sizes = False,
+                                             use_mmap_index = True)
+    mapOPTD.extractPORSubsetFromOPTD()
+    index_filepath = mapOPTD.localMappedIndexFilepath()
+    assert os.path.isfile (index_filepath), \
+        f"The {index_filepath} index file has not been built"
+    index_mtime = os.path.getmtime (index_filepath)
+
+    for por_dict_name in ('iata_por_dict', 'unlc_por_dict', 'geo_por_dict'):
+        mem_por_dict = getattr (memOPTD, por_dict_name)
+        map_por_dict = getattr (mapOPTD, por_dict_name)
+        assert sorted (map_por_dict) == sorted (mem_por_dict)
+        for key in mem_por_dict:
+            assert map_por_dict[key] == mem_por_dict[key], \
+                f"Mismatch in {por_dict_name} for {key}"
+    assert 'XXX' not in mapOPTD.iata_por_dict
+    assert mapOPTD.getServingPORList ('IEV') \
+        == memOPTD.getServingPORList ('IEV')
+
+    # Another process re-uses the index file, rather than re-building it
+    otherOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                               validate_file_sizes = False,
+                                               use_mmap_index = True)
+    otherOPTD.extractPORSubsetFromOPTD()
+    assert os.path.getmtime (index_filepath) == index_mtime
+    assert otherOPTD.getPORByGeoID ('6300952')['name'] \
+        == 'Kyiv Boryspil International Airport'
+
+def test_mapped_index_large_record_and_errors (optd_local_dir, monkeypatch):
+    """
+    Test that records larger than 64 kB may be mapped, that a mapped index
+    which cannot be opened raises an explicit error and that the index
+    files are deleted along with the data files
+    """
+    por_filepath = os.path.join (optd_local_dir, 'optd_por_public_all.csv')
+    with open (por_filepath, encoding = 'utf8') as por_file:
+        por_lines = por_file.readlines()
+    por_lines[-1] = por_lines[-1].replace ('Port of Shanghai',
+                                           'Port of Shanghai' * 5000, 1)
+    with open (por_filepath, 'w', encoding = 'utf8') as por_file:
+        por_file.writelines (por_lines)
+
+    mapOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                             validate_file_sizes = False,
+                                             use_mmap_index = True)
+    assert mapOPTD.getPORByGeoID ('7910318')['name'] \
+        == 'Port of Shanghai' * 5000
+
+    # A freshly built index which cannot be mapped
+    os.remove (mapOPTD.localMappedIndexFilepath())
+    monkeypatch.setattr (opentraveldata.mmapindex, 'tryOpenMappedIndex',
+                         lambda index_filepath, source_key: None)
+    failingOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                                 validate_file_sizes = False,
+                                                 use_mmap_index = True)
+    with pytest.raises (opentraveldata.opentraveldata.OPTDLocalFileError):
+        failingOPTD.extractPORSubsetFromOPTD()
+
+    failingOPTD.deleteLocalFiles()
+    for derived_filepath in (failingOPTD.localMappedIndexFilepath(),
+                             failingOPTD.localMappedIndexFilepath() + '.lock'):
+        assert not os.path.exists (derived_filepath)
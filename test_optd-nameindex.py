@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import array
+import random
+import opentraveldata
+from opentraveldata.nameindex import normalizeName, splitAltNameSection, \
+    RangeMaxIndex
+
+def test_normalize_name():
+    """
+    Test the normalization of the names
+    """
+    assert normalizeName ("Aéroport Nice-Côte d'Azur") \
+        == 'aeroport nice cote d azur'
+    assert normalizeName ('  Bīsheh  Kolā ') == 'bisheh kola'
+    assert normalizeName ('КИЇВ') == normalizeName ('київ')
+    assert splitAltNameSection ('en|Kyiv|p=link|http://x|=uk|Київ|') \
+        == [('en', 'Kyiv'), ('uk', 'Київ')]
+
+def test_range_max_index():
+    """
+    Test the positions of the greatest values of ranges against a scan
+    """
+    random_gen = random.Random (7)
+    values = array.array ('d', [random_gen.choice ([0.0, 0.5, 1.0,
+                                                     random_gen.random()])
+                                for _ in range (1000)])
+    range_max_index = RangeMaxIndex (values, block_size = 8)
+    for _ in range (2000):
+        lo = random_gen.randrange (len (values))
+        hi = random_gen.randrange (lo + 1, len (values) + 1)
+        assert range_max_index.argmax (lo, hi) \
+            == max (range (lo, hi), key = values.__getitem__)
+
+def test_por_list_by_name (optd_local_dir):
+    """
+    Test the prefix (typeahead) search of the POR by name
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+
+    # Ranked by PageRank, and matching any word of the names
+    por_list = myOPTD.getPORListByName ('Ky')
+    assert [(name, por['iata_code'], por['location_type'])
+            for (name, por) in por_list] \
+        == [('Kyiv', 'IEV', 'C'),
+            ('Kyiv Boryspil International Airport', 'KBP', 'A'),
+            ('Kyiv Zhuliany International Airport', 'IEV', 'A')]
+    assert [name for (name, _) in myOPTD.getPORListByName ('bory')] \
+        == ['Boryspil']
+    assert [por['iata_code'] for (_, por)
+            in myOPTD.getPORListByName ('kyiv bor')] == ['KBP']
+
+    # Alternate names, accents and case
+    assert [por['iata_code'] for (_, por)
+            in myOPTD.getPORListByName ('AEROPORT NICE')] == ['NCE']
+    assert [por['iata_code'] for (_, por)
+            in myOPTD.getPORListByName ('ky', k = 1)] == ['IEV']
+
+    # Language and location type filters
+    assert [name for (name, _) in myOPTD.getPORListByName ('Ки')] == ['Киев']
+    assert [name for (name, _)
+            in myOPTD.getPORListByName ('Ки', languages = ['uk'])] == ['Київ']
+    assert myOPTD.getPORListByName ('Ки', languages = ['fr']) == []
+    assert [por['iata_code'] for (_, por)
+            in myOPTD.getPORListByName ('ky', loc_type_flags = 'A')] \
+        == ['KBP', 'IEV']
+    assert myOPTD.getPORListByName ('zzz') == []
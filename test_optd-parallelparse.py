@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+from opentraveldata import parallelparse
+from opentraveldata.porstore import por_index_names
+
+@pytest.mark.parametrize ('parse_workers', [2, 3, 5])
+def test_parallel_parse (optd_local_dir, monkeypatch, parse_workers):
+    """
+    Test that parsing the main POR file with several processes gives
+    the same POR store and dictionaries as with a single process
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            use_snapshot = False)
+    (por_store, por_index_dict) = myOPTD.parsePORFile()
+
+    # Tiny ranges, so that the fixture file gets split
+    monkeypatch.setattr (parallelparse, 'parse_min_range_size', 512)
+    (header_line, range_list) = parallelparse.splitFileRanges (
+        myOPTD.localIATAPORFilepath(), parse_workers)
+    assert header_line.startswith ('iata_code^icao_code^')
+    assert len (range_list) == parse_workers
+
+    parallelOPTD = opentraveldata.OpenTravelData (
+        local_dir = optd_local_dir, validate_file_sizes = False,
+        use_snapshot = False, parse_workers = parse_workers)
+    (parallel_por_store, parallel_por_index_dict) = \
+        parallelOPTD.parsePORFile()
+    assert parallel_por_store.columns == por_store.columns
+    for index_name in por_index_names:
+        assert parallel_por_index_dict[index_name] \
+            == por_index_dict[index_name]
+        # Same order of the location types, for instance
+        assert list (map (str, parallel_por_index_dict[index_name].items())) \
+            == list (map (str, por_index_dict[index_name].items()))
+
+    assert parallelOPTD.getServingPORList ('IEV') \
+        == myOPTD.getServingPORList ('IEV')
+
+def test_parallel_parse_unicode_line_separators (optd_local_dir, monkeypatch):
+    """
+    Test that the characters which are line boundaries for str.splitlines()
+    (but not for the CSV reader), e.g., U+2028, are kept within their fields
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False,
+                                            use_snapshot = False)
+    por_filepath = myOPTD.localIATAPORFilepath()
+    with open (por_filepath, encoding = 'utf8', newline = '') as por_file:
+        por_content = por_file.read()
+    with open (por_filepath, 'w', encoding = 'utf8', newline = '') \
+         as por_file:
+        por_file.write (por_content.replace ('^Kyiv Boryspil International',
+                                             '^Kyiv\u2028Boryspil\x0c\x1e'
+                                             '\x85International'))
+    (por_store, _) = myOPTD.parsePORFile()
+    assert 'Kyiv\u2028Boryspil\x0c\x1e\x85International Airport' \
+        in por_store.columns['name']
+
+    monkeypatch.setattr (parallelparse, 'parse_min_range_size', 512)
+    parallelOPTD = opentraveldata.OpenTravelData (
+        local_dir = optd_local_dir, validate_file_sizes = False,
+        use_snapshot = False, parse_workers = 2)
+    (parallel_por_store, _) = parallelOPTD.parsePORFile()
+    assert parallel_por_store.columns == por_store.columns
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import os, json
+import pytest
+import opentraveldata
+
+def test_por_record_views (optd_local_dir):
+    """
+    Test that the POR store records behave like the former dictionaries
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            use_snapshot = False,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD()
+
+    iev_city_rec = myOPTD.iata_por_dict['IEV']['C']
+    assert dict (iev_city_rec) == {
+        'iata_code': 'IEV', 'location_type': 'C', 'geoname_id': '703448',
+        'envelope_id': '', 'latitude': '50.45466', 'longitude': '30.5238',
+        'name': 'Kyiv', 'page_rank': '0.1', 'country_code': 'UA',
+        'country_name': 'Ukraine', 'adm1_code': '12',
+        'adm1_name_utf': 'Kyiv City', 'city_code_list': ['IEV'],
+        'tvl_por_list': ['IEV', 'KBP', 'QOF', 'QOH'],
+        'unlc_list': ['UAIEV'], 'asciiname': 'Kyiv',
+        'alt_name_section': 'en|Kyiv|p=en|Kiev|h=uk|Київ|=ru|Киев|'}
+    assert myOPTD.getPORByGeoID ('703448') == iev_city_rec
+    assert list (myOPTD.unlc_por_dict['CNSHA']) == ['7910318']
+
+    # The enveloped (no longer valid) IEV airport record is not indexed
+    assert myOPTD.iata_por_dict['IEV']['A']['envelope_id'] == ''
+
+    footprint_dict = myOPTD.memoryFootprint()
+    assert footprint_dict['por_store'] > 0
+
+def test_por_by_geo_id_is_plain_dict (optd_local_dir):
+    """
+    Test that getPORByGeoID() returns a plain, JSON-serializable dictionary
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    iev_city_rec = myOPTD.getPORByGeoID ('703448')
+    assert type (iev_city_rec) is dict
+    assert json.loads (json.dumps (iev_city_rec))['unlc_list'] == ['UAIEV']
+    iev_city_rec['name'] = 'Kiev'
+    assert myOPTD.getPORByGeoID ('703448')['name'] == 'Kyiv'
+
+def test_lazy_por_dictionaries (optd_local_dir, monkeypatch):
+    """
+    Test that the POR dictionaries are built on first use, from a single
+    parsing of the POR file
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            use_snapshot = False,
+                                            validate_file_sizes = False)
+    assert myOPTD.getPORByGeoID ('6300952')['iata_code'] == 'KBP'
+    assert myOPTD.geo_por_dict is not None
+    assert myOPTD.iata_por_dict is None and myOPTD.unlc_por_dict is None
+    assert list (myOPTD.memoryFootprint()) == ['por_store', 'geo_por_dict']
+
+    # Other dictionaries are built from the POR store, without parsing
+    # the POR file again
+    def failingParsePORFile (self, index_names):
+        raise AssertionError ("The POR file should not be parsed again")
+    monkeypatch.setattr (opentraveldata.OpenTravelData, 'parsePORFile',
+                         failingParsePORFile)
+    myOPTD.prewarmPORIndexes (('iata', 'unlc'))
+    assert 'IEV' in myOPTD.iata_por_dict
+    assert list (myOPTD.unlc_por_dict['UAIEV']) == ['703448']
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+from opentraveldata.opentraveldata import OPTDIATACodeError
+
+def test_serving_por_lists_batch (optd_local_dir):
+    """
+    Test the OpenTravelData::getServingPORLists() method
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+
+    por_codes = ['IEV', 'BAK', 'XXX', 'IEV', 'NCE', 'YYY']
+    (srv_dict_by_code, err_dict_by_code) = \
+        myOPTD.getServingPORLists (por_codes, collect_errors = True)
+
+    # The results are the same as the ones of getServingPORList()
+    assert list (srv_dict_by_code) == ['IEV', 'BAK', 'NCE']
+    for por_code, srv_dict in srv_dict_by_code.items():
+        assert srv_dict == myOPTD.getServingPORList (por_code)
+    iev_geo_id_list = [tvl_rec['geoname_id']
+                       for tvl_rec in srv_dict_by_code['IEV']['tvl_list']]
+    assert iev_geo_id_list == [6300960, 6300952, 8260936, 12156352]
+
+    # The invalid codes are collected, rather than raised
+    assert list (err_dict_by_code) == ['XXX', 'YYY']
+    assert isinstance (err_dict_by_code['XXX'], OPTDIATACodeError)
+
+    # Otherwise, the first invalid code raises
+    with pytest.raises (OPTDIATACodeError):
+        myOPTD.getServingPORLists (por_codes)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+from opentraveldata.opentraveldata import OPTDIATACodeError
+
+def test_serving_por_graph (optd_local_dir):
+    """
+    Test that the serving POR are precomputed along with the IATA POR
+    dictionary, in both directions
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD (('iata',))
+    assert myOPTD.serving_por_graph is not None, \
+        "The serving POR graph should be built along with the IATA POR dict"
+    assert myOPTD.servingPORGraphIssues() == []
+
+    srv_dict = myOPTD.getServingPORList ('IEV')
+    assert srv_dict['original']['location_type'] == 'C'
+    assert [tvl_rec['geoname_id'] for tvl_rec in srv_dict['tvl_list']] \
+        == [6300960, 6300952, 8260936, 12156352]
+
+    # Reverse lookup
+    assert myOPTD.getServedPORList ('KBP') == ['IEV']
+    assert myOPTD.getServedPORList ('XCN') == ['NCE']
+    assert myOPTD.getServedPORList ('IEV') == []
+    with pytest.raises (OPTDIATACodeError):
+        myOPTD.getServedPORList ('ZZZ')
+
+def test_serving_por_graph_issues (optd_local_dir):
+    """
+    Test that unknown serving POR are reported when the graph is built,
+    rather than when the serving POR are queried
+    """
+    por_filepath = os.path.join (optd_local_dir, 'optd_por_public_all.csv')
+    with open (por_filepath) as por_file:
+        por_content = por_file.read()
+    with open (por_filepath, 'w') as por_file:
+        por_file.write (por_content.replace ('^NCE,XCN^', '^NCE,XCN,ZZZ^'))
+
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    issue_list = myOPTD.servingPORGraphIssues()
+    assert len (issue_list) == 1 and 'ZZZ' in issue_list[0]
+
+    # The known serving POR are still returned
+    srv_dict = myOPTD.getServingPORList ('NCE')
+    assert [tvl_rec['iata_code'] for tvl_rec in srv_dict['tvl_list']] \
+        == ['NCE', 'XCN']
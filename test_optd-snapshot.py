@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import opentraveldata
+
+def test_snapshot_reuse_and_rebuild (optd_local_dir, monkeypatch):
+    """
+    Test that the POR dictionaries are saved into a snapshot, re-used
+    by another OpenTravelData object and rebuilt when the POR file changes
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD()
+    snapshot_filepath = myOPTD.localSnapshotFilepath()
+    assert os.path.isfile (snapshot_filepath), \
+        f"The {snapshot_filepath} snapshot has not been written"
+
+    # Another OpenTravelData object should load the POR dictionaries
+    # from the snapshot, rather than parsing the POR file
+    parsed_por_files = []
+    parsePORFile = opentraveldata.OpenTravelData.parsePORFile
+    def trackedParsePORFile (self, *args):
+        parsed_por_files.append (self.localIATAPORFilepath())
+        return parsePORFile (self, *args)
+    monkeypatch.setattr (opentraveldata.OpenTravelData, 'parsePORFile',
+                         trackedParsePORFile)
+
+    otherOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                               validate_file_sizes = False)
+    otherOPTD.extractPORSubsetFromOPTD()
+    assert parsed_por_files == [], \
+        "The POR file has been parsed, despite an up-to-date snapshot"
+    assert otherOPTD.getPORByGeoID ('703448')['name'] == 'Kyiv'
+    assert otherOPTD.getServingPORList ('IEV') \
+        == myOPTD.getServingPORList ('IEV')
+
+    # The pooled values come back from the snapshot as single objects
+    country_code_column = otherOPTD.por_store.columns['country_code']
+    assert len (set (map (id, country_code_column))) \
+        == len (set (country_code_column))
+
+    # Once the POR file changes, the snapshot is no longer valid
+    with open (myOPTD.localIATAPORFilepath(), 'a') as por_file:
+        por_file.write ('\n')
+    changedOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                                 validate_file_sizes = False)
+    changedOPTD.extractPORSubsetFromOPTD()
+    assert len (parsed_por_files) == 1, \
+        "A stale snapshot should not be loaded"
+
+def test_snapshot_garbage_or_untrusted (optd_local_dir):
+    """
+    Test that corrupted or untrusted snapshots are ignored (and rebuilt)
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD()
+    snapshot_filepath = myOPTD.localSnapshotFilepath()
+    source_key = opentraveldata.sourceFileKey (myOPTD.localIATAPORFilepath())
+
+    # A snapshot writable by other users is not loaded
+    os.chmod (snapshot_filepath, 0o666)
+    assert not myOPTD.loadPORSnapshot (source_key), \
+        "A world-writable snapshot should not be loaded"
+
+    # Garbage snapshots are not loaded, and get rebuilt
+    for garbage in (b'OPTDSNAP', b'OPTDSNAP\x00\x03\x00\x00\x00\x05[1,2',
+                    os.urandom (256)):
+        with open (snapshot_filepath, 'wb') as snapshot_file:
+            snapshot_file.write (garbage)
+        os.chmod (snapshot_filepath, 0o644)
+        assert not myOPTD.loadPORSnapshot (source_key)
+
+        otherOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                                   validate_file_sizes = False)
+        otherOPTD.extractPORSubsetFromOPTD()
+        assert otherOPTD.getPORByGeoID ('703448')['name'] == 'Kyiv'
+        assert myOPTD.loadPORSnapshot (source_key), \
+            "The snapshot should have been rebuilt"
+
+def test_delete_local_files (optd_local_dir, tmp_path_factory):
+    """
+    Test that the data files, and the files derived from them, are deleted
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD()
+    myOPTD.deleteLocalFiles()
+    assert not myOPTD.doLocalFilesExist()
+    assert not os.path.isfile (myOPTD.localSnapshotFilepath())
+
+    # Nothing to delete
+    emptyOPTD = opentraveldata.OpenTravelData (
+        local_dir = str (tmp_path_factory.mktemp ('empty')), verbose = True)
+    emptyOPTD.deleteLocalFiles()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+from opentraveldata import LocationType
+from opentraveldata.spatialindex import haversineDistance
+
+def test_haversine_distance():
+    """
+    Test the great-circle distance
+    """
+    assert haversineDistance (43.70313, 7.26608, 43.70313, 7.26608) == 0
+    # Nice - Kyiv, a bit more than 1,900 km
+    assert 1900 < haversineDistance (43.70313, 7.26608,
+                                     50.45466, 30.5238) < 2000
+    # Antipodes
+    assert haversineDistance (0, 0, 0, 180) \
+        == pytest.approx (20015.1, abs = 0.1)
+
+def test_nearest_and_radius (optd_local_dir):
+    """
+    Test the k-nearest and radius queries of the spatial index
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+
+    # Airports nearest to Kyiv city centre
+    dist_list = myOPTD.getNearestPORList (50.45, 30.52, k = 2,
+                                          loc_type_flags = LocationType.AIRPORT)
+    assert [(por['iata_code'], por['geoname_id']) for (_, por) in dist_list] \
+        == [('IEV', '6300960'), ('KBP', '6300952')]
+    assert dist_list[0][0] < dist_list[1][0]
+
+    # POR within 10 km of Nice airport, whatever their location type
+    dist_list = myOPTD.getPORListWithinRadius (43.66272, 7.20787, 10)
+    assert sorted (por['iata_code'] for (_, por) in dist_list) \
+        == ['NCE', 'NCE', 'XCN']
+    assert myOPTD.getPORListWithinRadius (43.66272, 7.20787, 10, 'H') == []
+
+    # Batch forms
+    dist_lists = myOPTD.getNearestPORLists ([(40.4, 49.9), (31.3, 121.5)])
+    assert [dist_list[0][1]['geoname_id'] for dist_list in dist_lists] \
+        == ['587084', '1796236']
+    # Nice (C) and Cannes Croisette heliport (CH)
+    dist_lists = myOPTD.getPORListsWithinRadius ([(0, 0), (43.7, 7.3)], 50,
+                                                 'C')
+    assert [len (dist_list) for dist_list in dist_lists] == [0, 2]
+
+    # More neighbours asked for than there are POR
+    assert len (myOPTD.getNearestPORList (0, 0, k = 1000)) \
+        == len (myOPTD.porSpatialIndex())
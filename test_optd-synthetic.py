@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import os
+import gzip
+import opentraveldata
+from opentraveldata.loctype import LocationType, parseLocationType
+from opentraveldata.synthetic import writeSyntheticOPTDFiles
+
+def test_synthetic_files (tmp_path):
+    """
+    Test that the synthetic data files are loaded, and that their
+    cross-references are consistent
+    """
+    local_dir = str (tmp_path)
+    (n_por_rows, n_unlc_rows) = writeSyntheticOPTDFiles (local_dir,
+                                                         scale = 0.02)
+    assert n_por_rows >= 0.02 * 123000
+    assert n_unlc_rows > 0
+
+    myOPTD = opentraveldata.OpenTravelData (local_dir = local_dir,
+                                            validate_file_sizes = False)
+    myOPTD.extractPORSubsetFromOPTD()
+    assert len (myOPTD.geo_por_dict) > 0.9 * n_por_rows
+    assert myOPTD.servingPORGraphIssues() == []
+
+    # Location types, historical records and cross-references
+    loc_type_set = set()
+    n_historical_recs = 0
+    for por_rec in myOPTD.iterPOR (columns = ('iata_code', 'location_type',
+                                              'envelope_id', 'city_code_list',
+                                              'tvl_por_list')):
+        loc_type_set.add (por_rec.location_type)
+        if por_rec.envelope_id != '':
+            n_historical_recs += 1
+            continue
+        if por_rec.city_code_list != '':
+            city_code = por_rec.city_code_list
+            assert any (parseLocationType (loc_type) & LocationType.CITY
+                        for loc_type in myOPTD.iata_por_dict[city_code])
+        if por_rec.tvl_por_list != '':
+            for tvl_code in por_rec.tvl_por_list.split (','):
+                assert tvl_code in myOPTD.iata_por_dict
+    assert {'C', 'CA', 'A', 'R', 'B', 'H', 'P', 'O'} <= loc_type_set
+    assert n_historical_recs > 0
+
+    # UN/LOCODE POR joined to the main POR file
+    unlc_code = next (iter (myOPTD.unlc_por_dict))
+    unlc_por_list = myOPTD.getUNLCPORList (unlc_code)
+    assert unlc_por_list[0]['optd_por']['unlc_list'] == [unlc_code]
+
+def test_synthetic_files_reproducible (tmp_path):
+    """
+    Test that the synthetic data files depend only on the seed
+    """
+    for dirname in ('first', 'second'):
+        writeSyntheticOPTDFiles (str (tmp_path / dirname), scale = 0.005,
+                                 compression = 'gzip')
+    # The gzip headers hold the time of the writing
+    for filename in ('optd_por_public_all.csv.gz', 'optd_por_unlc.csv.gz'):
+        content_list = []
+        for dirname in ('first', 'second'):
+            with gzip.open (str (tmp_path / dirname / filename)) as data_file:
+                content_list.append (data_file.read())
+        assert content_list[0] == content_list[1]
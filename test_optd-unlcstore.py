@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import pytest
+import opentraveldata
+
+def test_unlc_por_list (optd_local_dir):
+    """
+    Test the UN/LOCODE POR, extracted from the UN/LOCODE POR file,
+    and joined to the main POR file
+    """
+    myOPTD = opentraveldata.OpenTravelData (local_dir = optd_local_dir,
+                                            validate_file_sizes = False)
+
+    # Several POR with the same UN/LOCODE code
+    unlc_por_list = myOPTD.getUNLCPORList ('ADALV')
+    assert [(por['geonames_id'], por['feat_code'])
+            for por in unlc_por_list] \
+        == [('3041563', 'PPLC'), ('7730819', 'AIRH')]
+    # Neither of them is in the main POR file
+    assert [por['optd_por'] for por in unlc_por_list] == [None, None]
+
+    # UN/LOCODE-only POR, not referenced by the main POR file
+    myOPTD.extractPORSubsetFromOPTD (('unlc',))
+    assert 'CNYSN' not in myOPTD.unlc_por_dict
+    unlc_por_list = myOPTD.getUNLCPORList ('CNYSN')
+    assert len (unlc_por_list) == 1
+    assert unlc_por_list[0]['feat_code'] == 'PRT'
+
+    # POR joined to the main POR file
+    unlc_por_list = myOPTD.getUNLCPORList ('UAKBP')
+    assert unlc_por_list[0]['optd_por']['iata_code'] == 'KBP'
+    unlc_por_list = myOPTD.getUNLCPORListByGeoID ('7910318')
+    assert [por['unlocode'] for por in unlc_por_list] == ['CNSHA']
+    assert unlc_por_list[0]['optd_por']['name'] == 'Port of Shanghai'
+
+    assert myOPTD.getUNLCPORList ('ZZZZZ') == []
+    assert myOPTD.getUNLCPORListByGeoID ('0') == []
+    assert 'unlc_store' in myOPTD.memoryFootprint()